@@ -0,0 +1,325 @@
+#benchmark.py
+
+# 합성 데이터셋으로 DB 로드, 표 모델 표시, 타임라인 검색, 이미지 디코딩 시간을 재는 화면 없는 벤치마크
+#
+# 사용 예:
+#   python benchmark.py -o before.json                      # 10k / 100k / 1M 캡처
+#   python benchmark.py --sizes 10000 100000 -o after.json --compare before.json
+#   python benchmark.py --sizes 100000 --only model decode --repeats 5
+#
+# - 크기별 데이터셋은 synthetic_recall로 작업 폴더에 한 번만 만들고, 같은 옵션이면 다시 사용한다.
+# - 캐시 디렉토리가 섞이지 않도록 애플리케이션 이름을 arbiter-benchmark로 바꿔 실행한다
+#   (사용자가 만든 썸네일/케이스 캐시를 쓰지 않고 항상 원본 DB를 읽는다).
+# - 결과 JSON에는 환경(파이썬/SQLite/Qt 버전, CPU 수, git 커밋)과 데이터셋 옵션, 항목별 반복 측정값과
+#   중앙값/p95를 기록한다. --compare로 이전 결과와 중앙값 비율을 비교한다.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import PySide6
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImageReader
+from PySide6.QtCore import Qt, QModelIndex, QEventLoop, QTimer, QDateTime, qVersion
+from synthetic_recall import generate_dataset, read_dataset_info
+from queries import load_data_from_db
+from database import SQLiteTableModel
+from image_table import ImageTableWidget
+from thumbnail_cache import ThumbnailCache, read_scaled_image
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+DEFAULT_REPEATS = 3
+# 데이터셋마다 만드는 이미지 파일 수 (캡처 수와 무관하게 디코딩 표본만 있으면 됨)
+DATASET_IMAGES = 2000
+# 이미지 디코딩 표본 수
+DECODE_SAMPLES = 50
+# 스크롤 한 번에 보이는 행 수
+VIEWPORT_ROWS = 40
+# QStyledItemDelegate가 칸 하나를 그릴 때 요청하는 역할
+PAINT_ROLES = (
+    Qt.ItemDataRole.FontRole, Qt.ItemDataRole.TextAlignmentRole, Qt.ItemDataRole.ForegroundRole,
+    Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.DisplayRole,
+    Qt.ItemDataRole.BackgroundRole,
+)
+# 신호를 기다리는 최대 시간 (밀리초)
+WAIT_TIMEOUT = 600000
+GROUPS = ("load", "model", "sort", "search", "decode")
+# --compare에서 이 비율 이상 달라지면 표시
+DEFAULT_THRESHOLD = 0.10
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+    }
+
+def record(results, size, name, samples, unit="s", **extra):
+    results.append(dict({"size": size, "name": name, "unit": unit, "samples": samples}, **summarize(samples), **extra))
+    print(f"  {name:<40} {summarize(samples)['median']:>12.4f} {unit} (중앙값, {len(samples)}회)", file=sys.stderr)
+
+def timed(func, *args):
+    """func(*args)의 실행 시간(초)과 반환값"""
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+def wait_for(signal, timeout=WAIT_TIMEOUT):
+    """signal이 올 때까지 이벤트 루프를 돌리고 받은 인자를 반환"""
+    received = []
+    loop = QEventLoop()
+
+    def on_signal(*args):
+        received.append(args)
+        loop.quit()
+
+    signal.connect(on_signal)
+    QTimer.singleShot(timeout, loop.quit)
+    loop.exec()
+    signal.disconnect(on_signal)
+    if not received:
+        raise TimeoutError("신호를 기다리다 시간이 초과되었습니다.")
+    return received[0]
+
+@contextlib.contextmanager
+def quiet():
+    """측정 중 디버그 print를 숨김"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def ensure_dataset(work_dir, size, seed, images=DATASET_IMAGES):
+    """크기별 데이터셋 경로, 같은 옵션으로 만든 것이 없으면 생성"""
+    output_dir = os.path.join(work_dir, f"captures_{size}_seed_{seed}")
+    info = read_dataset_info(output_dir)
+    if info is None or (info.get("captures"), info.get("seed"), info.get("images")) != (size, seed, images):
+        print(f"데이터셋 생성: {output_dir}", file=sys.stderr)
+        info = generate_dataset(
+            output_dir, captures=size, seed=seed, images=images, gaps=max(20, size // 2000),
+            progress=lambda stage, done, total: print(f"  {stage}: {done}/{total}", file=sys.stderr))
+    return info
+
+def bench_load(results, size, db_path, repeats):
+    """queries.load_data_from_db: 관계 조인 그대로 / 캡처당 한 행으로 묶어서"""
+    for aggregate in (False, True):
+        samples = []
+        rows = 0
+        for _ in range(repeats):
+            with quiet():
+                seconds, (data, headers) = timed(load_data_from_db, db_path, aggregate)
+            samples.append(seconds)
+            rows = len(data or [])
+            del data
+        record(results, size, f"load_data_from_db[aggregate={aggregate}]", samples, rows=rows)
+
+def open_model(db_path, query=None):
+    """SQLiteTableModel을 만들고 첫 페이지가 올 때까지의 시간과 모델 반환"""
+    started = time.perf_counter()
+    model = SQLiteTableModel(db_path, aggregate=True, query=query)
+    wait_for(model.page_loaded)
+    return time.perf_counter() - started, model
+
+def fetch_all(model):
+    """스크롤로 끝까지 내려간 것처럼 모든 페이지를 읽음"""
+    while model.canFetchMore(QModelIndex()):
+        model.fetchMore(QModelIndex())
+        wait_for(model.page_loaded)
+
+def scroll_data(model):
+    """처음부터 끝까지 한 화면씩 내려가며 보이는 칸마다 델리게이트가 요청하는 역할을 모두 조회, 호출 수 반환"""
+    data = model.data
+    index = model.index
+    columns = range(model.columnCount())
+    row_count = model.rowCount()
+    calls = 0
+    for top in range(0, row_count, VIEWPORT_ROWS):
+        for row in range(top, min(top + VIEWPORT_ROWS, row_count)):
+            for column in columns:
+                cell = index(row, column)
+                for role in PAINT_ROLES:
+                    data(cell, role)
+                calls += len(PAINT_ROLES)
+    return calls
+
+def bench_model(results, size, db_path, repeats):
+    """SQLiteTableModel: 첫 페이지, 전체 페이지 읽기, 전체 스크롤의 data() 호출"""
+    first_page, fetch, scroll = [], [], []
+    calls = rows = 0
+    for _ in range(repeats):
+        seconds, model = open_model(db_path)
+        first_page.append(seconds)
+        seconds, _ = timed(fetch_all, model)
+        fetch.append(seconds)
+        seconds, calls = timed(scroll_data, model)
+        scroll.append(seconds)
+        rows = model.rowCount()
+        model.close()
+    record(results, size, "model_first_page", first_page)
+    record(results, size, "model_fetch_all", fetch, rows=rows)
+    record(results, size, "model_data_full_scroll", scroll, calls=calls,
+           calls_per_second=round(calls / statistics.median(scroll)))
+
+def bench_sort(results, size, db_path, repeats):
+    """헤더 클릭 정렬(ORDER BY)부터 새 첫 페이지가 올 때까지"""
+    sorts = (("TimeStamp", Qt.SortOrder.DescendingOrder), ("WindowTitle", Qt.SortOrder.AscendingOrder),
+             ("AppName", Qt.SortOrder.AscendingOrder))
+    _, model = open_model(db_path)
+    for column_name, order in sorts:
+        column = model.headers.index(column_name)
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model.sort(column, order)
+            wait_for(model.page_loaded)
+            samples.append(time.perf_counter() - started)
+            model.sort(0, Qt.SortOrder.AscendingOrder)  # 다음 반복도 정렬을 바꾸도록 되돌림
+            wait_for(model.page_loaded)
+        direction = "desc" if order == Qt.SortOrder.DescendingOrder else "asc"
+        record(results, size, f"model_sort_first_page[{column_name} {direction}]", samples)
+    model.close()
+
+def bench_search(results, size, db_path, repeats):
+    """ImageTableWidget: DB 열기(이미지 목록 로드)와 시간 범위 검색"""
+    widget = ImageTableWidget()
+    open_samples = []
+    for _ in range(repeats):
+        with quiet():
+            seconds, _ = timed(widget.set_db_path, db_path)
+        open_samples.append(seconds)
+    record(results, size, "timeline_set_db_path", open_samples, images=len(widget.all_images))
+
+    first = widget.all_images[0][0]
+    last = widget.all_images[-1][0]
+    middle = (first + last) // 2
+    ranges = {"full": (first, last), "day": (middle - 12 * 3600000, middle + 12 * 3600000),
+              "hour": (middle - 1800000, middle + 1800000)}
+    for label, (start, end) in ranges.items():
+        samples = []
+        for _ in range(repeats):
+            widget.start_time.setDateTime(QDateTime.fromMSecsSinceEpoch(start))
+            widget.end_time.setDateTime(QDateTime.fromMSecsSinceEpoch(end))
+            with quiet():
+                seconds, _ = timed(widget.search_images_by_timestamp)
+            samples.append(seconds)
+        record(results, size, f"search_images_by_timestamp[{label}]", samples, images=len(widget.all_images))
+    widget.shutdown()
+
+def bench_decode(results, size, image_dir, work_dir):
+    """이미지 한 장당 디코딩 지연: 원본 전체, 표시 크기로 축소 디코딩, 썸네일 캐시(원본/디스크)"""
+    tokens = sorted(name for name in os.listdir(image_dir))
+    if not tokens:
+        return
+    step = max(1, len(tokens) // DECODE_SAMPLES)
+    samples = tokens[::step][:DECODE_SAMPLES]
+    cache = ThumbnailCache(image_dir, cache_dir=tempfile.mkdtemp(prefix="thumbnails_", dir=work_dir))
+
+    def per_image(func):
+        return [timed(func, token)[0] * 1000 for token in samples]
+
+    record(results, size, "decode_full", per_image(lambda token: QImageReader(os.path.join(image_dir, token)).read()),
+           unit="ms")
+    record(results, size, "decode_scaled[500x500]",
+           per_image(lambda token: read_scaled_image(os.path.join(image_dir, token), 500, 500)), unit="ms")
+    record(results, size, "thumbnail_cache_miss[500x500]", per_image(lambda token: cache.get(token, 500, 500)),
+           unit="ms")
+    cache.clear_memory()
+    record(results, size, "thumbnail_cache_disk_hit[500x500]", per_image(lambda token: cache.get(token, 500, 500)),
+           unit="ms")
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment():
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "pyside6": PySide6.__version__,
+        "qt": qVersion(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": git_commit(),
+    }
+
+def compare(previous, current, threshold=DEFAULT_THRESHOLD):
+    """이전 결과와 (크기, 항목)별 중앙값 비교표 출력"""
+    before = {(result["size"], result["name"]): result for result in previous["results"]}
+    print(f"{'항목':<40} {'크기':>8} {'이전':>12} {'현재':>12} {'비율':>7}")
+    for result in current["results"]:
+        old = before.get((result["size"], result["name"]))
+        if old is None or not old["median"]:
+            continue
+        ratio = result["median"] / old["median"]
+        mark = "느려짐" if ratio > 1 + threshold else "빨라짐" if ratio < 1 - threshold else ""
+        print(f"{result['name']:<40} {result['size']:>8} {old['median']:>12.4f} {result['median']:>12.4f} "
+              f"{ratio:>6.2f}x {mark}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="합성 Recall 데이터셋 벤치마크 (화면 없이 실행)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="캡처 수 (삭제 전)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="항목별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="데이터셋 생성 seed")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, help="실행할 항목 묶음")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "arbiter-benchmark"),
+                        help="데이터셋과 임시 캐시를 둘 폴더")
+    parser.add_argument("-o", "--output", help="결과 JSON 경로 (기본: 표준 출력)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="비교 표시 기준 비율")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    groups = set(args.only or GROUPS)
+    app = QApplication(sys.argv[:1])
+    app.setApplicationName("arbiter-benchmark")  # 사용자 캐시와 분리
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    output = {"environment": environment(), "datasets": {}, "results": []}
+    results = output["results"]
+    for size in args.sizes:
+        info = ensure_dataset(args.work_dir, size, args.seed)
+        output["datasets"][str(size)] = info
+        db_path = info["db_path"]
+        print(f"캡처 {size}개 ({info['remaining_captures']}개 남음): {db_path}", file=sys.stderr)
+        if "load" in groups:
+            bench_load(results, size, db_path, args.repeats)
+        if "model" in groups:
+            bench_model(results, size, db_path, args.repeats)
+        if "sort" in groups:
+            bench_sort(results, size, db_path, args.repeats)
+        if "search" in groups:
+            bench_search(results, size, db_path, args.repeats)
+        if "decode" in groups:
+            bench_decode(results, size, os.path.join(os.path.dirname(db_path), "ImageStore"), args.work_dir)
+
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as result_file:
+            result_file.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous_file:
+            compare(json.load(previous_file), output, args.threshold)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
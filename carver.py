@@ -0,0 +1,856 @@
+#carver.py
+
+# 삭제된 WindowCapture / OCR 텍스트 레코드 복구 (SQLite 페이지 카빙)
+#
+# sqlite3로는 보이지 않는 다음 영역에서 레코드를 찾는다.
+# - 프리리스트(freelist) 페이지: 삭제로 비워진 페이지 전체
+# - 대상 테이블 리프 페이지의 빈 공간: 셀 포인터 배열 뒤의 미할당 영역과 freeblock
+# - -wal 파일의 모든 프레임 (immutable 연결에서는 반영되지 않는 내용 포함)
+#
+# 살아 있는 레코드는 SQLite가 읽는 것과 같은 상태로 판단한다. DB 파일 위에 -wal의 커밋된 프레임을
+# 페이지마다 마지막 것이 이기도록 겹친 뒤 그 b-tree를 따라간다 (immutable 연결은 -wal을 읽지 않으므로 쓰지 않음).
+#
+# DB와 -wal 파일은 mmap으로 열고 memoryview로 잘라 읽으므로 파일 크기와 무관하게 메모리 사용량이 일정하다.
+# 레코드 헤더는 PRAGMA table_info로 얻은 스키마(열 수, 선언 타입)에 맞는 경우만 복구하고,
+# 현재 DB에 살아 있는 Id는 제외한다.
+# 살아 있는지는 후보마다 rowid b-tree를 검색하고, 중복 판별용 지문은 디스크에 두는 임시 SQLite에 기록하므로
+# 레코드 수가 많은 DB에서도 메모리에 행 집합을 만들지 않는다.
+
+import mmap
+import os
+import re
+import sqlite3
+import struct
+from collections import namedtuple
+from connection import open_readonly
+
+# 복구 대상 테이블
+CARVE_TABLES = ("WindowCapture", "WindowCaptureTextIndex_content")
+
+# 복구 위치 종류
+SOURCE_FREELIST = "freelist"
+SOURCE_FREE_SPACE = "freespace"
+SOURCE_WAL = "wal"
+
+# 한 번에 내보내는 복구 레코드 수
+CARVE_BATCH_SIZE = 200
+# 살아 있는 레코드 지문을 임시 DB에 넣을 때 한 번에 넣는 행 수
+FINGERPRINT_BATCH_SIZE = 10000
+
+# 중복 판별용 임시 DB (빈 파일 이름 = 닫으면 지워지는 디스크 임시 파일)
+FINGERPRINT_SCHEMA = """
+PRAGMA cache_size = -8192;
+CREATE TABLE LiveFingerprint (TableName TEXT, Fingerprint INTEGER, PRIMARY KEY (TableName, Fingerprint)) WITHOUT ROWID;
+CREATE TABLE SeenRecord (TableName TEXT, Fingerprint INTEGER, RowId INTEGER,
+                         PRIMARY KEY (TableName, Fingerprint)) WITHOUT ROWID;
+"""
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+WAL_MAGIC = (0x377F0682, 0x377F0683)
+
+TABLE_LEAF = 0x0D
+TABLE_INTERIOR = 0x05
+
+TEXT_ENCODINGS = {1: "utf-8", 2: "utf-16-le", 3: "utf-16-be"}
+
+# 직렬 타입별 정수 크기
+INTEGER_SIZES = {1: 1, 2: 2, 3: 3, 4: 4, 5: 6, 6: 8}
+
+# 테이블 스키마: 열 이름, 열별 선언 타입 친화도, INTEGER PRIMARY KEY(rowid 별칭) 열 위치, 루트 페이지
+TableSchema = namedtuple("TableSchema", ["name", "columns", "affinities", "rowid_column", "root_page"])
+
+# 복구한 레코드 하나
+# values는 columns(스키마 열 이름) 순서의 값이며, rowid를 알 수 없으면 rowid 열은 None
+# page/offset은 레코드를 찾은 페이지 번호와 페이지 안의 위치 (WAL은 프레임의 페이지 번호)
+# truncated는 오버플로 페이지를 따라가지 못해 값 일부가 잘렸는지 여부
+CarvedRecord = namedtuple("CarvedRecord", [
+    "table", "columns", "source", "page", "offset", "rowid", "values", "truncated",
+])
+
+def column_affinity(declared_type):
+    """선언 타입으로 SQLite 열 친화도 결정"""
+    declared_type = (declared_type or "").upper()
+    if "INT" in declared_type:
+        return "integer"
+    if any(name in declared_type for name in ("CHAR", "CLOB", "TEXT")):
+        return "text"
+    if not declared_type or "BLOB" in declared_type:
+        return "blob"
+    if any(name in declared_type for name in ("REAL", "FLOA", "DOUB")):
+        return "real"
+    return "numeric"
+
+def load_schemas(cursor, table_names=CARVE_TABLES):
+    """살아 있는 DB에서 대상 테이블의 스키마를 읽음 (없는 테이블은 제외)"""
+    schemas = []
+    for name in table_names:
+        cursor.execute("SELECT rootpage FROM sqlite_master WHERE type = 'table' AND name = ?;", (name,))
+        row = cursor.fetchone()
+        if row is None:
+            continue
+        cursor.execute(f"PRAGMA table_info('{name}');")
+        info = cursor.fetchall()
+        columns = [column[1] for column in info]
+        affinities = [column_affinity(column[2]) for column in info]
+        primary_keys = [index for index, column in enumerate(info) if column[5]]
+        rowid_column = None
+        if len(primary_keys) == 1 and (info[primary_keys[0]][2] or "").upper() == "INTEGER":
+            rowid_column = primary_keys[0]
+        schemas.append(TableSchema(name, columns, affinities, rowid_column, row[0]))
+    return schemas
+
+def wal_checksum(data, s0, s1, byte_order):
+    """SQLite WAL 누적 체크섬 (32비트 단어 두 개씩)"""
+    words = struct.unpack(f"{byte_order}{len(data) // 4}I", data)
+    for index in range(0, len(words) - 1, 2):
+        s0 = (s0 + words[index] + s1) & 0xFFFFFFFF
+        s1 = (s1 + words[index + 1] + s0) & 0xFFFFFFFF
+    return s0, s1
+
+def read_varint(buffer, offset, end):
+    """offset의 varint를 읽어 (값, 다음 위치) 반환, 범위를 벗어나면 None"""
+    value = 0
+    for index in range(9):
+        if offset + index >= end:
+            return None
+        byte = buffer[offset + index]
+        if index == 8:
+            return (value << 8) | byte, offset + 9
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, offset + index + 1
+    return None
+
+def read_varint_before(buffer, end, start):
+    """end 바로 앞에서 끝나는 varint를 거꾸로 찾아 (값, 시작 위치) 반환, start 이전으로 넘어가면 None"""
+    position = end - 1
+    if position < start or buffer[position] >= 0x80:
+        return None
+    while position > start and end - position < 8 and buffer[position - 1] >= 0x80:
+        position -= 1
+    result = read_varint(buffer, position, end)
+    if result is None or result[1] != end:
+        return None
+    return result[0], position
+
+def varint_size(value):
+    size = 1
+    while value >= 0x80 and size < 9:
+        value >>= 7
+        size += 1
+    return size
+
+def serial_type_size(serial_type):
+    if serial_type >= 12:
+        return (serial_type - 12) // 2
+    if serial_type in INTEGER_SIZES:
+        return INTEGER_SIZES[serial_type]
+    if serial_type == 7:
+        return 8
+    return 0
+
+def serial_type_matches(serial_type, affinity):
+    """직렬 타입이 열 친화도로 저장될 수 있는 값인지 여부"""
+    if serial_type == 0:
+        return True
+    if serial_type in (10, 11):
+        return False
+    if affinity == "integer":
+        return serial_type <= 9 and serial_type != 7
+    if affinity == "real":
+        return serial_type <= 9
+    if affinity == "text":
+        return serial_type >= 13 and serial_type % 2 == 1
+    return True
+
+def record_matches(schema, serial_types):
+    """레코드 헤더가 스키마와 맞는지 검사 (rowid 별칭 열은 NULL로 저장됨)"""
+    if len(serial_types) != len(schema.columns):
+        return False
+    has_value = False
+    for column, (serial_type, affinity) in enumerate(zip(serial_types, schema.affinities)):
+        if column == schema.rowid_column:
+            if serial_type != 0:
+                return False
+            continue
+        if not serial_type_matches(serial_type, affinity):
+            return False
+        has_value = has_value or serial_type != 0
+    return has_value
+
+def header_pattern(schema):
+    """빈 공간에서 레코드 헤더 후보를 빠르게 찾기 위한 정규식 (겹치는 후보도 찾도록 lookahead 사용)"""
+    any_varint = rb"(?:[\x00-\x7f]|[\x81-\xff][\x80-\xff]{0,3}[\x00-\x7f])"
+    column_patterns = {
+        "integer": rb"[\x00-\x06\x08\x09]",
+        "real": rb"[\x00-\x09]",
+        "text": rb"(?:[\x00\x0d-\x7f]|[\x81-\xff][\x80-\xff]{0,2}[\x00-\x7f])",
+    }
+    parts = []
+    for column, affinity in enumerate(schema.affinities):
+        if column == schema.rowid_column:
+            parts.append(rb"\x00")
+        else:
+            parts.append(column_patterns.get(affinity, any_varint))
+    return re.compile(rb"(?=[\x02-\x7f]" + b"".join(parts) + rb")", re.DOTALL)
+
+def local_payload_size(payload_size, usable_size):
+    """테이블 리프 셀에서 페이지 안에 저장되는 페이로드 크기 (나머지는 오버플로 페이지)"""
+    max_local = usable_size - 35
+    if payload_size <= max_local:
+        return payload_size
+    min_local = (usable_size - 12) * 32 // 255 - 23
+    local = min_local + (payload_size - min_local) % (usable_size - 4)
+    return local if local <= max_local else min_local
+
+def decode_value(payload, offset, serial_type, encoding, strict):
+    """레코드 본문의 값 하나를 디코딩, 디코딩할 수 없으면 ValueError"""
+    size = serial_type_size(serial_type)
+    data = payload[offset:offset + size]
+    if serial_type == 0:
+        return None
+    if serial_type == 8:
+        return 0
+    if serial_type == 9:
+        return 1
+    if serial_type in INTEGER_SIZES:
+        return int.from_bytes(data, "big", signed=True)
+    if serial_type == 7:
+        return struct.unpack(">d", data)[0] if len(data) == 8 else None
+    if serial_type % 2 == 0:
+        return bytes(data)
+    return bytes(data).decode(encoding, "strict" if strict else "replace")
+
+class PageSource:
+    """mmap으로 연 DB 파일 또는 WAL 프레임에서 페이지를 읽는 도우미"""
+
+    def __init__(self, buffer, page_size, offsets=None):
+        self.buffer = buffer
+        self.page_size = page_size
+        self.offsets = offsets  # WAL: 페이지 번호 → 마지막 프레임의 페이지 시작 위치
+
+    def page_offset(self, page_number):
+        if self.offsets is not None:
+            return self.offsets.get(page_number)
+        offset = (page_number - 1) * self.page_size
+        return offset if page_number >= 1 and offset + self.page_size <= len(self.buffer) else None
+
+class Carver:
+    """ukg.db(와 -wal)에서 삭제된 레코드를 찾는 카버
+
+    iter_records()는 CarvedRecord를 하나씩 내보내는 제너레이터이며, should_stop()이 True를 반환하면 중단한다.
+    """
+
+    def __init__(self, db_path, table_names=CARVE_TABLES):
+        self.db_path = db_path
+        conn = open_readonly(db_path)
+        try:
+            self.schemas = load_schemas(conn.cursor(), table_names)
+        finally:
+            conn.close()
+        self.patterns = [(schema, header_pattern(schema)) for schema in self.schemas]
+        self.fingerprints = sqlite3.connect("")
+        self.fingerprints.executescript(FINGERPRINT_SCHEMA)
+        self._live_loaded = set()  # LiveFingerprint를 채운 테이블
+
+        self._files = []
+        self.db = self._map(db_path)
+        if self.db is None or len(self.db) < 100 or bytes(self.db[:16]) != b"SQLite format 3\x00":
+            self.close()
+            raise ValueError(f"SQLite DB 파일이 아닙니다: {db_path}")
+        page_size = struct.unpack(">H", self.db[16:18])[0]
+        self.page_size = 65536 if page_size == 1 else page_size
+        self.usable_size = self.page_size - self.db[20]
+        self.page_count = len(self.db) // self.page_size
+        self.encoding = TEXT_ENCODINGS.get(struct.unpack(">I", self.db[56:60])[0], "utf-8")
+        self.main = PageSource(self.db, self.page_size)
+
+        self.wal = self._map(db_path + "-wal")
+        self.wal_frames = self._wal_frames() if self.wal is not None else []
+        # 살아 있는 상태: 커밋된 WAL 프레임(페이지마다 마지막 것)을 DB 파일 위에 겹침
+        live_offsets, live_page_count = self._wal_commits() if self.wal is not None else ({}, None)
+        self.live_wal = PageSource(self.wal, self.page_size, live_offsets) if live_offsets else None
+        self.live_page_count = live_page_count or self.page_count
+
+    def _map(self, path):
+        """파일을 읽기 전용으로 mmap, 없거나 비어 있으면 None"""
+        try:
+            handle = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            if os.fstat(handle.fileno()).st_size == 0:
+                handle.close()
+                return None
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            handle.close()
+            return None
+        view = memoryview(mapped)
+        self._files.append((handle, mapped, view))
+        return view
+
+    def close(self):
+        if self.fingerprints is not None:
+            self.fingerprints.close()
+            self.fingerprints = None
+        self.db = self.wal = self.main = self.live_wal = None
+        for handle, mapped, view in self._files:
+            try:
+                view.release()
+                mapped.close()
+            except BufferError:
+                pass  # 아직 잘라 낸 memoryview가 남아 있으면 가비지 컬렉션 때 닫힘
+            handle.close()
+        self._files = []
+
+    def _wal_frames(self):
+        """WAL 프레임 목록 [(페이지 번호, 페이지 시작 위치)] (체크포인트 전후의 이전 프레임도 포함)"""
+        if len(self.wal) < WAL_HEADER_SIZE or struct.unpack(">I", self.wal[:4])[0] not in WAL_MAGIC:
+            return []
+        page_size = struct.unpack(">I", self.wal[8:12])[0]
+        if page_size != self.page_size:
+            return []
+        frames = []
+        frame_size = WAL_FRAME_HEADER_SIZE + page_size
+        for offset in range(WAL_HEADER_SIZE, len(self.wal) - frame_size + 1, frame_size):
+            page_number = struct.unpack(">I", self.wal[offset:offset + 4])[0]
+            if page_number:
+                frames.append((page_number, offset + WAL_FRAME_HEADER_SIZE))
+        return frames
+
+    def _wal_commits(self):
+        """커밋된 WAL 프레임의 {페이지 번호: 마지막 프레임의 페이지 시작 위치}와 마지막 커밋 시점의 DB 페이지 수
+
+        SQLite처럼 salt가 헤더와 같고 누적 체크섬이 맞는 프레임까지만 읽으며, 마지막 커밋 프레임 뒤의 프레임은 버린다.
+        """
+        if len(self.wal) < WAL_HEADER_SIZE:
+            return {}, None
+        magic, _, page_size = struct.unpack(">III", self.wal[:12])
+        if magic not in WAL_MAGIC or page_size != self.page_size:
+            return {}, None
+        byte_order = ">" if magic & 1 else "<"
+        checksum = wal_checksum(self.wal[:24], 0, 0, byte_order)
+        if checksum != struct.unpack(">II", self.wal[24:32]):
+            return {}, None
+        salt = bytes(self.wal[16:24])
+        committed = {}
+        pending = {}
+        page_count = None
+        frame_size = WAL_FRAME_HEADER_SIZE + page_size
+        for offset in range(WAL_HEADER_SIZE, len(self.wal) - frame_size + 1, frame_size):
+            page_number, commit_size = struct.unpack(">II", self.wal[offset:offset + 8])
+            if bytes(self.wal[offset + 8:offset + 16]) != salt:
+                break
+            checksum = wal_checksum(self.wal[offset:offset + 8], *checksum, byte_order)
+            checksum = wal_checksum(self.wal[offset + WAL_FRAME_HEADER_SIZE:offset + frame_size], *checksum,
+                                    byte_order)
+            if checksum != struct.unpack(">II", self.wal[offset + 16:offset + 24]):
+                break
+            pending[page_number] = offset + WAL_FRAME_HEADER_SIZE
+            if commit_size:
+                committed.update(pending)
+                pending = {}
+                page_count = commit_size
+        return committed, page_count
+
+    def _live_page(self, page_number):
+        """살아 있는 상태에서 페이지를 읽을 (PageSource, 페이지 시작 위치), 없으면 None"""
+        if self.live_wal is not None:
+            start = self.live_wal.page_offset(page_number)
+            if start is not None:
+                return self.live_wal, start
+        if page_number > self.live_page_count:
+            return None
+        start = self.main.page_offset(page_number)
+        return (self.main, start) if start is not None else None
+
+    def _table_leaves(self):
+        """대상 테이블 b-tree를 루트부터 따라가 리프 페이지 번호 → 스키마 dict 반환"""
+        leaves = {}
+        for schema in self.schemas:
+            stack = [schema.root_page]
+            visited = set()
+            while stack:
+                page_number = stack.pop()
+                if page_number in visited or not 1 <= page_number <= self.page_count:
+                    continue
+                visited.add(page_number)
+                start = (page_number - 1) * self.page_size
+                header = start + (100 if page_number == 1 else 0)
+                page_type = self.db[header]
+                if page_type == TABLE_LEAF:
+                    leaves[page_number] = schema
+                elif page_type == TABLE_INTERIOR:
+                    cell_count = struct.unpack(">H", self.db[header + 3:header + 5])[0]
+                    stack.append(struct.unpack(">I", self.db[header + 8:header + 12])[0])
+                    for index in range(cell_count):
+                        pointer = header + 12 + index * 2
+                        cell = start + struct.unpack(">H", self.db[pointer:pointer + 2])[0]
+                        if cell + 4 <= start + self.page_size:
+                            stack.append(struct.unpack(">I", self.db[cell:cell + 4])[0])
+        return leaves
+
+    def _freelist(self):
+        """프리리스트 [(페이지 번호, 트렁크 여부, 트렁크의 사용 중인 바이트 수)]"""
+        pages = []
+        trunk = struct.unpack(">I", self.db[32:36])[0]
+        visited = set()
+        while trunk and trunk not in visited and trunk <= self.page_count:
+            visited.add(trunk)
+            start = (trunk - 1) * self.page_size
+            next_trunk, leaf_count = struct.unpack(">II", self.db[start:start + 8])
+            leaf_count = min(leaf_count, (self.usable_size - 8) // 4)
+            pages.append((trunk, True, 8 + leaf_count * 4))
+            for index in range(leaf_count):
+                pointer = start + 8 + index * 4
+                leaf = struct.unpack(">I", self.db[pointer:pointer + 4])[0]
+                if 1 <= leaf <= self.page_count:
+                    pages.append((leaf, False, 0))
+            trunk = next_trunk
+        return pages
+
+    def iter_records(self, should_stop=None, progress=None):
+        """복구한 레코드를 하나씩 내보냄, progress(처리한 페이지 수, 전체)를 주기적으로 호출"""
+        leaves = self._table_leaves()
+        freelist = self._freelist()
+        total = len(leaves) + len(freelist) + len(self.wal_frames)
+        done = 0
+
+        def step():
+            nonlocal done
+            done += 1
+            if progress is not None and (done % 256 == 0 or done == total):
+                progress(done, total)
+            return should_stop is not None and should_stop()
+
+        # rowid가 남아 있는 프리리스트와 WAL을 먼저 읽어, 빈 공간에서 rowid 없이 찾은 같은 레코드는 건너뜀
+        # 프리리스트 페이지: 리프 페이지 모양이 남아 있으면 셀을 읽고, 아니면 페이지 전체를 훑음
+        for page_number, is_trunk, used in freelist:
+            start = (page_number - 1) * self.page_size
+            if is_trunk:
+                yield from self._carve_region(self.main, page_number, start, start + used,
+                                              start + self.usable_size, SOURCE_FREELIST, self.schemas)
+            elif self.db[start] == TABLE_LEAF:
+                yield from self._carve_leaf(self.main, page_number, start, SOURCE_FREELIST, live_cells=True)
+            else:
+                yield from self._carve_region(self.main, page_number, start, start,
+                                              start + self.usable_size, SOURCE_FREELIST, self.schemas)
+            if step():
+                return
+
+        # WAL 프레임: 어떤 테이블의 페이지인지 알 수 없으므로 헤더가 스키마와 맞는 레코드만 복구
+        if self.wal_frames:
+            wal_pages = PageSource(self.wal, self.page_size, dict(self.wal_frames))
+            for page_number, start in self.wal_frames:
+                header = start + (100 if page_number == 1 else 0)
+                if self.wal[header] == TABLE_LEAF:
+                    yield from self._carve_leaf(wal_pages, page_number, start, SOURCE_WAL, live_cells=True)
+                if step():
+                    return
+
+        # 살아 있는 리프 페이지의 빈 공간 (살아 있는 셀은 sqlite3로 이미 보임)
+        for page_number, schema in leaves.items():
+            start = (page_number - 1) * self.page_size
+            yield from self._carve_leaf(self.main, page_number, start, SOURCE_FREE_SPACE, live_cells=False,
+                                        schemas=[schema])
+            if step():
+                return
+
+    def _carve_leaf(self, pages, page_number, start, source, live_cells, schemas=None):
+        """테이블 리프 페이지 하나: (live_cells이면) 셀 포인터의 셀과 미할당 영역, freeblock을 복구
+
+        schemas는 페이지가 속한 테이블을 알 때 빈 공간에서 찾을 스키마를 좁히는 데 쓴다.
+        """
+        schemas = schemas or self.schemas
+        buffer = pages.buffer
+        page_end = start + self.usable_size
+        header = start + (100 if page_number == 1 else 0)
+        first_freeblock, cell_count, content_start = struct.unpack(">HHH", buffer[header + 1:header + 7])
+        content_start = content_start or 65536
+        pointers_end = header + 8 + cell_count * 2
+        if pointers_end > page_end:
+            # 헤더가 깨진 페이지는 전체를 훑음
+            yield from self._carve_region(pages, page_number, start, header, page_end, source, schemas)
+            return
+
+        if live_cells:
+            for index in range(cell_count):
+                pointer = header + 8 + index * 2
+                cell = start + struct.unpack(">H", buffer[pointer:pointer + 2])[0]
+                if pointers_end <= cell < page_end:
+                    record = self._read_cell(pages, page_number, start, cell, page_end, source)
+                    if record is not None:
+                        yield record
+
+        # 셀 포인터 배열과 셀 내용 영역 사이의 미할당 공간
+        unallocated_end = min(start + content_start, page_end)
+        if unallocated_end > pointers_end:
+            yield from self._carve_region(pages, page_number, start, pointers_end, unallocated_end, source,
+                                          schemas)
+
+        # freeblock 목록 (앞 4바이트는 다음 freeblock 위치와 크기로 덮여 있음)
+        freeblock = first_freeblock
+        visited = set()
+        while freeblock and freeblock not in visited:
+            visited.add(freeblock)
+            block = start + freeblock
+            if block + 4 > page_end:
+                break
+            next_block, size = struct.unpack(">HH", buffer[block:block + 4])
+            block_end = min(block + size, page_end)
+            yield from self._carve_region(pages, page_number, start, block, block_end, source, schemas,
+                                          protected=4)
+            if next_block and next_block <= freeblock:
+                break
+            freeblock = next_block
+
+    def _read_cell(self, pages, page_number, page_start, cell, page_end, source):
+        """셀 포인터가 가리키는 테이블 리프 셀을 읽음"""
+        buffer = pages.buffer
+        result = read_varint(buffer, cell, page_end)
+        if result is None:
+            return None
+        payload_size, position = result
+        result = read_varint(buffer, position, page_end)
+        if result is None:
+            return None
+        rowid, position = result
+        record = self._decode(pages, page_number, page_start, position, page_end, source, rowid, payload_size,
+                              trusted=True)
+        return record[0] if record is not None else None
+
+    def _carve_region(self, pages, page_number, page_start, region_start, region_end, source, schemas,
+                      protected=0):
+        """빈 공간에서 스키마와 맞는 레코드 헤더를 찾아 복구
+
+        protected는 region_start부터 덮어쓰여 신뢰할 수 없는 바이트 수 (freeblock 헤더)이다.
+        """
+        buffer = pages.buffer
+        resume = region_start
+        # freeblock 첫 셀은 payload 크기, rowid와 헤더 크기 바이트가 덮여 있으므로
+        # 직렬 타입이 덮인 바이트 바로 뒤에서 시작한다고 보고 헤더 크기를 역산
+        # 이어 붙은(병합된) freeblock은 뒤따르는 셀의 앞부분도 덮여 있으므로 찾을 때마다 반복
+        while protected:
+            for types_start in range(resume + protected, resume, -1):
+                record = self._decode_clobbered(pages, page_number, page_start, types_start, region_end, source,
+                                                schemas)
+                if record is not None:
+                    carved, resume = record
+                    if carved is not None:
+                        yield carved
+                    break
+            else:
+                break
+
+        candidates = sorted(
+            (match.start(), schema)
+            for schema, pattern in self.patterns
+            if schema in schemas
+            for match in pattern.finditer(buffer, resume, region_end)
+        )
+        for position, schema in candidates:
+            if position < resume:
+                continue
+            # 헤더 앞의 payload 크기와 rowid varint가 온전하면 rowid를 함께 복구
+            rowid = payload_size = None
+            safe_start = region_start + protected
+            before = read_varint_before(buffer, position, safe_start)
+            if before is not None:
+                size_before = read_varint_before(buffer, before[1], safe_start)
+                if size_before is not None:
+                    rowid, payload_size = before[0], size_before[0]
+            record = self._decode(pages, page_number, page_start, position, region_end, source, rowid,
+                                  payload_size, trusted=False, schema=schema)
+            if record is not None:
+                carved, end = record
+                resume = end
+                if carved is not None:
+                    yield carved
+
+    def _decode_clobbered(self, pages, page_number, page_start, types_start, limit, source, schemas):
+        """헤더 크기 바이트가 지워진 레코드를 직렬 타입 목록부터 읽어 복구
+
+        rowid 별칭이 첫 열이면 그 직렬 타입(항상 0)까지 지워졌을 수 있으므로 그 경우도 시도한다.
+        """
+        for schema in schemas:
+            skips = (0, 1) if schema.rowid_column == 0 else (0,)
+            for skip in skips:
+                serial_types = [0] * skip
+                offset = types_start
+                for _ in schema.columns[skip:]:
+                    result = read_varint(pages.buffer, offset, limit)
+                    if result is None:
+                        break
+                    serial_type, offset = result
+                    serial_types.append(serial_type)
+                else:
+                    header_size = offset - types_start + 1 + skip
+                    if header_size < 0x80:
+                        record = self._decode(pages, page_number, page_start, offset - header_size, limit, source,
+                                              None, None, trusted=False, schema=schema,
+                                              serial_types=serial_types)
+                        if record is not None:
+                            return record
+        return None
+
+    def _decode(self, pages, page_number, page_start, position, limit, source, rowid, payload_size, trusted,
+                schema=None, serial_types=None):
+        """position의 레코드를 디코딩해 (CarvedRecord 또는 중복이면 None, 레코드 끝 위치) 반환
+
+        스키마와 맞지 않거나 limit를 벗어나면 None을 반환한다. trusted가 아니면 rowid와 payload_size는
+        빈 공간에서 추측한 값이므로 레코드 크기와 맞을 때만 rowid를 사용한다.
+        serial_types를 주면 헤더가 지워진 레코드로 보고 헤더를 읽지 않는다 (헤더 크기는 position부터 본문 전까지).
+        """
+        record = self._decode_values(pages, position, limit, payload_size, trusted, schema, serial_types)
+        if record is None:
+            return None
+        schema, values, truncated, record_end, size_matches = record
+        if not size_matches:
+            rowid = None
+
+        # 빈 공간에서는 NULL과 작은 정수, 0으로 채워진 바이트로 된 우연한 헤더가 많으므로
+        # NUL 문자가 없는 텍스트가 있는 레코드만 인정
+        if not trusted:
+            texts = [value for value in values if isinstance(value, str)]
+            if not any(texts) or any("\x00" in text for text in texts):
+                return None
+
+        if schema.rowid_column is not None:
+            if rowid is not None and self._is_live(schema, rowid):
+                return None, record_end  # 살아 있는 레코드
+            values[schema.rowid_column] = rowid
+        fingerprint = self._fingerprint(schema, values)
+        if rowid is None and self._is_live_copy(schema, fingerprint):
+            return None, record_end  # 페이지 재배치 등으로 빈 공간에 남은 살아 있는 레코드의 사본
+        if not self._mark_seen(schema, fingerprint, rowid):
+            return None, record_end
+        return CarvedRecord(schema.name, schema.columns, source, page_number, position - page_start, rowid,
+                            tuple(values), truncated), record_end
+
+    def _decode_values(self, pages, position, limit, payload_size, trusted, schema=None, serial_types=None):
+        """position의 레코드 헤더와 값을 읽어 (스키마, 값 목록, 잘림 여부, 레코드 끝 위치, payload 크기 일치 여부) 반환
+
+        스키마와 맞지 않거나 limit를 벗어나면 None을 반환한다 (trusted이면 payload 크기가 다를 때도 None).
+        """
+        buffer = pages.buffer
+        if serial_types is None:
+            header_size = buffer[position] if position < limit else 0
+            if header_size < 2 or header_size >= 0x80:
+                return None
+            header_end = position + header_size
+            serial_types = []
+            offset = position + 1
+            while offset < header_end:
+                result = read_varint(buffer, offset, header_end)
+                if result is None:
+                    return None
+                serial_type, offset = result
+                serial_types.append(serial_type)
+            if offset != header_end:
+                return None
+        else:
+            header_size = 1 + sum(varint_size(serial_type) for serial_type in serial_types)
+
+        if schema is None:
+            schema = next((schema for schema in self.schemas if record_matches(schema, serial_types)), None)
+            if schema is None:
+                return None
+        elif not record_matches(schema, serial_types):
+            return None
+
+        body_size = sum(serial_type_size(serial_type) for serial_type in serial_types)
+        record_size = header_size + body_size
+        size_matches = payload_size is None or payload_size == record_size
+        if trusted and not size_matches:
+            return None
+
+        local = local_payload_size(record_size, self.usable_size)
+        record_end = position + local + (4 if local < record_size else 0)
+        if record_end > limit:
+            return None
+        payload = bytes(buffer[position:position + local])
+        truncated = False
+        if local < record_size:
+            overflow_page = struct.unpack(">I", buffer[position + local:record_end])[0]
+            overflow = self._read_overflow(pages, overflow_page, record_size - local)
+            truncated = len(overflow) < record_size - local
+            payload += overflow
+
+        values = []
+        offset = header_size
+        try:
+            for serial_type in serial_types:
+                if offset > len(payload):
+                    values.append(None)
+                    continue
+                values.append(decode_value(payload, offset, serial_type, self.encoding, not truncated))
+                offset += serial_type_size(serial_type)
+        except (ValueError, struct.error):
+            return None
+        return schema, values, truncated, record_end, size_matches
+
+    def _fingerprint(self, schema, values):
+        """rowid 열을 제외한 값의 해시 (rowid를 모르는 레코드의 중복 판별용)"""
+        return hash(tuple(value for column, value in enumerate(values) if column != schema.rowid_column))
+
+    def _is_live(self, schema, rowid):
+        """rowid가 살아 있는 상태(커밋된 WAL 포함)의 테이블 b-tree에 있는지 (루트부터 이진 탐색)"""
+        page_number = schema.root_page
+        visited = set()
+        while page_number not in visited:
+            visited.add(page_number)
+            location = self._live_page(page_number)
+            if location is None:
+                return False
+            pages, start = location
+            buffer = pages.buffer
+            header = start + (100 if page_number == 1 else 0)
+            page_type = buffer[header]
+            if page_type not in (TABLE_LEAF, TABLE_INTERIOR):
+                return False
+            cell_count = struct.unpack(">H", buffer[header + 3:header + 5])[0]
+            pointers = header + (8 if page_type == TABLE_LEAF else 12)
+            page_end = start + self.usable_size
+            low, high = 0, cell_count
+            while low < high:
+                middle = (low + high) // 2
+                cell = start + struct.unpack(">H", buffer[pointers + middle * 2:pointers + middle * 2 + 2])[0]
+                if page_type == TABLE_LEAF:
+                    result = read_varint(buffer, cell, page_end)  # payload 크기
+                    result = read_varint(buffer, result[1], page_end) if result is not None else None
+                else:
+                    result = read_varint(buffer, cell + 4, page_end)
+                if result is None:
+                    return False
+                if result[0] < rowid:
+                    low = middle + 1
+                else:
+                    high = middle
+            if page_type == TABLE_LEAF:
+                if low == cell_count:
+                    return False
+                cell = start + struct.unpack(">H", buffer[pointers + low * 2:pointers + low * 2 + 2])[0]
+                result = read_varint(buffer, cell, page_end)
+                result = read_varint(buffer, result[1], page_end) if result is not None else None
+                return result is not None and result[0] == rowid
+            # 내부 페이지: 키가 rowid 이상인 첫 셀의 왼쪽 자식, 없으면 가장 오른쪽 자식
+            if low == cell_count:
+                page_number = struct.unpack(">I", buffer[header + 8:header + 12])[0]
+            else:
+                cell = start + struct.unpack(">H", buffer[pointers + low * 2:pointers + low * 2 + 2])[0]
+                page_number = struct.unpack(">I", buffer[cell:cell + 4])[0]
+        return False
+
+    def _iter_live_values(self, schema):
+        """살아 있는 상태(커밋된 WAL 포함)의 테이블 b-tree를 따라가 행의 값 목록을 하나씩 내보냄"""
+        stack = [schema.root_page]
+        visited = set()
+        while stack:
+            page_number = stack.pop()
+            if page_number in visited:
+                continue
+            visited.add(page_number)
+            location = self._live_page(page_number)
+            if location is None:
+                continue
+            pages, start = location
+            buffer = pages.buffer
+            header = start + (100 if page_number == 1 else 0)
+            page_type = buffer[header]
+            cell_count = struct.unpack(">H", buffer[header + 3:header + 5])[0]
+            page_end = start + self.usable_size
+            if page_type == TABLE_INTERIOR:
+                stack.append(struct.unpack(">I", buffer[header + 8:header + 12])[0])
+                for index in range(cell_count):
+                    pointer = header + 12 + index * 2
+                    cell = start + struct.unpack(">H", buffer[pointer:pointer + 2])[0]
+                    if cell + 4 <= page_end:
+                        stack.append(struct.unpack(">I", buffer[cell:cell + 4])[0])
+            elif page_type == TABLE_LEAF:
+                for index in range(cell_count):
+                    pointer = header + 8 + index * 2
+                    cell = start + struct.unpack(">H", buffer[pointer:pointer + 2])[0]
+                    result = read_varint(buffer, cell, page_end)
+                    if result is None:
+                        continue
+                    payload_size, position = result
+                    result = read_varint(buffer, position, page_end)
+                    if result is None:
+                        continue
+                    record = self._decode_values(pages, result[1], page_end, payload_size, True, schema)
+                    if record is not None:
+                        yield record[1]
+
+    def _is_live_copy(self, schema, fingerprint):
+        """살아 있는 레코드 중 rowid 열을 뺀 값이 같은 것이 있는지
+
+        지문은 테이블마다 처음 필요할 때 한 번 훑어 임시 DB에 나눠 넣는다.
+        """
+        if schema.name not in self._live_loaded:
+            self._live_loaded.add(schema.name)
+            batch = []
+            for values in self._iter_live_values(schema):
+                batch.append((schema.name, self._fingerprint(schema, values)))
+                if len(batch) >= FINGERPRINT_BATCH_SIZE:
+                    self._add_live_fingerprints(batch)
+                    batch = []
+            self._add_live_fingerprints(batch)
+        return self.fingerprints.execute(
+            "SELECT 1 FROM LiveFingerprint WHERE TableName = ? AND Fingerprint = ?;",
+            (schema.name, fingerprint)).fetchone() is not None
+
+    def _add_live_fingerprints(self, rows):
+        self.fingerprints.executemany(
+            "INSERT OR IGNORE INTO LiveFingerprint (TableName, Fingerprint) VALUES (?, ?);", rows)
+
+    def _mark_seen(self, schema, fingerprint, rowid):
+        """처음 찾은 레코드면 기록하고 True, 이미 내보낸 레코드의 사본이면 False
+
+        rowid가 다르면 같은 값이라도 다른 레코드로 본다 (처음 찾은 rowid와 비교).
+        """
+        row = self.fingerprints.execute(
+            "SELECT RowId FROM SeenRecord WHERE TableName = ? AND Fingerprint = ?;",
+            (schema.name, fingerprint)).fetchone()
+        if row is None:
+            self.fingerprints.execute("INSERT INTO SeenRecord (TableName, Fingerprint, RowId) VALUES (?, ?, ?);",
+                                      (schema.name, fingerprint, rowid))
+            return True
+        return rowid is not None and row[0] != rowid
+
+    def _read_overflow(self, pages, page_number, size):
+        """오버플로 페이지 체인에서 size 바이트를 읽음 (체인이 끊기면 읽은 만큼만 반환)"""
+        chunks = []
+        remaining = size
+        visited = set()
+        while remaining > 0 and page_number and page_number not in visited:
+            visited.add(page_number)
+            start = pages.page_offset(page_number)
+            if start is None and pages is not self.main:
+                start = self.main.page_offset(page_number)
+                buffer = self.db
+            else:
+                buffer = pages.buffer
+            if start is None:
+                break
+            chunk = bytes(buffer[start + 4:start + min(self.usable_size, 4 + remaining)])
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            page_number = struct.unpack(">I", buffer[start:start + 4])[0]
+        return b"".join(chunks)
+
+def carve_records(db_path, batch_size=CARVE_BATCH_SIZE, should_stop=None, progress=None):
+    """삭제된 레코드를 batch_size개씩 묶어 내보내는 제너레이터"""
+    carver = Carver(db_path)
+    try:
+        batch = []
+        for record in carver.iter_records(should_stop, progress):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        carver.close()
@@ -0,0 +1,339 @@
+#case_cache.py
+
+# 케이스 보조 캐시 DB
+#
+# 원본 Recall 스키마에는 우리 조회 방식에 맞는 색인이 없고, 증거 파일에 색인을 추가할 수도 없다.
+# "케이스 색인" 단계에서 한 번 원본을 읽어 사용자 캐시 디렉토리에 별도 SQLite를 만든다.
+# - Capture: 캡처당 한 행으로 관련 App/File/Web 값을 미리 합친 표 (조인 없이 읽음)
+# - CaptureApp: 앱 이름별 캡처 (앱 + 시간 범위 조회용)
+# - TimeBucket / AppTimeBucket: 여러 해상도의 시간 구간별 캡처 수
+# - TimeStamp, 이미지 있는 캡처의 TimeStamp, WindowTitle, 앱 색인
+# 원본 ukg.db(와 -wal)의 크기/수정 시각이 같으면 그대로 쓰고, 수정 시각만 바뀌었으면 표본 지문을 비교해
+# 내용이 같을 때 다시 만들지 않는다. 증거 파일은 수 GB일 수 있으므로 지문은 파일 전체가 아니라
+# SQLite 헤더(변경 카운터, 페이지 수)와 앞/뒤 페이지, -wal 헤더(salt)와 끝 프레임만 해시한다.
+# SQLite가 쓰는 변경은 이 중 하나를 반드시 바꾸며, 가운데 바이트만 직접 고친 파일은 구분하지 못한다.
+
+from PySide6.QtCore import QThread, Signal, QStandardPaths
+from connection import open_readonly, readonly_uri, close_connections
+from queries import CaptureQuery, iter_capture_batches, fetch_time_bounds, SORT_CACHE_SCHEMA
+import hashlib
+import os
+import sqlite3
+import struct
+
+CACHE_VERSION = 2
+
+# 시간 구간 해상도 (밀리초): 1분, 10분, 1시간, 1일
+BUCKET_RESOLUTIONS = (60 * 1000, 10 * 60 * 1000, 60 * 60 * 1000, 24 * 60 * 60 * 1000)
+
+# 관련 값 묶음을 한 칸에 저장할 때의 구분자
+RELATION_SEPARATOR = "\x1f"
+
+# 표본 지문에 넣는 DB 앞/뒤 페이지 수와 -wal 끝 프레임 수
+DIGEST_PAGES = 64
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+
+CACHE_SCHEMA = """
+CREATE TABLE CacheInfo (Key TEXT PRIMARY KEY, Value);
+CREATE TABLE Capture (
+    Id INTEGER PRIMARY KEY,
+    Name TEXT,
+    ImageToken TEXT,
+    WindowTitle TEXT,
+    AppName TEXT,
+    TimeStamp INTEGER,
+    FilePath TEXT,
+    WebUri TEXT
+);
+CREATE TABLE CaptureApp (
+    AppName TEXT NOT NULL,
+    TimeStamp INTEGER,
+    CaptureId INTEGER NOT NULL
+);
+CREATE TABLE CaptureSortKey (
+    Id INTEGER PRIMARY KEY,
+    AppName TEXT NOT NULL,
+    FilePath TEXT NOT NULL,
+    WebUri TEXT NOT NULL
+);
+CREATE TABLE TimeBucket (
+    Resolution INTEGER NOT NULL,
+    Bucket INTEGER NOT NULL,
+    Count INTEGER NOT NULL,
+    PRIMARY KEY (Resolution, Bucket)
+) WITHOUT ROWID;
+CREATE TABLE AppTimeBucket (
+    Resolution INTEGER NOT NULL,
+    AppName TEXT NOT NULL,
+    Bucket INTEGER NOT NULL,
+    Count INTEGER NOT NULL,
+    PRIMARY KEY (Resolution, AppName, Bucket)
+) WITHOUT ROWID;
+"""
+
+# 적재가 끝난 뒤 만드는 색인
+CACHE_INDEXES = """
+CREATE INDEX CaptureTime ON Capture (TimeStamp, Id);
+CREATE INDEX ImageCaptureTime ON Capture (TimeStamp, Id, WindowTitle, ImageToken) WHERE ImageToken IS NOT NULL;
+CREATE INDEX CaptureWindowTitle ON Capture (WindowTitle COLLATE NOCASE);
+CREATE INDEX CaptureAppTime ON CaptureApp (AppName, TimeStamp);
+CREATE INDEX SortKeyAppName ON CaptureSortKey (AppName, Id);
+CREATE INDEX SortKeyFilePath ON CaptureSortKey (FilePath, Id);
+CREATE INDEX SortKeyWebUri ON CaptureSortKey (WebUri, Id);
+"""
+
+BUCKET_QUERIES = (
+    """INSERT INTO TimeBucket (Resolution, Bucket, Count)
+    SELECT ?1, TimeStamp / ?1, COUNT(*) FROM Capture WHERE TimeStamp IS NOT NULL GROUP BY 2;""",
+    """INSERT INTO AppTimeBucket (Resolution, AppName, Bucket, Count)
+    SELECT ?1, AppName, TimeStamp / ?1, COUNT(*) FROM CaptureApp WHERE TimeStamp IS NOT NULL GROUP BY 2, 3;""",
+)
+
+# ImageTableWidget용 조회 (원본 쿼리와 같은 (Timestamp, WindowTitle, ImageToken, Id) 행)
+CACHED_IMAGES_QUERY = """
+SELECT TimeStamp, WindowTitle, ImageToken, Id
+FROM Capture
+WHERE ImageToken IS NOT NULL {where}
+ORDER BY TimeStamp, Id;
+"""
+# QueryThread가 캐시를 {schema}로 ATTACH한 연결에서 쓰는 시간 범위 조회
+CACHED_TIME_BOUNDS_QUERY = """
+SELECT
+    (SELECT TimeStamp FROM {schema}.Capture WHERE TimeStamp IS NOT NULL ORDER BY TimeStamp ASC, Id ASC LIMIT 1),
+    (SELECT TimeStamp FROM {schema}.Capture WHERE TimeStamp IS NOT NULL ORDER BY TimeStamp DESC, Id DESC LIMIT 1);
+"""
+
+def default_cache_dir():
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not location:
+        location = os.path.join(os.path.expanduser("~"), ".cache", "arbiter")
+    return os.path.join(location, "case_cache")
+
+def cache_path_for(db_path, cache_dir=None):
+    """원본 DB 경로별 캐시 DB 경로"""
+    case_key = hashlib.sha1(os.path.abspath(db_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir or default_cache_dir(), case_key + ".db")
+
+def source_fingerprint(db_path):
+    """원본 ukg.db와 -wal의 (크기, 수정 시각) 목록 (-wal이 없으면 (0, 0))"""
+    fingerprint = {}
+    for name, path in (("db", db_path), ("wal", db_path + "-wal")):
+        try:
+            stat = os.stat(path)
+            fingerprint[name + "_size"] = stat.st_size
+            fingerprint[name + "_mtime"] = stat.st_mtime_ns
+        except OSError:
+            fingerprint[name + "_size"] = fingerprint[name + "_mtime"] = 0
+    return fingerprint
+
+def source_digest(db_path):
+    """원본 ukg.db와 -wal의 표본 sha256 (크기, 앞부분, 끝부분만 읽음)
+
+    DB는 헤더를 포함한 앞 DIGEST_PAGES 페이지와 끝 DIGEST_PAGES 페이지, -wal은 헤더와 끝 DIGEST_PAGES 프레임을 읽는다.
+    """
+    digest = hashlib.sha256()
+    page_size = 4096
+    for name, path in (("db", db_path), ("wal", db_path + "-wal")):
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as source:
+            size = os.fstat(source.fileno()).st_size
+            if name == "db":
+                header = source.read(100)
+                if len(header) >= 18:
+                    value = struct.unpack(">H", header[16:18])[0]
+                    page_size = 65536 if value == 1 else value or page_size
+                head = tail = DIGEST_PAGES * page_size
+            else:
+                head = WAL_HEADER_SIZE
+                tail = DIGEST_PAGES * (WAL_FRAME_HEADER_SIZE + page_size)
+            digest.update(f"{name}:{size}:".encode("ascii"))
+            source.seek(0)
+            digest.update(source.read(min(head, size)))
+            tail_start = max(head, size - tail)
+            if tail_start < size:
+                source.seek(tail_start)
+                digest.update(source.read(size - tail_start))
+    return digest.hexdigest()
+
+def read_cache_info(cache_path):
+    """캐시 DB의 CacheInfo를 dict로 반환 (없거나 읽을 수 없으면 None)"""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        conn = sqlite3.connect(readonly_uri(cache_path, immutable=False), uri=True)
+        try:
+            return dict(conn.execute("SELECT Key, Value FROM CacheInfo;"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+def _is_current(info, db_path, fingerprint):
+    return (
+        info is not None
+        and info.get("version") == CACHE_VERSION
+        and info.get("source_path") == os.path.abspath(db_path)
+        and all(info.get(key) == value for key, value in fingerprint.items())
+    )
+
+def valid_cache_path(db_path, cache_dir=None):
+    """원본과 크기/수정 시각이 일치하는 캐시 DB 경로, 없으면 None (내용 해시는 계산하지 않음)"""
+    cache_path = cache_path_for(db_path, cache_dir)
+    if _is_current(read_cache_info(cache_path), db_path, source_fingerprint(db_path)):
+        return cache_path
+    return None
+
+def join_relation(values):
+    return RELATION_SEPARATOR.join(str(value) for value in values) if values else None
+
+def sort_key_value(values):
+    """queries.SORT_EXPRESSIONS의 IFNULL(MIN(...), '')과 같은 정렬 키 (str 비교는 UTF-8 BINARY 비교와 순서가 같음)"""
+    return min((value for value in values if value is not None), default="")
+
+def split_relation(text):
+    """저장한 관련 값 문자열을 CAPTURE_HEADERS 행과 같은 튜플로 되돌림"""
+    return tuple(text.split(RELATION_SEPARATOR)) if text else ()
+
+def build_case_cache(db_path, cache_dir=None, progress=None, should_stop=None):
+    """캐시 DB를 만들거나 재사용하고 경로를 반환 (중단하면 None)
+
+    progress(단계 이름, 처리한 캡처 수, 전체)는 적재 중에 호출된다.
+    """
+    cache_path = cache_path_for(db_path, cache_dir)
+    fingerprint = source_fingerprint(db_path)
+    info = read_cache_info(cache_path)
+    if _is_current(info, db_path, fingerprint):
+        return cache_path
+
+    # 수정 시각만 바뀐 사본이면 표본 지문으로 확인하고 다시 만들지 않음
+    digest = source_digest(db_path)
+    if (info is not None and info.get("version") == CACHE_VERSION
+            and info.get("db_size") == fingerprint["db_size"] and info.get("wal_size") == fingerprint["wal_size"]
+            and info.get("digest") == digest):
+        close_connections(cache_path)
+        conn = sqlite3.connect(cache_path)
+        try:
+            conn.executemany("INSERT OR REPLACE INTO CacheInfo (Key, Value) VALUES (?, ?);",
+                             [("source_path", os.path.abspath(db_path))] + list(fingerprint.items()))
+            conn.commit()
+        finally:
+            conn.close()
+        return cache_path
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    source = open_readonly(db_path)
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF;")
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.executescript(CACHE_SCHEMA)
+        total = source.execute("SELECT COUNT(*) FROM WindowCapture;").fetchone()[0]
+        done = 0
+        for rows in iter_capture_batches(source, CaptureQuery(sort_column="TimeStamp")):
+            conn.executemany(
+                "INSERT INTO Capture (Id, Name, ImageToken, WindowTitle, AppName, TimeStamp, FilePath, WebUri) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+                [(capture_id, name, image_token, window_title, join_relation(apps), timestamp,
+                  join_relation(files), join_relation(uris))
+                 for capture_id, name, image_token, window_title, apps, timestamp, files, uris in rows],
+            )
+            conn.executemany(
+                "INSERT INTO CaptureApp (AppName, TimeStamp, CaptureId) VALUES (?, ?, ?);",
+                [(app_name, row[5], row[0]) for row in rows for app_name in row[4]],
+            )
+            conn.executemany(
+                "INSERT INTO CaptureSortKey (Id, AppName, FilePath, WebUri) VALUES (?, ?, ?, ?);",
+                [(row[0], sort_key_value(row[4]), sort_key_value(row[6]), sort_key_value(row[7])) for row in rows],
+            )
+            done += len(rows)
+            if progress is not None:
+                progress("캡처 적재", done, total)
+            if should_stop is not None and should_stop():
+                conn.close()
+                os.remove(temp_path)
+                return None
+
+        if progress is not None:
+            progress("색인 생성", done, total)
+        conn.executescript(CACHE_INDEXES)
+        for resolution in BUCKET_RESOLUTIONS:
+            for query in BUCKET_QUERIES:
+                conn.execute(query, (resolution,))
+        conn.executemany(
+            "INSERT INTO CacheInfo (Key, Value) VALUES (?, ?);",
+            [("version", CACHE_VERSION), ("source_path", os.path.abspath(db_path)), ("digest", digest)]
+            + list(fingerprint.items()),
+        )
+        conn.commit()
+        conn.execute("ANALYZE;")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(temp_path)
+        raise
+    finally:
+        source.close()
+    conn.close()
+
+    # 이전 캐시에 열려 있는 공유 연결을 닫고 교체
+    close_connections(cache_path)
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+def fetch_cached_time_bounds(cursor, schema=SORT_CACHE_SCHEMA):
+    """QueryThread용: 원본 연결에 ATTACH한 캐시의 TimeStamp 색인 양 끝으로 (최소, 최대) 조회
+
+    캐시를 ATTACH하지 못한 연결이면 원본에서 조회한다.
+    """
+    try:
+        cursor.execute(CACHED_TIME_BOUNDS_QUERY.format(schema=schema))
+    except sqlite3.OperationalError:
+        return fetch_time_bounds(cursor)
+    return cursor.fetchone()
+
+def bucket_counts(cursor, resolution, start_time=None, end_time=None, app_name=None):
+    """resolution 구간별 캡처 수 [(구간 시작 밀리초, 개수), ...] 반환 (app_name이 있으면 그 앱만)"""
+    clauses = ["Resolution = ?"]
+    params = [resolution]
+    if app_name is not None:
+        clauses.append("AppName = ?")
+        params.append(app_name)
+    if start_time is not None:
+        clauses.append("Bucket >= ?")
+        params.append(start_time // resolution)
+    if end_time is not None:
+        clauses.append("Bucket <= ?")
+        params.append(end_time // resolution)
+    table = "AppTimeBucket" if app_name is not None else "TimeBucket"
+    cursor.execute(
+        f"SELECT Bucket, Count FROM {table} WHERE {' AND '.join(clauses)} ORDER BY Bucket;", params)
+    return [(bucket * resolution, count) for bucket, count in cursor.fetchall()]
+
+# 케이스 캐시를 만드는 스레드
+class CaseCacheThread(QThread):
+    progress = Signal(str, int, int)  # 단계, 처리한 캡처 수, 전체
+    cache_ready = Signal(str, str)  # 원본 DB 경로, 캐시 DB 경로
+    cache_failed = Signal(str)
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+        self._cancelled = False
+
+    def run(self):
+        try:
+            cache_path = build_case_cache(self.db_path, progress=self.progress.emit,
+                                          should_stop=lambda: self._cancelled)
+        except Exception as e:
+            self.cache_failed.emit(str(e))
+            return
+        if cache_path is not None:
+            self.cache_ready.emit(self.db_path, cache_path)
+
+    def cancel(self):
+        self._cancelled = True
@@ -0,0 +1,182 @@
+#case_model.py
+
+from PySide6.QtCore import Qt, QModelIndex, QThread, Signal
+from array import array
+from collections import Counter
+from database import CaptureTableModel, GAP_MARKER_COLOR
+from queries import DEFAULT_TIMEZONE, CAPTURE_HEADERS, CaptureQuery
+from workspace import ingest_case, merge_case
+import os
+
+# 여러 DB를 프로세스 풀에서 읽고 TimeStamp 순으로 병합하는 스레드
+class CaseLoadThread(QThread):
+    progress = Signal(int, int)  # 읽은 DB 수, 전체
+    case_loaded = Signal(object, object, object)  # 병합한 행, 행별 출처 index, {index: IngestResult}
+
+    def __init__(self, sources, workers=None):
+        super().__init__()
+        self.sources = sources
+        self.workers = workers
+
+    def run(self):
+        results = ingest_case(self.sources, self.workers, progress=self.progress.emit)
+        rows, row_sources = merge_case(self.sources, results)
+        self.case_loaded.emit(rows, row_sources, results)
+
+class CaseTableModel(CaptureTableModel):
+    """여러 DB를 병합한 케이스 타임라인 모델
+
+    행은 전부 메모리에 두고(load_case), 정렬과 필터는 보이는 행 번호 목록(_order)만 바꾼다.
+    Source 열에는 캡처가 들어 있던 DB(스냅샷)의 이름을 표시한다.
+    """
+
+    HEADERS = CAPTURE_HEADERS + ["Source", "이미지"]
+
+    def __init__(self, sources, tz=DEFAULT_TIMEZONE, query=None):
+        super().__init__(tz)
+        self.sources = sources
+        self.query = query or CaptureQuery(sort_column="TimeStamp")
+        self.reports = {}  # source.index → DeletionReport
+        self.errors = {}  # source.index → 오류 메시지
+        self._row_sources = []  # 행별 출처 index 튜플
+        self._order = array("q")  # 보이는 행 → 저장된 행
+        self._sort = (self.headers.index("TimeStamp"), False)
+        self._gap_source = None  # 공백 표시 대상 DB의 index
+
+    def load_case(self, rows, row_sources, results):
+        """CaseLoadThread 결과를 모델에 채우고 첫 페이지 신호를 보냄"""
+        self.beginResetModel()
+        self._clear_rows()
+        labels = [source.label for source in self.sources]
+        self._append_rows([
+            row + (", ".join(labels[index] for index in indexes),)
+            for row, indexes in zip(rows, row_sources)
+        ])
+        self._row_sources = row_sources
+        self.reports = {index: result.report for index, result in results.items() if result.report}
+        self.errors = {index: result.error for index, result in results.items() if result.error}
+        self._order = self._filtered_rows()
+        self._sort_order()
+        self.endResetModel()
+
+        timestamps = [value for value in self._columns[self._timestamp_column] if value >= 0]
+        self.time_bounds_loaded.emit(min(timestamps, default=None), max(timestamps, default=None))
+        self.page_loaded.emit(self.rowCount())
+
+    def rowCount(self, index=QModelIndex()):
+        return 0 if index.isValid() else len(self._order)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = self._order[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.column()](row)
+        if role == Qt.ItemDataRole.UserRole:
+            return self._raw[index.column()](row)
+        if self._gap_markers and role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ToolTipRole):
+            if self._gap_source not in self._row_sources[row]:
+                return None  # 같은 Id라도 다른 DB의 캡처
+            marker = self._gap_markers.get(self._columns[self._id_column][row])
+            if marker is None:
+                return None
+            return GAP_MARKER_COLOR if role == Qt.ItemDataRole.BackgroundRole else marker
+        return None
+
+    def source_for_row(self, row):
+        """행의 첫 출처 CaseSource"""
+        return self.sources[self._row_sources[self._order[row]][0]]
+
+    def db_path_for_row(self, row):
+        return self.source_for_row(row).db_path
+
+    def image_path(self, row):
+        """출처 DB들의 ImageStore 중 이미지 파일이 남아 있는 첫 경로"""
+        stored = self._order[row]
+        image_token = self._columns[self._image_token_column][stored]
+        if not image_token:
+            return None
+        paths = [os.path.join(self.sources[index].image_dir, image_token) for index in self._row_sources[stored]]
+        for path in paths:
+            if os.path.exists(path):
+                return path
+        return paths[0]
+
+    def set_gap_source(self, source_index):
+        """source_index DB의 Id 공백 분석 결과로 공백 표시를 바꿈"""
+        self._gap_source = source_index
+        report = self.reports.get(source_index)
+        if report is not None:
+            self.set_gap_markers(report)
+
+    def request_deletion_analysis(self):
+        """분석은 로드할 때 DB마다 끝나 있으므로 공백 표시 대상 DB의 결과를 바로 알림"""
+        report = self.reports.get(self._gap_source)
+        if report is not None:
+            self.deletion_analyzed.emit(report)
+
+    def locate_capture(self, capture_id):
+        """공백 표시 대상 DB에서 온 캡처 Id의 행을 찾아 capture_located로 알림"""
+        ids = self._columns[self._id_column]
+        for row, stored in enumerate(self._order):
+            if ids[stored] == capture_id and self._gap_source in self._row_sources[stored]:
+                self.capture_located.emit(row)
+                return
+        self.capture_located.emit(-1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """메모리 안에서 보이는 행 순서만 정렬"""
+        self._sort = (column, order == Qt.SortOrder.DescendingOrder)
+        self.layoutAboutToBeChanged.emit()
+        self._sort_order()
+        self.layoutChanged.emit()
+
+    def _sort_order(self):
+        column, descending = self._sort
+        # 병합 순서(TimeStamp 오름차순)는 이미 정렬돼 있음
+        if column == self._timestamp_column and not descending:
+            self._order = array("q", sorted(self._order))
+            return
+        self._order = array("q", sorted(self._order, key=self._raw[column], reverse=descending))
+
+    def set_query(self, query):
+        """텍스트/앱/시간 조건으로 보이는 행을 다시 고름"""
+        self.query = query
+        self.beginResetModel()
+        self._order = self._filtered_rows()
+        self._sort_order()
+        self.endResetModel()
+        self.page_loaded.emit(self.rowCount())
+
+    def _filtered_rows(self, include_app=True):
+        query = self.query
+        names = self._columns[CAPTURE_HEADERS.index("Name")]
+        titles = self._columns[CAPTURE_HEADERS.index("WindowTitle")]
+        apps = self._columns[CAPTURE_HEADERS.index("AppName")]
+        timestamps = self._columns[self._timestamp_column]
+        text = query.text.casefold()
+        app_name = query.app_name if include_app else None
+
+        rows = array("q")
+        for row in range(self._row_count):
+            if text and text not in (titles[row] or "").casefold() and text not in (names[row] or "").casefold():
+                continue
+            if app_name is not None:
+                if app_name == CaptureQuery.NO_APP:
+                    if apps[row]:
+                        continue
+                elif app_name not in apps[row]:
+                    continue
+            if query.start_time is not None and timestamps[row] < query.start_time:
+                continue
+            if query.end_time is not None and timestamps[row] > query.end_time:
+                continue
+            rows.append(row)
+        return rows
+
+    def request_facets(self):
+        """현재 조건(앱 필터 제외)으로 App.Name별 캡처 수를 계산"""
+        apps = self._columns[CAPTURE_HEADERS.index("AppName")]
+        counts = Counter()
+        for row in self._filtered_rows(include_app=False):
+            for name in apps[row] or (None,):
+                counts[name] += 1
+        self.facets_loaded.emit(counts.most_common())
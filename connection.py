@@ -0,0 +1,146 @@
+#connection.py
+
+# 증거 DB를 읽기 전용으로 여는 공용 연결 관리자
+#
+# 모든 모듈은 sqlite3.connect 대신 이 모듈을 통해 DB를 연다.
+# - file:...?mode=ro&immutable=1 URI로 열어 원본 파일과 옆의 -wal/-shm 파일을 절대 건드리지 않음
+# - 스레드마다 하나의 연결을 케이스(DB 경로)별로 재사용 (스키마 파싱, 준비된 문장 캐시 재사용)
+# - mmap_size / cache_size 등 읽기 위주 PRAGMA 적용
+# - 실시간 따라가기(follow_database) 중인 DB는 immutable 없이 열어 -wal 내용과 이후 변경을 반영
+
+import os
+import sqlite3
+import threading
+import weakref
+from urllib.request import pathname2url
+from instrumentation import get_logger, log_fields
+
+logger = get_logger("connection")
+
+# 연결마다 캐시하는 준비된 문장 수 (sqlite3 기본값 128)
+STATEMENT_CACHE_SIZE = 256
+# 메모리 매핑 크기 (바이트)
+MMAP_SIZE = 256 * 1024 * 1024
+# 페이지 캐시 크기 (KiB, 음수는 KiB 단위를 뜻함)
+CACHE_SIZE_KIB = 64 * 1024
+
+READONLY_PRAGMAS = (
+    "PRAGMA query_only = ON;",
+    f"PRAGMA mmap_size = {MMAP_SIZE};",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB};",
+    "PRAGMA temp_store = MEMORY;",
+)
+
+# 약한 참조로 추적할 수 있도록 만든 연결 클래스
+class ReadOnlyConnection(sqlite3.Connection):
+    pass
+
+def readonly_uri(db_path, immutable=True):
+    """DB 경로를 읽기 전용 SQLite URI로 변환"""
+    uri = "file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+def has_wal(db_path):
+    """DB 옆에 내용이 있는 -wal 파일이 있는지 여부"""
+    wal_path = db_path + "-wal"
+    return os.path.exists(wal_path) and os.path.getsize(wal_path) > 0
+
+def open_readonly(db_path, immutable=True):
+    """읽기 전용 연결을 새로 연다 (호출한 쪽에서 close)
+
+    immutable 모드에서는 -wal 파일의 내용이 반영되지 않는다. 파일이 계속 바뀌는 사본을
+    따라가야 할 때는 immutable=False로 연다.
+    """
+    if not os.path.isfile(db_path):
+        raise sqlite3.OperationalError(f"DB 파일을 찾을 수 없습니다: {db_path}")
+    conn = sqlite3.connect(
+        readonly_uri(db_path, immutable),
+        uri=True,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,  # 연결은 만든 스레드에서만 쓰되, 종료 시 다른 스레드에서 닫을 수 있도록
+        factory=ReadOnlyConnection,
+    )
+    for pragma in READONLY_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class ConnectionManager:
+    """DB 하나에 대한 스레드별 읽기 전용 연결 관리
+
+    connection()은 호출한 스레드 전용 연결을 돌려주며, 스레드가 끝나면 연결도 함께 정리된다.
+    """
+
+    def __init__(self, db_path, immutable=True):
+        self.db_path = db_path
+        self.immutable = immutable
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._lock = threading.Lock()
+        if immutable and has_wal(db_path):
+            logger.warning("-wal 파일의 내용은 읽기 전용(immutable) 모드에서 반영되지 않습니다",
+                           extra=log_fields(db_path=db_path))
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = open_readonly(self.db_path, self.immutable)
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    def cursor(self):
+        return self.connection().cursor()
+
+    def close_all(self):
+        """모든 스레드의 연결을 닫음 (케이스를 닫을 때)"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+# DB 경로별로 하나의 관리자를 공유
+_managers = {}
+_managers_lock = threading.Lock()
+# 실시간 따라가기 중인 DB 경로 (절대 경로)
+_followed = set()
+
+def get_connection_manager(db_path):
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = ConnectionManager(db_path, immutable=key not in _followed)
+        return manager
+
+def get_connection(db_path):
+    """현재 스레드에서 db_path에 대해 재사용하는 읽기 전용 연결"""
+    return get_connection_manager(db_path).connection()
+
+def close_connections(db_path):
+    """db_path의 공유 연결을 모두 닫고 관리자를 제거"""
+    with _managers_lock:
+        manager = _managers.pop(os.path.abspath(db_path), None)
+    if manager is not None:
+        manager.close_all()
+
+def follow_database(db_path, enabled=True):
+    """db_path의 따라가기 모드를 켜거나 끔
+
+    계속 다시 동기화되는 사본은 immutable 모드로 읽으면 바뀐 페이지를 반영하지 못하므로,
+    따라가는 동안은 immutable 없이 연다. 이미 열린 공유 연결은 닫아서 다음 조회부터 새 모드로 열린다.
+    """
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        if enabled:
+            _followed.add(key)
+        else:
+            _followed.discard(key)
+    close_connections(db_path)
+
+def is_followed(db_path):
+    return os.path.abspath(db_path) in _followed
@@ -1,65 +1,477 @@
 #database.py
 
-from PySide6.QtCore import QAbstractTableModel, Qt
-from datetime import datetime, timedelta, timezone
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QThread, Signal
+from PySide6.QtGui import QColor
+from queries import DEFAULT_TIMEZONE, PAGE_SIZE, CAPTURE_HEADERS, CaptureQuery, convert_unix_timestamp, \
+    fetch_capture_page, fetch_aggregated_page, count_captures_by_app, fetch_time_bounds, format_related, \
+    fetch_new_captures, SORT_CACHE_SCHEMA
+from connection import open_readonly, readonly_uri, is_followed
+from deletion_analysis import find_id_gaps
+from thumbnail_cache import image_dir_for_db
+from case_cache import valid_cache_path, fetch_cached_time_bounds
+from instrumentation import get_logger, log_fields
+from instrumentation import STATS, result_rows
+import os
+import queue
 import sqlite3
+import time
+from array import array
 
-def convert_unix_timestamp(timestamp):
-    return (datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M:%S')
+logger = get_logger("database")
 
-class SQLiteTableModel(QAbstractTableModel):
-    def __init__(self, data, headers):
+# 열 종류: 정수 열은 array('q')로 보관하고 NULL은 NULL_INTEGER로 표시
+COLUMN_KINDS = {
+    "Id": "integer",
+    "TimeStamp": "timestamp",
+    "AppName": "related",
+    "FilePath": "related",
+    "WebUri": "related",
+}
+INTEGER_KINDS = ("integer", "timestamp")
+NULL_INTEGER = -(2 ** 63)
+
+# 삭제된 Id 공백과 맞닿은 행의 배경색
+GAP_MARKER_COLOR = QColor(255, 225, 225)
+
+def format_timestamps(timestamps, tz=DEFAULT_TIMEZONE):
+    """밀리초 타임스탬프 묶음을 표시용 문자열 리스트로 변환 (같은 초는 한 번만 변환)"""
+    formatted = {}
+    result = []
+    for timestamp in timestamps:
+        if timestamp is None or timestamp == NULL_INTEGER:
+            result.append(None)
+            continue
+        seconds = timestamp // 1000
+        text = formatted.get(seconds)
+        if text is None:
+            text = formatted[seconds] = convert_unix_timestamp(timestamp, tz)
+        result.append(text)
+    return result
+
+class QueryThread(QThread):
+    """DB 조회를 GUI 스레드 밖에서 차례로 실행하는 스레드
+
+    스레드 안에서 자체 연결을 열고, 같은 종류의 요청은 가장 최근 세대만 실행한다.
+    따라가기 중인 DB는 immutable 없이 열고, 동기화 도구가 파일을 바꿔치면 reconnect로 다시 연다.
+    cache_path가 있으면 케이스 캐시를 SORT_CACHE_SCHEMA로 ATTACH해 관련 값 열 정렬에 쓴다.
+    계측이 켜져 있으면 조회 함수 이름별로 실행 시간과 행 수를 기록한다.
+    """
+    result_ready = Signal(str, int, object)  # 종류, 세대, 결과
+    query_failed = Signal(str, int, str)  # 종류, 세대, 오류 메시지
+
+    def __init__(self, db_path, cache_path=None):
         super().__init__()
-        self._data = data  # 데이터를 테이블에 저장
-        self.headers = headers  # 테이블 헤더
+        self.db_path = db_path
+        self.cache_path = cache_path
+        self._requests = queue.Queue()
+        self._latest = {}
 
-    def data(self, index, role):
-        if role == Qt.ItemDataRole.DisplayRole:
-            value = self._data[index.row()][index.column()]
+    def submit(self, kind, generation, func, *args):
+        """func(cursor, *args)를 실행하도록 요청"""
+        self._latest[kind] = generation
+        self._requests.put((kind, generation, func, args))
+
+    def reconnect(self):
+        """대기 중인 요청 전에 연결을 다시 열도록 요청"""
+        self._requests.put(("reconnect", 0, None, ()))
+
+    def _connect(self):
+        conn = open_readonly(self.db_path, immutable=not is_followed(self.db_path))
+        if self.cache_path:
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {SORT_CACHE_SCHEMA};", (readonly_uri(self.cache_path),))
+            except sqlite3.Error as e:
+                logger.warning("case cache attach failed", extra=log_fields(path=self.cache_path, error=str(e)))
+        return conn
 
-            # TimeStamp 열에 대한 특별 처리
-            if self.headers[index.column()] == "TimeStamp":
-                return convert_unix_timestamp(value)
+    def run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self.query_failed.emit("connect", 0, str(e))
+            return
 
-            return value
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            kind, generation, func, args = request
+            if kind == "reconnect":
+                conn.close()
+                try:
+                    conn = self._connect()
+                except Exception as e:
+                    self.query_failed.emit("connect", 0, str(e))
+                    return
+                continue
+            if generation != self._latest.get(kind):
+                continue  # 더 새로운 요청이 대기 중
+            try:
+                if STATS.enabled:
+                    started = time.perf_counter()
+                    result = func(conn.cursor(), *args)
+                    STATS.record_query(func.__name__, time.perf_counter() - started, result_rows(result))
+                else:
+                    result = func(conn.cursor(), *args)
+            except Exception as e:
+                self.query_failed.emit(kind, generation, str(e))
+                continue
+            self.result_ready.emit(kind, generation, result)
 
-    def rowCount(self, index):
-        return len(self._data)
+        conn.close()
+
+    def stop(self):
+        self._requests.put(None)
+        self.wait()
+
+class CaptureTableModel(QAbstractTableModel):
+    """캡처 행을 열 단위로 보관하는 표 모델의 공통 부분
+
+    DisplayRole은 미리 만들어 둔 표시용 문자열을, Qt.UserRole은 정렬/범위 비교용 원본 값을 반환한다.
+    HEADERS의 마지막 '이미지' 열은 ImageToken에서 계산한다.
+    """
+    page_loaded = Signal(int)  # 행을 붙인 뒤 현재 행 수
+    load_failed = Signal(str)
+    facets_loaded = Signal(list)  # [(App.Name, 캡처 수), ...]
+    time_bounds_loaded = Signal(object, object)  # (최소, 최대) TimeStamp
+    deletion_analyzed = Signal(object)  # deletion_analysis.DeletionReport
+    deletion_failed = Signal(str)
+    capture_located = Signal(int)  # locate_capture로 찾은 행 번호, 없으면 -1
+    new_captures = Signal(int, bool)  # 따라가기: 새로 발견한 캡처 수, 표 끝에 이어 붙이는지 여부
+
+    HEADERS = CAPTURE_HEADERS + ["이미지"]  # 테이블 헤더 ('이미지' 열은 ImageToken에서 계산)
+
+    def __init__(self, tz=DEFAULT_TIMEZONE, db_path=None):
+        super().__init__()
+        self.headers = list(self.HEADERS)
+        self.tz = tz
+        # 행을 읽어 온 DB와 그 ImageStore (여러 DB를 합치는 모델은 행별 메서드를 재정의)
+        self.db_path = db_path
+        self.image_dir = image_dir_for_db(db_path) if db_path else None
+        self._row_count = 0
+        self._gap_markers = {}  # 공백과 맞닿은 캡처 Id → 툴팁 문자열
 
-    def columnCount(self, index):
-        return len(self._data[0]) if self._data else 0
+        # 열 종류는 한 번만 결정
+        self._kinds = [COLUMN_KINDS.get(header, "text") for header in self.headers[:-1]] + ["image"]
+        self._image_token_column = self.headers.index("ImageToken")
+        self._id_column = self.headers.index("Id")
+        self._timestamp_column = self.headers.index("TimeStamp")
+
+        # 원본 값 열: 정수 열은 array('q'), 나머지는 list
+        self._columns = [array("q") if kind in INTEGER_KINDS else [] for kind in self._kinds[:-1]]
+        # 표시용 문자열 캐시: TimeStamp/관련 값 묶음처럼 변환이 필요한 열만 보관
+        self._display_cache = {
+            column: [] for column, kind in enumerate(self._kinds) if kind in ("timestamp", "related")
+        }
+        self._display = [self._make_display(column, kind) for column, kind in enumerate(self._kinds)]
+        self._raw = [self._make_raw(column, kind) for column, kind in enumerate(self._kinds)]
+
+    def _make_display(self, column, kind):
+        """열 종류에 맞는 DisplayRole 함수 생성"""
+        if kind == "image":
+            tokens = self._columns[self._image_token_column]
+            return lambda row: "O" if tokens[row] else "X"
+        if column in self._display_cache:
+            return self._display_cache[column].__getitem__
+        if kind in INTEGER_KINDS:
+            values = self._columns[column]
+            return lambda row: None if values[row] == NULL_INTEGER else values[row]
+        return self._columns[column].__getitem__
+
+    def _make_raw(self, column, kind):
+        """열 종류에 맞는 Qt.UserRole 함수 생성 (정렬 키)"""
+        if kind == "image":
+            tokens = self._columns[self._image_token_column]
+            return lambda row: bool(tokens[row])
+        if kind in INTEGER_KINDS:
+            return self._columns[column].__getitem__
+        if kind == "related":
+            return self._display_cache[column].__getitem__
+        values = self._columns[column]
+        return lambda row: "" if values[row] is None else values[row]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if STATS.enabled:
+            STATS.count("table_model.data")
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.column()](index.row())
+        if role == Qt.ItemDataRole.UserRole:
+            return self._raw[index.column()](index.row())
+        if self._gap_markers and role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ToolTipRole):
+            marker = self._gap_markers.get(self._columns[self._id_column][index.row()])
+            if marker is None:
+                return None
+            return GAP_MARKER_COLOR if role == Qt.ItemDataRole.BackgroundRole else marker
+        return None
+
+    def rowCount(self, index=QModelIndex()):
+        return 0 if index.isValid() else self._row_count
+
+    def columnCount(self, index=QModelIndex()):
+        return 0 if index.isValid() else len(self.headers)
 
     def headerData(self, section, orientation, role):
         if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
             return self.headers[section]
         return None
 
-def load_data_from_db(db_path):
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # 데이터베이스 쿼리
-        query = """
-        SELECT 
-            wc.Id, wc.Name, wc.ImageToken, wc.WindowTitle, 
-            app.Name AS AppName, wc.TimeStamp, file.Path AS FilePath, web.Uri AS WebUri
-        FROM WindowCapture wc
-        LEFT JOIN WindowCaptureAppRelation war ON wc.Id = war.WindowCaptureId
-        LEFT JOIN App app ON war.AppId = app.Id
-        LEFT JOIN WindowCaptureFileRelation wfr ON wc.Id = wfr.WindowCaptureId
-        LEFT JOIN File file ON wfr.FileId = file.Id
-        LEFT JOIN WindowCaptureWebRelation wwr ON wc.Id = wwr.WindowCaptureId
-        LEFT JOIN Web web ON wwr.WebId = web.Id
-        ORDER BY wc.Id;
+    def image_path(self, row):
+        """행의 ImageStore 이미지 경로, ImageToken이 없으면 None"""
+        image_token = self._columns[self._image_token_column][row]
+        return os.path.join(self.image_dir, image_token) if image_token and self.image_dir else None
+
+    def db_path_for_row(self, row):
+        """행을 읽어 온 ukg.db 경로"""
+        return self.db_path
+
+    def request_facets(self):
+        pass
+
+    def request_deletion_analysis(self):
+        pass
+
+    def locate_capture(self, capture_id):
+        self.capture_located.emit(-1)
+
+    def follow_new_captures(self, reopen=False):
+        pass
+
+    def close(self):
+        pass
+
+    def _clear_rows(self):
+        for values in self._columns:
+            del values[:]
+        for values in self._display_cache.values():
+            del values[:]
+        self._row_count = 0
+
+    def _append_rows(self, rows):
+        """행 묶음을 열 단위로 나눠 붙이고 표시용 문자열을 한 번에 만든다"""
+        for column, values in enumerate(zip(*rows)):
+            kind = self._kinds[column]
+            if kind in INTEGER_KINDS:
+                self._columns[column].extend(NULL_INTEGER if value is None else value for value in values)
+            else:
+                self._columns[column].extend(values)
+
+            if kind == "timestamp":
+                self._display_cache[column].extend(format_timestamps(values, self.tz))
+            elif kind == "related":
+                self._display_cache[column].extend(
+                    format_related(value) if isinstance(value, tuple) else value for value in values
+                )
+        self._row_count += len(rows)
+
+    def set_gap_markers(self, report):
+        """공백 바로 뒤(마지막 공백은 바로 앞) 캡처 행에 배경색과 툴팁 표시"""
+        markers = {}
+        for gap in report.gaps:
+            missing = str(gap.first_missing) if gap.count == 1 else f"{gap.first_missing}~{gap.last_missing}"
+            if gap.after_id is not None:
+                markers[gap.after_id] = f"앞에서 Id {missing} ({gap.count}개) 삭제됨"
+            elif gap.before_id is not None:
+                markers[gap.before_id] = f"뒤에서 Id {missing} ({gap.count}개) 삭제됨"
+        self._gap_markers = markers
+        if self.rowCount():
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(self.rowCount() - 1, len(self.headers) - 1),
+                [Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ToolTipRole],
+            )
+
+    def set_timezone(self, tz):
+        """표시 시간대를 바꾸고 이미 읽은 TimeStamp 문자열을 다시 만든다"""
+        self.tz = tz
+        for column, kind in enumerate(self._kinds):
+            if kind == "timestamp":
+                self._display_cache[column][:] = format_timestamps(self._columns[column], tz)
+                if self.rowCount():
+                    self.dataChanged.emit(
+                        self.index(0, column), self.index(self.rowCount() - 1, column),
+                        [Qt.ItemDataRole.DisplayRole],
+                    )
+
+class SQLiteTableModel(CaptureTableModel):
+    """WindowCapture 조인 결과를 필요한 만큼만 페이지 단위로 읽어오는 열 기반 모델
+
+    aggregate가 True이면 캡처당 한 행으로 읽고 AppName/FilePath/WebUri 열에 관련 값 묶음을 둔다.
+    정렬과 필터는 CaptureQuery로 SQLite에 넘기고, 페이지 조회는 QueryThread에서 실행한다.
+    따라가기 중에는 follow_new_captures가 high-water mark(확인한 최대 Id)보다 큰 Id만 확인하고,
+    캡처 순서(Id/TimeStamp 오름차순)로 보고 있으면 keyset 다음 페이지로 새 행만 읽어 끝에 붙인다.
+    """
+
+    def __init__(self, db_path, page_size=PAGE_SIZE, aggregate=False, tz=DEFAULT_TIMEZONE, query=None):
+        super().__init__(tz, db_path)
+        self.page_size = page_size
+        self.aggregate = aggregate
+        self._fetch_page = fetch_aggregated_page if aggregate else fetch_capture_page
+        self.query = query or CaptureQuery()
+        self._after_key = None  # 마지막으로 읽은 (정렬 키, wc.Id)
+        self._exhausted = False
+        self._pending = False  # 페이지 요청이 진행 중인지 여부
+        self._generation = 0  # 조건이 바뀔 때마다 증가, 이전 조건의 결과는 버림
+        self._seek_id = None  # locate_capture로 찾는 중인 캡처 Id
+        self._high_water = None  # 따라가기: 확인한 최대 wc.Id
+        self._follow_generation = 0
+
+        cache_path = None if is_followed(db_path) else valid_cache_path(db_path)
+        self._sort_cache = SORT_CACHE_SCHEMA if cache_path else None  # 관련 값 열 정렬에 쓸 캐시 스키마
+        self.query_thread = QueryThread(db_path, cache_path)
+        self.query_thread.result_ready.connect(self._on_result)
+        self.query_thread.query_failed.connect(self._on_failed)
+        self.query_thread.start()
+        self.fetchMore(QModelIndex())  # 첫 화면 분량만 미리 읽음
+        if is_followed(db_path):
+            self.query_thread.submit("high_water", 0, fetch_new_captures)
+        if cache_path:
+            self.query_thread.submit("time_bounds", 0, fetch_cached_time_bounds)
+        else:
+            self.query_thread.submit("time_bounds", 0, fetch_time_bounds)
+
+    def canFetchMore(self, index):
+        return not index.isValid() and not self._exhausted and not self._pending
+
+    def fetchMore(self, index):
+        """다음 페이지를 조회 스레드에 요청, 결과는 _on_result에서 모델 끝에 추가"""
+        if index.isValid() or self._exhausted or self._pending:
+            return
+
+        self._pending = True
+        self.query_thread.submit(
+            "page", self._generation, self._fetch_page, self.query, self._after_key, self.page_size,
+            self._sort_cache
+        )
+
+    def set_cache_path(self, cache_path):
+        """케이스 캐시가 새로 만들어졌을 때 호출, 이후 페이지부터 캐시의 정렬 키를 쓴다
+
+        캐시의 정렬 키는 원본에서 계산한 값과 같으므로 읽던 keyset을 그대로 이어 간다.
         """
-        cursor.execute(query)
-        data = cursor.fetchall()
-        headers = ["Id", "Name", "ImageToken", "WindowTitle", "AppName", "TimeStamp", "FilePath", "WebUri"]
+        if not cache_path or is_followed(self.db_path):
+            return
+        self.query_thread.cache_path = cache_path
+        self.query_thread.reconnect()
+        self._sort_cache = SORT_CACHE_SCHEMA
 
-        conn.close()
-        return data, headers
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """헤더 클릭 정렬을 ORDER BY로 변환"""
+        sort_column = self.headers[column]
+        descending = order == Qt.SortOrder.DescendingOrder
+        if (sort_column, descending) == (self.query.sort_column, self.query.descending):
+            return
+        self.set_query(self.query.replace(sort_column=sort_column, descending=descending))
+
+    def set_query(self, query):
+        """조건을 바꾸고 첫 페이지부터 다시 조회"""
+        self.query = query
+        self._generation += 1
+        self.beginResetModel()
+        self._clear_rows()
+        self._after_key = None
+        self._exhausted = False
+        self._pending = False
+        self._seek_id = None
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def request_facets(self):
+        """현재 조건(앱 필터 제외)으로 App.Name별 캡처 수를 요청"""
+        self.query_thread.submit("facets", self._generation, count_captures_by_app, self.query)
+
+    def request_deletion_analysis(self):
+        """Id 공백 분석을 조회 스레드에 요청, 결과는 deletion_analyzed로 전달"""
+        self.query_thread.submit("deletion", 0, find_id_gaps)
+
+    def locate_capture(self, capture_id):
+        """캡처 Id의 행을 찾아 capture_located로 알림 (아직 읽지 않았으면 찾을 때까지 다음 페이지를 읽음)"""
+        self._seek_id = capture_id
+        self._continue_seek(0)
+
+    def _continue_seek(self, start):
+        try:
+            row = self._columns[self._id_column].index(self._seek_id, start)
+        except ValueError:
+            if self._exhausted:
+                self._seek_id = None
+                self.capture_located.emit(-1)
+            else:
+                self.fetchMore(QModelIndex())
+            return
+        self._seek_id = None
+        self.capture_located.emit(row)
+
+    def follow_new_captures(self, reopen=False):
+        """DB가 바뀌었을 때 호출, reopen이면 파일이 바꿔치기된 것이므로 연결부터 다시 연다"""
+        if reopen:
+            self.query_thread.reconnect()
+        self._follow_generation += 1
+        self.query_thread.submit("high_water", self._follow_generation, fetch_new_captures, self._high_water)
+
+    def _appends_new_captures(self):
+        """새 캡처가 표 끝에 오는 정렬인지 여부 (Id가 늘어나는 순서)"""
+        return self.query.sort_column in ("Id", "TimeStamp") and not self.query.descending
+
+    def _on_high_water(self, generation, result):
+        count, max_id = result
+        if generation == 0:
+            self._high_water = max_id  # 처음 연 시점의 최대 Id
+            return
+        if generation != self._follow_generation or not count:
+            return
+        self._high_water = max_id
+        appends = self._appends_new_captures()
+        # 이미 끝까지 읽었으면 마지막 keyset 다음부터 새 행만 읽음 (아직이면 스크롤할 때 함께 읽힘)
+        if appends and self._exhausted:
+            self._exhausted = False
+            self.fetchMore(QModelIndex())
+        self.new_captures.emit(count, appends)
+
+    def _on_result(self, kind, generation, result):
+        if kind == "time_bounds":
+            self.time_bounds_loaded.emit(*result)
+            return
+        if kind == "high_water":
+            self._on_high_water(generation, result)
+            return
+        if kind == "deletion":
+            self.deletion_analyzed.emit(result)
+            return
+        if generation != self._generation:
+            return  # 이전 조건의 결과
+        if kind == "facets":
+            self.facets_loaded.emit(result)
+            return
+
+        rows, self._after_key = result
+        self._pending = False
+
+        # 페이지 크기보다 적은 캡처가 돌아왔다면 마지막 페이지
+        if len({row[0] for row in rows}) < self.page_size:
+            self._exhausted = True
+
+        start = self._row_count
+        if rows:
+            self.beginInsertRows(QModelIndex(), self._row_count, self._row_count + len(rows) - 1)
+            self._append_rows(rows)
+            self.endInsertRows()
+        self.page_loaded.emit(self._row_count)
+        if self._seek_id is not None:
+            self._continue_seek(start)
+
+    def _on_failed(self, kind, generation, message):
+        logger.warning("DB 조회 오류", extra=log_fields(db_path=self.db_path, kind=kind, error=message))
+        if kind == "deletion":
+            self.deletion_failed.emit(message)
+            return
+        if kind in ("connect", "page") and generation in (0, self._generation):
+            self._pending = False
+            self._exhausted = True
+            self.load_failed.emit(message)
+            if self._seek_id is not None:
+                self._continue_seek(self._row_count)
 
-    except Exception as e:
-        print(f"DB 로드 오류: {str(e)}")
-        return None, None
+    def close(self):
+        self._exhausted = True
+        self._generation += 1
+        if self.query_thread.isRunning():
+            self.query_thread.stop()
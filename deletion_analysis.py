@@ -0,0 +1,95 @@
+#deletion_analysis.py
+
+# WindowCapture Id 공백 분석
+#
+# WindowCapture.Id는 자동 증가 값이므로 중간에 빠진 Id는 삭제된 캡처를 뜻한다.
+# LAG(Id) 윈도 함수로 한 번의 스캔에서 모든 공백 구간을 찾고, 공백 앞뒤 캡처의 TimeStamp로
+# 삭제된 캡처가 만들어진 시간대를 추정한다. 공백 구간만 Python으로 가져오므로 행 수와 무관하게 가볍다.
+
+from collections import namedtuple
+from instrumentation import get_logger, log_fields
+
+logger = get_logger("deletion_analysis")
+
+# 빠진 Id 구간 하나
+# first_missing ~ last_missing: 빠진 Id 범위 (양 끝 포함)
+# before_id / before_timestamp: 공백 직전 캡처 (처음부터 빠졌으면 None)
+# after_id / after_timestamp: 공백 직후 캡처 (IdTable 기준 마지막 부분이 빠졌으면 None)
+IdGap = namedtuple("IdGap", [
+    "first_missing", "last_missing", "count",
+    "before_id", "before_timestamp", "after_id", "after_timestamp",
+])
+
+# 분석 결과 요약
+DeletionReport = namedtuple("DeletionReport", ["first_id", "last_id", "next_id", "capture_count", "gaps"])
+
+# 연속한 두 캡처 사이에 Id 공백이 있는 곳만 반환
+GAP_QUERY = """
+SELECT PrevId, PrevTimeStamp, Id, TimeStamp
+FROM (
+    SELECT Id, TimeStamp,
+        LAG(Id) OVER (ORDER BY Id) AS PrevId,
+        LAG(TimeStamp) OVER (ORDER BY Id) AS PrevTimeStamp
+    FROM WindowCapture
+)
+WHERE Id - PrevId > 1
+ORDER BY Id;
+"""
+
+# 처음/마지막 캡처와 전체 개수
+BOUNDS_QUERY = """
+SELECT
+    (SELECT Id FROM WindowCapture ORDER BY Id ASC LIMIT 1),
+    (SELECT TimeStamp FROM WindowCapture ORDER BY Id ASC LIMIT 1),
+    (SELECT Id FROM WindowCapture ORDER BY Id DESC LIMIT 1),
+    (SELECT TimeStamp FROM WindowCapture ORDER BY Id DESC LIMIT 1),
+    (SELECT COUNT(*) FROM WindowCapture);
+"""
+
+# IdTable의 WindowCapture 다음 Id
+NEXT_ID_QUERY = "SELECT NextId FROM IdTable WHERE Name = 'WindowCapture';"
+
+def read_next_id(cursor):
+    """IdTable에 기록된 WindowCapture의 다음 Id, 없으면 None"""
+    try:
+        cursor.execute(NEXT_ID_QUERY)
+        row = cursor.fetchone()
+    except Exception as e:
+        logger.warning("IdTable 조회 실패", extra=log_fields(error=str(e)))
+        return None
+    if not row or not isinstance(row[0], int):
+        return None
+    return row[0]
+
+def find_id_gaps(cursor):
+    """WindowCapture에서 빠진 Id 구간 전체를 분석해 DeletionReport 반환"""
+    cursor.execute(BOUNDS_QUERY)
+    first_id, first_timestamp, last_id, last_timestamp, capture_count = cursor.fetchone()
+    next_id = read_next_id(cursor)
+    gaps = []
+
+    if first_id is None:
+        # 캡처가 하나도 없으면 IdTable 기준으로 전부 삭제된 것으로 봄
+        if next_id is not None and next_id > 1:
+            gaps.append(IdGap(1, next_id - 1, next_id - 1, None, None, None, None))
+        return DeletionReport(None, None, next_id, 0, gaps)
+
+    # Id 1부터 첫 캡처 사이
+    if first_id > 1:
+        gaps.append(IdGap(1, first_id - 1, first_id - 1, None, None, first_id, first_timestamp))
+
+    cursor.execute(GAP_QUERY)
+    for before_id, before_timestamp, after_id, after_timestamp in cursor:
+        gaps.append(IdGap(
+            before_id + 1, after_id - 1, after_id - before_id - 1,
+            before_id, before_timestamp, after_id, after_timestamp,
+        ))
+
+    # 마지막 캡처 이후 ~ IdTable의 다음 Id 사이
+    if next_id is not None and next_id > last_id + 1:
+        gaps.append(IdGap(last_id + 1, next_id - 1, next_id - last_id - 1, last_id, last_timestamp, None, None))
+
+    return DeletionReport(first_id, last_id, next_id, capture_count, gaps)
+
+def missing_count(report):
+    return sum(gap.count for gap in report.gaps)
@@ -0,0 +1,80 @@
+#deletion_panel.py
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, \
+    QAbstractItemView
+from PySide6.QtCore import Qt, Signal
+from queries import DEFAULT_TIMEZONE, convert_unix_timestamp
+from deletion_analysis import missing_count
+
+# Id 공백(삭제 추정 구간) 목록 패널
+class DeletionGapWidget(QWidget):
+    gap_selected = Signal(object, object)  # 공백과 맞닿은 캡처의 (Id, TimeStamp)
+
+    def __init__(self):
+        super().__init__()
+        self.tz = DEFAULT_TIMEZONE
+        self.report = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.gap_table = QTableWidget(0, 4)
+        self.gap_table.setHorizontalHeaderLabels(["빠진 Id", "개수", "추정 시작", "추정 끝"])
+        self.gap_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.gap_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.gap_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.gap_table.verticalHeader().setVisible(False)
+        self.gap_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.gap_table.itemSelectionChanged.connect(self.on_gap_selected)
+        layout.addWidget(self.gap_table)
+
+    def clear(self):
+        self.report = None
+        self.gap_table.setRowCount(0)
+        self.summary_label.setText("")
+
+    def set_report(self, report):
+        """분석 결과로 목록을 다시 채움"""
+        self.report = report
+        self.gap_table.setRowCount(len(report.gaps))
+        for row, gap in enumerate(report.gaps):
+            if gap.count == 1:
+                id_text = str(gap.first_missing)
+            else:
+                id_text = f"{gap.first_missing} ~ {gap.last_missing}"
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.DisplayRole, gap.count)
+            self.gap_table.setItem(row, 0, QTableWidgetItem(id_text))
+            self.gap_table.setItem(row, 1, count_item)
+        self.update_times()
+        self.summary_label.setText(
+            f"누락 구간 {len(report.gaps)}개, 누락 Id {missing_count(report)}개 "
+            f"(남은 캡처 {report.capture_count}개, Next ID: {report.next_id})"
+        )
+
+    def update_times(self):
+        """표시 시간대로 추정 시간 열을 채움 (공백 앞뒤 캡처의 TimeStamp 사이)"""
+        if self.report is None:
+            return
+        for row, gap in enumerate(self.report.gaps):
+            for column, timestamp in ((2, gap.before_timestamp), (3, gap.after_timestamp)):
+                text = convert_unix_timestamp(timestamp, self.tz) if timestamp is not None else "알 수 없음"
+                self.gap_table.setItem(row, column, QTableWidgetItem(text))
+
+    def set_timezone(self, tz):
+        self.tz = tz
+        self.update_times()
+
+    def on_gap_selected(self):
+        items = self.gap_table.selectedItems()
+        if not items:
+            return
+        gap = self.report.gaps[items[0].row()]
+        # 공백 직후 캡처로 이동, 마지막 공백이면 직전 캡처로 이동
+        if gap.after_id is not None:
+            self.gap_selected.emit(gap.after_id, gap.after_timestamp or 0)
+        elif gap.before_id is not None:
+            self.gap_selected.emit(gap.before_id, gap.before_timestamp or 0)
@@ -0,0 +1,209 @@
+#export.py
+
+# Qt 없이 ukg.db의 캡처 타임라인을 CSV / JSONL / Parquet로 내보내는 명령줄 도구
+#
+# 사용 예:
+#   python export.py ukg.db -o timeline.csv
+#   python export.py ukg.db -o timeline.jsonl --ocr --start "2024-10-01 09:00:00" --end "2024-10-02"
+#   python export.py case1/ukg.db case2/ukg.db -o out_dir --format parquet
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from connection import open_readonly
+from queries import PAGE_SIZE, CAPTURE_HEADERS, CaptureQuery, convert_unix_timestamp, \
+    fetch_ocr_texts, iter_capture_batches
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+# 관련 값 묶음을 CSV 한 칸에 넣을 때의 구분자
+CSV_LIST_SEPARATOR = "; "
+
+def parse_timezone(text):
+    """'+09:00', '-05:30', 'UTC' 형식의 시간대 문자열을 tzinfo로 변환"""
+    if text.upper() in ("UTC", "Z"):
+        return timezone.utc
+    sign = -1 if text.startswith("-") else 1
+    hours, _, minutes = text.lstrip("+-").partition(":")
+    return timezone(sign * timedelta(hours=int(hours), minutes=int(minutes or 0)))
+
+def parse_time(text, tz):
+    """'YYYY-MM-DD[ HH:MM[:SS]]' 또는 밀리초 정수를 밀리초 타임스탬프로 변환"""
+    if text.isdigit():
+        return int(text)
+    for time_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            moment = datetime.strptime(text, time_format)
+        except ValueError:
+            continue
+        return int(moment.replace(tzinfo=tz).timestamp() * 1000)
+    raise argparse.ArgumentTypeError(f"시간 형식을 해석할 수 없습니다: {text}")
+
+def iter_records(conn, query, tz, include_ocr=False, aggregate=True, batch_size=PAGE_SIZE):
+    """캡처를 열 이름 → 값 dict로 하나씩 내보내는 제너레이터 (TimeStamp는 원본 밀리초, DateTime은 변환값)"""
+    ocr_cursor = conn.cursor()
+    for rows in iter_capture_batches(conn, query, batch_size, aggregate):
+        ocr_texts = fetch_ocr_texts(ocr_cursor, {row[0] for row in rows}) if include_ocr else {}
+        for row in rows:
+            record = dict(zip(CAPTURE_HEADERS, row))
+            for name in ("AppName", "FilePath", "WebUri"):
+                if isinstance(record[name], tuple):
+                    record[name] = list(record[name])
+            timestamp = record["TimeStamp"]
+            record["DateTime"] = convert_unix_timestamp(timestamp, tz) if timestamp is not None else None
+            if include_ocr:
+                record["OCRText"] = ocr_texts.get(record["Id"])
+            yield record
+
+def output_columns(include_ocr):
+    columns = CAPTURE_HEADERS + ["DateTime"]
+    return columns + ["OCRText"] if include_ocr else columns
+
+def write_csv(records, output_path, columns):
+    count = 0
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as output:
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow([
+                CSV_LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+                for value in (record[column] for column in columns)
+            ])
+            count += 1
+    return count
+
+def write_jsonl(records, output_path, columns):
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as output:
+        for record in records:
+            output.write(json.dumps({column: record[column] for column in columns}, ensure_ascii=False))
+            output.write("\n")
+            count += 1
+    return count
+
+def write_parquet(records, output_path, columns, batch_size=PAGE_SIZE * 10):
+    """pyarrow로 batch_size개씩 row group을 써서 메모리 사용량을 제한"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet 내보내기에는 pyarrow가 필요합니다: pip install pyarrow")
+
+    list_columns = ("AppName", "FilePath", "WebUri")
+    types = {"Id": pa.int64(), "TimeStamp": pa.int64()}
+    schema = None
+    count = 0
+    writer = None
+    batch = []
+
+    def flush():
+        nonlocal schema, writer
+        if schema is None:
+            fields = []
+            for column in columns:
+                if column in types:
+                    fields.append(pa.field(column, types[column]))
+                # 조인 모드에서는 관련 값이 묶음이 아닌 단일 문자열
+                elif column in list_columns and isinstance(batch[0][column], list):
+                    fields.append(pa.field(column, pa.list_(pa.string())))
+                else:
+                    fields.append(pa.field(column, pa.string()))
+            schema = pa.schema(fields)
+            writer = pq.ParquetWriter(output_path, schema)
+        table = pa.Table.from_pylist([{column: record[column] for column in columns} for record in batch], schema)
+        writer.write_table(table)
+        batch.clear()
+
+    try:
+        for record in records:
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+def export_database(db_path, output_path, output_format, query, tz, include_ocr=False, aggregate=True):
+    """ukg.db 하나를 내보내고 내보낸 행 수 반환"""
+    conn = open_readonly(db_path)
+    try:
+        records = iter_records(conn, query, tz, include_ocr, aggregate)
+        return WRITERS[output_format](records, output_path, output_columns(include_ocr))
+    finally:
+        conn.close()
+
+def output_path_for(db_path, output_dir, output_format, index):
+    """여러 DB를 내보낼 때 DB가 있는 디렉토리 이름으로 출력 파일 이름을 정함"""
+    name = os.path.basename(os.path.dirname(os.path.abspath(db_path))) or "ukg"
+    return os.path.join(output_dir, f"{index:03d}_{name}.{output_format}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Recall ukg.db 캡처 타임라인 내보내기 (Qt 불필요)")
+    parser.add_argument("db_paths", nargs="+", help="ukg.db 경로 (여러 개 가능)")
+    parser.add_argument("-o", "--output", required=True,
+                        help="출력 파일 경로 (DB가 여러 개이면 출력 디렉토리)")
+    parser.add_argument("-f", "--format", choices=FORMATS,
+                        help="출력 형식 (생략하면 출력 파일 확장자로 결정)")
+    parser.add_argument("--ocr", action="store_true", help="OCR 텍스트 포함")
+    parser.add_argument("--joined", action="store_true",
+                        help="App/File/Web 관계를 묶지 않고 조인 결과 그대로 내보냄")
+    parser.add_argument("--start", help="시작 시각 (YYYY-MM-DD[ HH:MM[:SS]] 또는 밀리초)")
+    parser.add_argument("--end", help="종료 시각 (YYYY-MM-DD[ HH:MM[:SS]] 또는 밀리초)")
+    parser.add_argument("--text", default="", help="WindowTitle / Name 포함 문자열 필터")
+    parser.add_argument("--app", help="App.Name 필터")
+    parser.add_argument("--tz", default="+09:00", help="시간 해석 및 DateTime 출력 시간대 (기본값 +09:00)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    output_format = args.format
+    if output_format is None:
+        output_format = os.path.splitext(args.output)[1].lstrip(".").lower()
+        if len(args.db_paths) > 1 or output_format not in FORMATS:
+            output_format = "csv"
+
+    try:
+        tz = parse_timezone(args.tz)
+        query = CaptureQuery(
+            text=args.text,
+            app_name=args.app,
+            start_time=parse_time(args.start, tz) if args.start else None,
+            end_time=parse_time(args.end, tz) if args.end else None,
+        )
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+
+    if len(args.db_paths) > 1:
+        os.makedirs(args.output, exist_ok=True)
+
+    failed = 0
+    for index, db_path in enumerate(args.db_paths, 1):
+        if len(args.db_paths) > 1:
+            output_path = output_path_for(db_path, args.output, output_format, index)
+        else:
+            output_path = args.output
+        try:
+            count = export_database(db_path, output_path, output_format, query, tz,
+                                    include_ocr=args.ocr, aggregate=not args.joined)
+        except sqlite3.Error as e:
+            print(f"DB 내보내기 오류: {db_path} ({str(e)})", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"{db_path} -> {output_path}: {count}행", file=sys.stderr)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#image_hash.py
+
+# ImageStore 스크린샷의 지각 해시(dHash) 색인과 유사 이미지 묶기
+#
+# Recall은 같은 화면을 수천 번 캡처하므로 타임라인을 한 장씩 넘기면 대부분 같은 그림이다.
+# - 각 이미지를 9x8 회색조로 줄여 가로로 이웃한 픽셀의 밝기 비교 64개를 64비트 dHash로 만든다.
+#   디코딩은 별도 프로세스 풀에서 하고(spawn), JPEG는 디코딩 단계에서 바로 축소된다.
+# - 해시는 증거 옆이 아닌 사용자 캐시 디렉토리의 보조 SQLite에 (파일 크기, 수정 시각)과 함께 저장하고,
+#   다음 색인 때는 크기/수정 시각이 바뀐 파일만 다시 계산한다.
+# - 해밍 거리가 임계값 이하인 이미지는 같은 장면으로 묶는다. 장면 대표 해시는 BK-tree에 넣어
+#   전체와 비교하지 않고 가까운 대표만 찾는다.
+
+from PySide6.QtGui import QImage, QImageReader
+from PySide6.QtCore import QThread, Signal, QStandardPaths, QSize, Qt
+from concurrent.futures import ProcessPoolExecutor
+from connection import open_readonly
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+
+# dHash 크기 (HASH_WIDTH+1 x HASH_HEIGHT로 줄여 HASH_WIDTH x HASH_HEIGHT비트)
+HASH_WIDTH = 8
+HASH_HEIGHT = 8
+# 축소 전 중간 디코딩 크기 (바로 9x8로 줄이면 앨리어싱이 생김)
+DECODE_SIZE = QSize(72, 64)
+# 같은 장면으로 보는 최대 해밍 거리 (64비트 중)
+DEFAULT_THRESHOLD = 6
+# 작업 프로세스에 한 번에 넘기는 파일 수
+HASH_CHUNK_SIZE = 64
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ImageHash (
+    ImageToken TEXT PRIMARY KEY,
+    Size INTEGER NOT NULL,
+    MTime INTEGER NOT NULL,
+    DHash INTEGER
+);
+"""
+
+IMAGE_TOKEN_QUERY = "SELECT DISTINCT ImageToken FROM WindowCapture WHERE ImageToken IS NOT NULL AND ImageToken != '';"
+
+def default_index_dir():
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not location:
+        location = os.path.join(os.path.expanduser("~"), ".cache", "arbiter")
+    return os.path.join(location, "phash")
+
+def index_path_for(image_dir, index_dir=None):
+    """ImageStore 경로별 보조 색인 DB 경로"""
+    case_key = hashlib.sha1(os.path.abspath(image_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(index_dir or default_index_dir(), case_key + ".db")
+
+def to_signed(value):
+    """64비트 해시를 SQLite INTEGER(부호 있는 64비트)에 맞게 변환"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+def dhash_image(image_path):
+    """이미지 파일의 64비트 dHash, 읽을 수 없으면 None"""
+    reader = QImageReader(image_path)
+    size = reader.size()
+    if size.isValid() and (size.width() > DECODE_SIZE.width() or size.height() > DECODE_SIZE.height()):
+        reader.setScaledSize(DECODE_SIZE)
+    image = reader.read()
+    if image.isNull():
+        return None
+    image = image.convertToFormat(QImage.Format_Grayscale8).scaled(
+        HASH_WIDTH + 1, HASH_HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    pixels = bytes(image.constBits())
+    stride = image.bytesPerLine()
+
+    value = 0
+    for y in range(HASH_HEIGHT):
+        line = pixels[y * stride:y * stride + HASH_WIDTH + 1]
+        for x in range(HASH_WIDTH):
+            value = (value << 1) | (line[x] < line[x + 1])
+    return value
+
+def hash_files(entries):
+    """작업 프로세스에서 실행: [(ImageToken, 경로, 크기, 수정 시각), ...] → [(ImageToken, 크기, 수정 시각, 해시)]"""
+    return [(token, size, mtime, dhash_image(path)) for token, path, size, mtime in entries]
+
+class BKTree:
+    """해밍 거리 BK-tree: 삼각 부등식으로 가지를 쳐서 반경 안의 항목만 찾는다"""
+
+    def __init__(self):
+        self._root = None  # [해시, 항목, {거리: 자식 노드}]
+
+    def add(self, value, item):
+        node = self._root
+        if node is None:
+            self._root = [value, item, {}]
+            return
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, item, {}]
+                return
+            node = child
+
+    def search(self, value, radius):
+        """value와의 거리가 radius 이하인 [(거리, 항목), ...]를 가까운 순서로 반환"""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.append((distance, node[1]))
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda result: result[0])
+        return found
+
+def cluster_hashes(hashes, threshold=DEFAULT_THRESHOLD):
+    """해시 목록을 장면 번호 목록으로 변환 (None은 해시가 없는 이미지, 장면도 None)
+
+    순서대로 보면서 임계값 안에 기존 장면 대표가 있으면 가장 가까운 장면에 넣고, 없으면 새 장면을 만든다.
+    """
+    tree = BKTree()
+    scene_count = 0
+    scenes = []
+    for value in hashes:
+        if value is None:
+            scenes.append(None)
+            continue
+        found = tree.search(value, threshold)
+        if found:
+            scenes.append(found[0][1])
+        else:
+            tree.add(value, scene_count)
+            scenes.append(scene_count)
+            scene_count += 1
+    return scenes
+
+def scene_starts(scenes):
+    """연속해서 같은 장면인 구간의 시작 인덱스 목록 (해시가 없는 이미지는 각각 따로)"""
+    starts = []
+    previous = object()
+    for index, scene in enumerate(scenes):
+        if scene is None or scene != previous:
+            starts.append(index)
+        previous = scene
+    return starts
+
+class HashIndex:
+    """ImageStore 하나의 dHash 보조 색인 (사용자 캐시 디렉토리의 SQLite)"""
+
+    def __init__(self, image_dir, index_dir=None):
+        self.image_dir = image_dir
+        self.path = index_path_for(image_dir, index_dir)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(INDEX_SCHEMA)
+        return conn
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """{ImageToken: 해시} 반환 (색인이 없으면 빈 dict)"""
+        if not self.exists():
+            return {}
+        conn = self._connect()
+        try:
+            return {
+                token: to_unsigned(value)
+                for token, value in conn.execute("SELECT ImageToken, DHash FROM ImageHash WHERE DHash IS NOT NULL;")
+            }
+        finally:
+            conn.close()
+
+    def update(self, tokens, workers=None, progress=None, should_stop=None):
+        """tokens 중 새 파일과 크기/수정 시각이 바뀐 파일만 해시해 색인에 반영, 새로 계산한 수 반환"""
+        conn = self._connect()
+        try:
+            known = {token: (size, mtime) for token, size, mtime in
+                     conn.execute("SELECT ImageToken, Size, MTime FROM ImageHash;")}
+            pending = []
+            for token in tokens:
+                path = os.path.join(self.image_dir, token)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # 파일이 없는 토큰
+                if known.get(token) != (stat.st_size, stat.st_mtime_ns):
+                    pending.append((token, path, stat.st_size, stat.st_mtime_ns))
+
+            if progress is not None:
+                progress(0, len(pending))
+            if not pending:
+                return 0
+
+            chunks = [pending[start:start + HASH_CHUNK_SIZE] for start in range(0, len(pending), HASH_CHUNK_SIZE)]
+            workers = min(workers or os.cpu_count() or 1, len(chunks))
+            done = 0
+            # fork 대신 spawn: GUI 프로세스의 Qt 상태를 작업 프로세스로 복사하지 않음
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                for results in executor.map(hash_files, chunks):
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO ImageHash (ImageToken, Size, MTime, DHash) VALUES (?, ?, ?, ?);",
+                        [(token, size, mtime, None if value is None else to_signed(value))
+                         for token, size, mtime, value in results],
+                    )
+                    done += len(results)
+                    if progress is not None:
+                        progress(done, len(pending))
+                    if should_stop is not None and should_stop():
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        break
+            conn.commit()
+            return done
+        finally:
+            conn.close()
+
+def read_image_tokens(db_path):
+    """WindowCapture가 가리키는 ImageToken 목록"""
+    conn = open_readonly(db_path)
+    try:
+        return [row[0] for row in conn.execute(IMAGE_TOKEN_QUERY)]
+    finally:
+        conn.close()
+
+# ImageToken이 가리키는 모든 파일의 dHash 색인을 만드는 스레드
+class HashIndexThread(QThread):
+    progress = Signal(int, int)  # 해시한 파일 수, 새로 해시할 전체 파일 수
+    index_ready = Signal(str, object)  # ImageStore 경로, {ImageToken: 해시}
+    index_failed = Signal(str)
+
+    def __init__(self, db_path, image_dir, workers=None):
+        super().__init__()
+        self.db_path = db_path
+        self.image_dir = image_dir
+        self.workers = workers
+        self._cancelled = False
+
+    def run(self):
+        try:
+            index = HashIndex(self.image_dir)
+            index.update(read_image_tokens(self.db_path), self.workers, progress=self.progress.emit,
+                         should_stop=lambda: self._cancelled)
+            if not self._cancelled:
+                self.index_ready.emit(self.image_dir, index.load())
+        except Exception as e:
+            self.index_failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
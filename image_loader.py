@@ -1,29 +1,79 @@
 #image_loader.py
 
+import os
+import time
 from PySide6.QtWidgets import QDialog, QLabel, QScrollArea
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import QThread, Signal, Qt
+from PySide6.QtGui import QImage
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from thumbnail_cache import get_thumbnail_cache
+from instrumentation import STATS, get_logger, log_fields
 
-# 이미지 로드를 위한 스레드 클래스 정의
-class ImageLoaderThread(QThread):
-    image_loaded = Signal(QPixmap)  # 이미지 로드가 완료되면 QPixmap 객체를 신호로 전송
+logger = get_logger("image_loader")
 
-    def __init__(self, image_path):
+# 이미지 로드 작업 스레드 수 (선택이 빠르게 바뀌어도 이 이상 동시에 디코딩하지 않음)
+LOADER_THREADS = 2
+
+# 작업 스레드에서 GUI 스레드로 결과를 보내기 위한 신호 객체
+class ImageLoaderSignals(QObject):
+    image_loaded = Signal(int, QImage)  # 요청 번호, 디코딩된 QImage (실패 시 null)
+
+# 이미지 한 장을 요청 크기로 디코딩하는 작업
+class ImageLoadTask(QRunnable):
+    def __init__(self, loader, request_id, image_path, width, height):
         super().__init__()
-        self.image_path = image_path  # 로드할 이미지 경로 저장
+        self.loader = loader
+        self.request_id = request_id
+        self.image_path = image_path
+        self.width = width
+        self.height = height
 
     def run(self):
-        print(f"이미지 경로 시도 중: {self.image_path}")  # 디버깅용 출력
-        pixmap = QPixmap(self.image_path)
-        if pixmap.isNull():
-            print(f"이미지 로드 실패: {self.image_path}")  # 디버깅용 출력
-            self.image_loaded.emit(QPixmap())
-            return  # 이미지 경로를 통해 QPixmap 객체 생성
-        # 이미지가 1280x960보다 크면 크기를 조정 (KeepAspectRatio로 비율 유지)
-        if pixmap.width() > 1280 or pixmap.height() > 960:
-            pixmap = pixmap.scaled(1280, 960, Qt.KeepAspectRatio)
-        # 이미지 로드가 완료되면 image_loaded 신호를 통해 QPixmap 객체 전달
-        self.image_loaded.emit(pixmap)
+        # 그 사이 새 요청이 들어왔다면 디코딩하지 않음
+        if self.request_id != self.loader.latest_request_id:
+            return
+        logger.debug("이미지 로드 시작", extra=log_fields(image_path=self.image_path))
+        started = time.perf_counter()
+        cache = get_thumbnail_cache(os.path.dirname(self.image_path))
+        image = cache.get(os.path.basename(self.image_path), self.width, self.height)
+        if STATS.enabled:
+            STATS.record_latency("image_loader.load", time.perf_counter() - started)
+        if image.isNull():
+            logger.warning("이미지 로드 실패", extra=log_fields(image_path=self.image_path))
+        if self.request_id == self.loader.latest_request_id:
+            self.loader.signals.image_loaded.emit(self.request_id, image)
+
+class ImageLoader:
+    """선택한 이미지를 표시 크기로 디코딩하는 공용 로더
+
+    요청마다 번호를 매기고 가장 최근 요청만 전달한다. 아직 시작하지 않은 이전 요청은 버리고,
+    실행 중인 요청의 결과는 번호 비교로 무시한다. 작업 스레드에서는 QImage만 만들고
+    QPixmap 변환은 GUI 스레드에서 한다.
+    """
+
+    def __init__(self, threads=LOADER_THREADS):
+        self.latest_request_id = 0
+        self.signals = ImageLoaderSignals()
+        self.image_loaded = self.signals.image_loaded
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(threads)
+
+    def request(self, image_path, width, height):
+        """image_path를 width x height 안에 맞춰 디코딩하도록 요청, 요청 번호 반환"""
+        self.latest_request_id += 1
+        self.pool.clear()  # 대기 중인 이전 요청 취소
+        self.pool.start(ImageLoadTask(self, self.latest_request_id, image_path, width, height))
+        return self.latest_request_id
+
+    def is_latest(self, request_id):
+        return request_id == self.latest_request_id
+
+    def cancel(self):
+        self.latest_request_id += 1
+        self.pool.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
 
 # 이미지를 보여주는 별도의 창을 담당하는 클래스 정의
 class ImageWindow(QDialog):
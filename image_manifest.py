@@ -0,0 +1,218 @@
+#image_manifest.py
+
+# ImageStore 무결성 매니페스트 (증거 보관 연속성 기록)와 고아 파일 색인
+#
+# - ImageStore의 모든 파일에 대해 (크기, 수정 시각, SHA-256)을 사용자 캐시 디렉토리의 보조 SQLite에 기록한다.
+#   증거 폴더에는 아무것도 쓰지 않는다.
+# - 다음 생성 때는 크기/수정 시각이 그대로인 파일은 이전 해시를 재사용하고 바뀐 파일만 다시 해시한다.
+#   전체 재검증(full=True)은 모든 파일을 다시 읽어 이전 해시와 비교한다.
+# - 해시는 스레드 풀에서 mmap으로 읽어 계산한다 (hashlib은 큰 버퍼를 해시하는 동안 GIL을 놓음).
+# - 폴더의 파일 이름 집합과 WindowCapture.ImageToken 집합의 차집합으로 양쪽 고아를 찾는다.
+#   캡처가 없는 파일은 삭제된 캡처의 흔적, 파일이 없는 토큰은 지워진 이미지다.
+
+from PySide6.QtCore import QThread, Signal, QStandardPaths
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from image_hash import read_image_tokens
+import csv
+import hashlib
+import mmap
+import os
+import sqlite3
+import time
+
+# 스레드 풀에 한 번에 넘기는 파일 수 (묶음마다 색인에 기록하고 진행률을 알림)
+MANIFEST_BATCH_SIZE = 256
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ManifestEntry (
+    ImageToken TEXT PRIMARY KEY,
+    Size INTEGER NOT NULL,
+    MTime INTEGER NOT NULL,
+    SHA256 TEXT NOT NULL,
+    HashedAt INTEGER NOT NULL
+);
+"""
+
+ManifestReport = namedtuple("ManifestReport", [
+    "image_dir", "file_count", "total_bytes",
+    "hashed", "reused",  # 이번에 해시한 파일 수, 이전 해시를 재사용한 파일 수
+    "changed",  # 이전 매니페스트와 해시가 달라진 ImageToken
+    "removed",  # 이전 매니페스트에는 있었지만 지금은 없는 ImageToken
+    "unreadable",  # 읽지 못한 ImageToken
+    "orphan_files",  # WindowCapture 행이 없는 파일 (삭제된 캡처)
+    "missing_files",  # 파일이 없는 ImageToken
+])
+
+def default_manifest_dir():
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not location:
+        location = os.path.join(os.path.expanduser("~"), ".cache", "arbiter")
+    return os.path.join(location, "manifest")
+
+def manifest_path_for(image_dir, manifest_dir=None):
+    """ImageStore 경로별 매니페스트 DB 경로"""
+    case_key = hashlib.sha1(os.path.abspath(image_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(manifest_dir or default_manifest_dir(), case_key + ".db")
+
+def sha256_file(path):
+    """파일 전체를 mmap으로 읽어 SHA-256 16진 문자열 반환 (복사 없이 페이지 캐시를 바로 해시)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+    return digest.hexdigest()
+
+def hash_entry(entry):
+    """(ImageToken, 경로, 크기, 수정 시각) → (ImageToken, 크기, 수정 시각, 해시 또는 None)"""
+    token, path, size, mtime = entry
+    try:
+        return token, size, mtime, sha256_file(path)
+    except (OSError, ValueError):
+        return token, size, mtime, None
+
+def list_image_files(image_dir):
+    """{파일 이름: (크기, 수정 시각 ns)}"""
+    files = {}
+    with os.scandir(image_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+class ImageManifest:
+    """ImageStore 하나의 무결성 매니페스트 (사용자 캐시 디렉토리의 SQLite)"""
+
+    def __init__(self, image_dir, manifest_dir=None):
+        self.image_dir = image_dir
+        self.path = manifest_path_for(image_dir, manifest_dir)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(MANIFEST_SCHEMA)
+        return conn
+
+    def update(self, tokens, full=False, workers=None, progress=None, should_stop=None):
+        """폴더를 다시 훑어 매니페스트를 갱신하고 ManifestReport 반환
+
+        tokens는 WindowCapture가 가리키는 ImageToken 목록이다. full이 False이면 크기/수정 시각이
+        이전과 같은 파일은 다시 읽지 않는다.
+        """
+        files = list_image_files(self.image_dir)
+        conn = self._connect()
+        try:
+            known = {token: (size, mtime, digest) for token, size, mtime, digest in
+                     conn.execute("SELECT ImageToken, Size, MTime, SHA256 FROM ManifestEntry;")}
+            pending = [
+                (token, os.path.join(self.image_dir, token), size, mtime)
+                for token, (size, mtime) in files.items()
+                if full or known.get(token, (None, None))[:2] != (size, mtime)
+            ]
+
+            changed = []
+            unreadable = []
+            done = 0
+            if progress is not None:
+                progress(0, len(pending))
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+                for start in range(0, len(pending), MANIFEST_BATCH_SIZE):
+                    if should_stop is not None and should_stop():
+                        break
+                    results = list(executor.map(hash_entry, pending[start:start + MANIFEST_BATCH_SIZE]))
+                    hashed_at = int(time.time() * 1000)
+                    rows = []
+                    for token, size, mtime, digest in results:
+                        if digest is None:
+                            unreadable.append(token)
+                            continue
+                        previous = known.get(token)
+                        if previous is not None and previous[2] != digest:
+                            changed.append(token)
+                        rows.append((token, size, mtime, digest, hashed_at))
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO ManifestEntry (ImageToken, Size, MTime, SHA256, HashedAt) "
+                        "VALUES (?, ?, ?, ?, ?);", rows)
+                    conn.commit()  # 중단해도 해시한 만큼은 다음에 재사용
+                    done += len(results)
+                    if progress is not None:
+                        progress(done, len(pending))
+
+            # 없어진 파일은 매니페스트에서 제거
+            removed = sorted(known.keys() - files.keys())
+            conn.executemany("DELETE FROM ManifestEntry WHERE ImageToken = ?;", [(token,) for token in removed])
+            conn.commit()
+        finally:
+            conn.close()
+
+        token_set = set(tokens)
+        return ManifestReport(
+            image_dir=self.image_dir,
+            file_count=len(files),
+            total_bytes=sum(size for size, mtime in files.values()),
+            hashed=done,
+            reused=len(files) - len(pending),
+            changed=sorted(changed),
+            removed=removed,
+            unreadable=sorted(unreadable),
+            orphan_files=sorted(files.keys() - token_set),
+            missing_files=sorted(token_set - files.keys()),
+        )
+
+    def export_csv(self, output_path, report):
+        """매니페스트를 CSV로 저장 (파일별 상태 포함, 파일이 없는 토큰도 한 행씩), 저장한 행 수 반환"""
+        orphans = set(report.orphan_files)
+        changed = set(report.changed)
+        count = 0
+        conn = self._connect()
+        try:
+            with open(output_path, "w", newline="", encoding="utf-8-sig") as output:
+                writer = csv.writer(output)
+                writer.writerow(["ImageToken", "Status", "Size", "MTime", "SHA256", "HashedAt"])
+                for token, size, mtime, digest, hashed_at in conn.execute(
+                        "SELECT ImageToken, Size, MTime, SHA256, HashedAt FROM ManifestEntry ORDER BY ImageToken;"):
+                    status = "changed" if token in changed else "orphan" if token in orphans else "ok"
+                    writer.writerow([token, status, size, format_utc(mtime // 1000000), digest, format_utc(hashed_at)])
+                    count += 1
+                for token in report.unreadable:
+                    writer.writerow([token, "unreadable", "", "", "", ""])
+                    count += 1
+                for token in report.missing_files:
+                    writer.writerow([token, "missing", "", "", "", ""])
+                    count += 1
+        finally:
+            conn.close()
+        return count
+
+def format_utc(milliseconds):
+    return datetime.fromtimestamp(milliseconds / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
+
+# ImageStore 무결성 매니페스트를 갱신하는 스레드
+class ManifestThread(QThread):
+    progress = Signal(int, int)  # 해시한 파일 수, 새로 해시할 전체 파일 수
+    manifest_ready = Signal(object)  # ManifestReport
+    manifest_failed = Signal(str)
+
+    def __init__(self, db_path, image_dir, full=False, workers=None):
+        super().__init__()
+        self.db_path = db_path
+        self.image_dir = image_dir
+        self.full = full
+        self.workers = workers
+        self._cancelled = False
+
+    def run(self):
+        try:
+            manifest = ImageManifest(self.image_dir)
+            report = manifest.update(read_image_tokens(self.db_path), self.full, self.workers,
+                                     progress=self.progress.emit, should_stop=lambda: self._cancelled)
+            if not self._cancelled:
+                self.manifest_ready.emit(report)
+        except Exception as e:
+            self.manifest_failed.emit(str(e))
+
+    def cancel(self):
+        self._cancelled = True
@@ -0,0 +1,69 @@
+#image_prefetch.py
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# 현재 위치 앞뒤로 미리 디코딩하는 이미지 수
+PREFETCH_RADIUS = 5
+# 미리 읽기에 쓰는 작업 스레드 수
+PREFETCH_THREADS = 3
+
+# 작업 스레드에서 GUI 스레드로 결과를 보내기 위한 신호 객체
+class PrefetchSignals(QObject):
+    image_ready = Signal(int, int, bool)  # 세대, 이미지 인덱스, 디코딩 성공 여부
+
+# 한 장의 이미지를 필요한 크기들로 디코딩해 썸네일 캐시에 올리는 작업
+class PrefetchTask(QRunnable):
+    def __init__(self, prefetcher, generation, index, image_token):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.generation = generation
+        self.index = index
+        self.image_token = image_token
+
+    def run(self):
+        # 위치가 바뀐 뒤 대기열에서 꺼내진 작업은 건너뜀
+        if self.generation != self.prefetcher.generation:
+            return
+        images = self.prefetcher.cache.get_sizes(self.image_token, self.prefetcher.sizes)
+        ok = all(not image.isNull() for image in images.values())
+        self.prefetcher.signals.image_ready.emit(self.generation, self.index, ok)
+
+class ImagePrefetcher:
+    """타임라인 현재 위치 주변 이미지를 제한된 스레드 풀에서 미리 디코딩
+
+    schedule()을 부를 때마다 세대가 바뀌고 아직 시작하지 않은 이전 작업은 취소된다.
+    디코딩 결과는 썸네일 캐시의 메모리 계층에 올라가며, 완료 시 image_ready 신호가 GUI 스레드로 전달된다.
+    """
+
+    def __init__(self, cache, sizes, radius=PREFETCH_RADIUS, threads=PREFETCH_THREADS):
+        self.cache = cache
+        self.sizes = sizes
+        self.radius = radius
+        self.generation = 0
+        self.signals = PrefetchSignals()
+        self.image_ready = self.signals.image_ready
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(threads)
+
+    def schedule(self, images, center):
+        """center 주변 앞뒤 radius장을 가까운 순서대로 요청 (캐시에 있는 것은 건너뜀)"""
+        self.cancel()
+        generation = self.generation
+        # 0, +1, -1, +2, -2, ... 순서 (가까운 이미지를 먼저 디코딩)
+        for distance in range(self.radius + 1):
+            for index in ((center,) if distance == 0 else (center + distance, center - distance)):
+                if not 0 <= index < len(images):
+                    continue
+                image_token = images[index][2]
+                if all(self.cache.peek(image_token, width, height) is not None for width, height in self.sizes):
+                    continue
+                self.pool.start(PrefetchTask(self, generation, index, image_token), self.radius - distance)
+
+    def cancel(self):
+        """대기 중인 작업을 버리고 세대를 올림 (실행 중인 작업의 결과는 세대 비교로 무시)"""
+        self.generation += 1
+        self.pool.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
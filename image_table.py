@@ -1,17 +1,133 @@
 #image_table.py
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDateTimeEdit, QGridLayout
-from PySide6.QtCore import Qt, QDateTime
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDateTimeEdit, QGridLayout, \
+    QCheckBox
+from PySide6.QtCore import Qt, QDateTime, QTimeZone, QThread, Signal
 from PySide6.QtGui import QPixmap  # 이미지 로딩을 위한 QPixmap 추가
+import os
+import queue
 import sqlite3
-from datetime import datetime  # 날짜 변환을 위한 모듈 추가
+import time
+from bisect import bisect_left, bisect_right
+from thumbnail_cache import get_thumbnail_cache, image_dir_for_db
+from image_prefetch import ImagePrefetcher
+from image_hash import HashIndex, cluster_hashes, scene_starts
+from timeline_minimap import TimelineMinimap
+from connection import get_connection, is_followed
+from case_cache import valid_cache_path, CACHED_IMAGES_QUERY
+from queries import NEW_IMAGES_QUERY, DEFAULT_TIMEZONE, convert_unix_timestamp
+from instrumentation import STATS, fetch_all, fetch_one, get_logger, log_fields
+
+logger = get_logger("image_table")
+
+# 원본에서 이미지가 있는 캡처 조회 (OCR 텍스트는 이미지를 표시할 때 한 건씩 읽음)
+IMAGES_QUERY = """
+SELECT wc.Timestamp, wc.WindowTitle, wc.ImageToken, wc.Id
+FROM WindowCapture wc
+WHERE wc.ImageToken IS NOT NULL {where}
+ORDER BY wc.Timestamp, wc.Id;
+"""
+# 시간 범위 검색 조건 (원본과 케이스 캐시 공통)
+IMAGE_RANGE_CONDITION = "AND TimeStamp BETWEEN ? AND ?"
+
+# 한 번에 GUI 스레드로 보내는 이미지 행 수
+IMAGE_BATCH_SIZE = 2000
+
+# 이미지 목록을 조회하는 스레드 (가장 최근 요청만 실행, 결과는 묶음 단위로 전송)
+class ImageListThread(QThread):
+    """한 번의 조회 결과를 fetchmany로 나눠 보내므로 GUI 스레드는 행을 붙이는 일만 한다
+
+    원본 WindowCapture에는 TimeStamp 색인이 없어 keyset 페이지마다 전체를 다시 정렬하게 되므로,
+    요청마다 한 번 정렬한 커서를 끝까지 읽는다. 더 새로운 요청이 오면 남은 행은 읽지 않는다.
+    """
+    images_found = Signal(int, list, bool)  # 요청 번호, 이미지 행 묶음, 마지막 묶음 여부
+    query_failed = Signal(int, str)  # 요청 번호, 오류 메시지
+
+    def __init__(self):
+        super().__init__()
+        self._requests = queue.Queue()
+        self._latest = 0
+
+    def request(self, request_id, db_path, cache_path=None, bounds=None):
+        """bounds((시작, 끝) 밀리초, None이면 전체) 안의 이미지 캡처를 케이스 캐시(없으면 원본)에서 조회"""
+        self._latest = request_id
+        self._requests.put((request_id, db_path, cache_path, bounds))
+
+    def run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            request_id = request[0]
+            if request_id != self._latest:
+                continue  # 더 새로운 요청이 대기 중
+            try:
+                self.stream(*request)
+            except Exception as e:
+                self.query_failed.emit(request_id, str(e))
+
+    def stream(self, request_id, db_path, cache_path, bounds):
+        where, params = ("", ()) if bounds is None else (IMAGE_RANGE_CONDITION, bounds)
+        name = "load_images" if bounds is None else "search_images"
+        if cache_path:
+            # 케이스 캐시의 이미지 캡처 TimeStamp 부분 색인 순서대로 읽음
+            cursor = get_connection(cache_path).cursor()  # 스레드별 공유 읽기 전용 연결
+            query, name = CACHED_IMAGES_QUERY.format(where=where), name + "[cache]"
+        else:
+            cursor = get_connection(db_path).cursor()
+            query = IMAGES_QUERY.format(where=where)
+        started = time.perf_counter()
+        count = 0
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(IMAGE_BATCH_SIZE)
+                count += len(rows)
+                last = len(rows) < IMAGE_BATCH_SIZE
+                if request_id != self._latest:
+                    return
+                self.images_found.emit(request_id, rows, last)
+                if last:
+                    break
+        finally:
+            cursor.close()
+        if STATS.enabled:
+            STATS.record_query(name, time.perf_counter() - started, count)
+
+    def stop(self):
+        self._requests.put(None)
+        self.wait()
 
 class ImageTableWidget(QWidget):
+    images_loaded = Signal()  # images 목록이 바뀜 (조회, 검색, 접기 모드 전환)
+    images_appended = Signal(object)  # 따라가기: images 끝에 붙인 이미지 행 목록
+
     def __init__(self):
         super().__init__()
         self.db_path = None  # 초기에는 db_path가 설정되지 않음
-        self.images = []  # 이미지 리스트 저장
+        self.cache_path = None  # 원본과 일치하는 케이스 캐시 DB (없으면 원본에서 조회)
+        self.thumbnail_cache = None
+        self.prefetcher = None
+        self.all_images = []  # 조회한 이미지 리스트
+        self.images = []  # 화면에서 넘겨 보는 이미지 리스트 (유사 이미지 접기 모드에서는 장면별 첫 이미지)
         self.current_image_index = 0  # 현재 보고 있는 이미지의 인덱스
+        self.image_hashes = {}  # ImageToken → dHash
+        self.scene_start_indices = []  # 접기 모드에서 images[i]의 all_images 인덱스
+        self.search_bounds = None  # 시간 범위 검색 중이면 (시작, 끝) 밀리초
+        self.image_high_water = None  # 따라가기: 읽어 온 이미지 캡처의 최대 Id
+        self.image_bounds = None  # 전체 이미지의 (처음, 끝) TimeStamp
+        self.tz = DEFAULT_TIMEZONE  # 표시 시간대 (TimeStamp 라벨, 검색 범위 입력, 미니맵)
+
+        # 이미지 목록은 조회 스레드에서 묶음으로 받음
+        self.image_request = 0  # 이미지 목록 요청 번호, 이전 요청의 결과는 버림
+        self.image_loading = False  # 마지막 묶음을 아직 받지 않음
+        self._request_bounds = None  # 진행 중인 요청의 검색 범위
+        self._replace_images = False  # 첫 묶음이 오면 목록을 바꿈 (그 전까지 이전 목록을 보여 줌)
+        self.pending_jump = None  # 목록이 그 시각까지 도착하면 이동할 (캡처 Id, TimeStamp)
+        self.image_thread = ImageListThread()
+        self.image_thread.images_found.connect(self.on_images_found)
+        self.image_thread.query_failed.connect(self.on_images_failed)
+        self.image_thread.start()
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)  # 전체 여백을 최소화
@@ -23,6 +139,7 @@ class ImageTableWidget(QWidget):
         self.end_time = QDateTimeEdit(QDateTime.currentDateTime())
         self.start_time.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
         self.end_time.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.apply_time_edit_zone()
         
         search_button = QPushButton("검색")
         search_button.clicked.connect(self.search_images_by_timestamp)
@@ -35,6 +152,11 @@ class ImageTableWidget(QWidget):
         
         layout.addLayout(timestamp_layout)
 
+        # 캡처 밀도 미니맵, 끌어서 선택한 범위로 바로 검색
+        self.minimap = TimelineMinimap()
+        self.minimap.range_selected.connect(self.search_range)
+        layout.addWidget(self.minimap)
+
         # 이미지 및 텍스트의 수평 정렬 레이아웃
         image_and_label_layout = QHBoxLayout()
         image_and_label_layout.setAlignment(Qt.AlignCenter)  # 수평 중앙 정렬 설정
@@ -76,7 +198,11 @@ class ImageTableWidget(QWidget):
         self.prev_button.clicked.connect(self.show_previous_image)
         self.next_button = QPushButton("다음 이미지로 이동")
         self.next_button.clicked.connect(self.show_next_image)
+        self.collapse_check = QCheckBox("유사 이미지 접기")
+        self.collapse_check.setToolTip("해시 색인이 있으면 거의 같은 화면이 이어지는 구간을 한 장으로 넘김")
+        self.collapse_check.toggled.connect(self.on_collapse_toggled)
         navigation_layout.addWidget(self.prev_button)
+        navigation_layout.addWidget(self.collapse_check)
         navigation_layout.addWidget(self.next_button)
         layout.addLayout(navigation_layout)
 
@@ -86,100 +212,303 @@ class ImageTableWidget(QWidget):
         self.window_title_label = QLabel("WindowTitle: ")
         self.image_token_label = QLabel("ImageToken: ")
         self.ocr_text_label = QLabel("OCRText: ")
+        self.scene_label = QLabel("")
         metadata_layout.addWidget(self.timestamp_label, 0, 0)
         metadata_layout.addWidget(self.window_title_label, 0, 1)
         metadata_layout.addWidget(self.image_token_label, 1, 0)
         metadata_layout.addWidget(self.ocr_text_label, 1, 1)
+        metadata_layout.addWidget(self.scene_label, 2, 0, 1, 2)
         
         layout.addLayout(metadata_layout)
         
     def set_db_path(self, db_path):
         """db_path 설정 및 이미지 로드"""
         self.db_path = db_path
-        self.load_images()
-        self.set_default_time_range()  # 기본 시간 범위 설정
+        # 따라가는 DB는 계속 바뀌므로 이전에 만든 케이스 캐시 대신 원본을 조회
+        self.cache_path = None if is_followed(db_path) else valid_cache_path(db_path)
+        self.thumbnail_cache = get_thumbnail_cache(image_dir_for_db(db_path))
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+        self.prefetcher = ImagePrefetcher(self.thumbnail_cache, [(500, 500), (300, 300)])
+        self.prefetcher.image_ready.connect(self.on_image_prefetched)
+        self.image_hashes = HashIndex(image_dir_for_db(db_path)).load()  # 이전에 만든 해시 색인
+        self.image_bounds = None
+        self.load_images()  # 끝나면 기본 시간 범위 설정
 
     def load_images(self):
-        """ImageToken이 NULL이 아닌 가장 빠른 TimeStamp 이미지 로드"""
+        """ImageToken이 NULL이 아닌 이미지 전체를 TimeStamp 순으로 조회 (결과는 on_images_found에서 받음)"""
         if self.db_path is None:
             return  # db_path가 설정되지 않은 경우 로드를 중단
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        query = """
-        SELECT wc.Timestamp, wc.WindowTitle, wc.ImageToken, text.c2 AS OCRText
-        FROM WindowCapture wc
-        LEFT JOIN WindowCaptureTextIndex_content text ON wc.Id = text.rowid
-        WHERE wc.ImageToken IS NOT NULL
-        ORDER BY wc.Timestamp ASC;
-        """
-        cursor.execute(query)
-        self.images = cursor.fetchall()
-        conn.close()
-
-        if self.images:
-            self.current_image_index = 0
-            self.display_image(self.images[0])  # 가장 빠른 이미지 표시
-            self.display_adjacent_images()  # 이전 및 다음 이미지 표시
+        self.request_images(None)
 
     def search_images_by_timestamp(self):
         if self.db_path is None:
             return  # db_path가 설정되지 않은 경우 로드를 중단
 
-        # 타임스탬프 범위를 초 단위로 변환
-        start_timestamp = self.start_time.dateTime().toSecsSinceEpoch()  # 초 단위로 변환
-        end_timestamp = self.end_time.dateTime().toSecsSinceEpoch()  # 초 단위로 변환
-        
-        print(f"검색 범위 (초): {start_timestamp} ~ {end_timestamp}")  # 타임스탬프 범위 출력
-
-        # 타임스탬프 범위 내 이미지 검색
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        query = """
-        SELECT wc.Timestamp, wc.WindowTitle, wc.ImageToken, text.c2 AS OCRText
-        FROM WindowCapture wc
-        LEFT JOIN WindowCaptureTextIndex_content text ON wc.Id = text.rowid
-        WHERE wc.Timestamp BETWEEN ? AND ? AND wc.ImageToken IS NOT NULL
-        ORDER BY wc.Timestamp;
+        # TimeStamp 열과 같은 밀리초 단위로 변환
+        start_timestamp = self.start_time.dateTime().toMSecsSinceEpoch()
+        end_timestamp = self.end_time.dateTime().toMSecsSinceEpoch()
+        self.minimap.set_selection(start_timestamp, end_timestamp)
+
+        logger.debug("이미지 검색", extra=log_fields(start=start_timestamp, end=end_timestamp))
+        self.request_images((start_timestamp, end_timestamp))  # 타임스탬프 범위 내 이미지 검색
+
+    def request_images(self, bounds):
+        """조회 스레드에 이미지 목록을 요청, 첫 묶음이 올 때까지 이전 목록을 그대로 보여 줌"""
+        self.image_request += 1
+        self.image_loading = True
+        self._request_bounds = bounds
+        self._replace_images = True
+        self.image_thread.request(self.image_request, self.db_path, self.cache_path, bounds)
+
+    def on_images_found(self, request_id, rows, last):
+        """조회 스레드에서 받은 이미지 묶음을 목록 끝에 붙임 (첫 묶음은 목록을 바꾸고 첫 이미지를 표시)"""
+        if request_id != self.image_request:
+            return  # 이전 요청의 결과
+        if self._replace_images:
+            self._replace_images = False
+            self.all_images = rows
+            self.search_bounds = self._request_bounds
+            if self.search_bounds is None:
+                self.image_high_water = None
+            self.raise_high_water(rows)  # 검색: 불러온 뒤 새로 들어와 검색에 포함된 캡처
+            self.update_visible_images()
+            self.current_image_index = 0
+            if self.images:
+                self.display_image(self.images[0])  # 가장 빠른 이미지 표시
+                self.display_adjacent_images()  # 이전 및 다음 이미지 표시
+        elif rows:
+            self.raise_high_water(rows)
+            self.all_images.extend(rows)
+            if self.images is self.all_images:
+                self.images_appended.emit(rows)  # images도 함께 늘어남
+                if self.current_image_index >= len(self.images) - len(rows) - 1:
+                    self.display_adjacent_images()  # 마지막 이미지를 보고 있었다면 다음 이미지가 생김
+
+        if last:
+            self.image_loading = False
+            if self.images is not self.all_images:
+                self.on_collapse_toggled(True)  # 접기 모드: 전체가 도착한 뒤 장면을 다시 나눔
+            if self.search_bounds is None:
+                self.set_default_time_range()  # 기본 시간 범위 설정
+            else:
+                logger.debug("검색된 이미지", extra=log_fields(count=len(self.all_images)))
+                if not self.images:
+                    # 검색 결과가 없는 경우 처리
+                    self.prefetcher.cancel()  # 이전 목록의 미리 읽기 중단
+                    self.image_display.clear()
+                    self.image_display.setText("해당 범위 내 이미지가 없습니다.")
+                    self.prev_image.clear()
+                    self.prev_image.setText("")
+                    self.next_image.clear()
+                    self.next_image.setText("")
+        self.continue_jump()
+        if last and is_followed(self.db_path):
+            self.follow_new_images()  # 조회하는 동안 들어온 캡처
+
+    def on_images_failed(self, request_id, message):
+        if request_id != self.image_request:
+            return
+        self.image_loading = False
+        self._replace_images = False
+        self.pending_jump = None
+        logger.warning("이미지 목록 조회 실패", extra=log_fields(db_path=self.db_path, error=message))
+
+    def search_range(self, start_timestamp, end_timestamp):
+        """미니맵에서 선택한 범위(밀리초)로 검색"""
+        self.start_time.setDateTime(QDateTime.fromMSecsSinceEpoch(start_timestamp))
+        self.end_time.setDateTime(QDateTime.fromMSecsSinceEpoch(end_timestamp))
+        self.search_images_by_timestamp()
+
+    def jump_to_capture(self, capture_id, timestamp):
+        """검색 결과 등에서 선택한 캡처로 이동 (이미지가 없으면 가장 가까운 시각의 이미지)
+
+        목록을 아직 받는 중이면 그 시각까지 도착한 뒤 continue_jump에서 이동한다.
         """
-        cursor.execute(query, (start_timestamp, end_timestamp))
-        self.images = cursor.fetchall()  # 검색된 이미지 리스트로 업데이트
-        conn.close()
+        if self.db_path is None:
+            return
 
-        if self.images:
-            print(f"검색된 이미지 수: {len(self.images)}")  # 검색된 이미지 수 출력
-            self.current_image_index = 0  # 검색 후 첫 번째 이미지로 인덱스 초기화
-            self.display_image(self.images[0])  # 첫 번째 이미지를 표시
-            self.display_adjacent_images()  # 이전 및 다음 이미지 표시
+        # 현재 목록(검색 범위)에 없으면 전체 목록으로 되돌림
+        if self.image_loading:
+            bounds = self._request_bounds
+            if bounds is not None and not (bounds[0] <= timestamp <= bounds[1]):
+                self.load_images()
+        elif not self.all_images or not (self.all_images[0][0] <= timestamp <= self.all_images[-1][0]):
+            self.load_images()
+        self.pending_jump = (capture_id, timestamp)
+        self.continue_jump()
+
+    def continue_jump(self):
+        """대기 중인 이동이 있고 목록이 그 시각을 지나 도착했으면 이동"""
+        if self.pending_jump is None:
+            return
+        capture_id, timestamp = self.pending_jump
+        if self.image_loading and (self._replace_images or not self.all_images
+                                   or self.all_images[-1][0] <= timestamp):
+            return  # 같은 시각의 캡처가 더 올 수 있음
+        self.pending_jump = None
+        if not self.images:
+            return
+
+        timestamps = [image[0] for image in self.all_images]
+        index = bisect_left(timestamps, timestamp)
+        # 같은 시각의 캡처가 여러 개일 수 있으므로 Id로 확인
+        for candidate in range(index, len(self.all_images)):
+            if self.all_images[candidate][0] != timestamp:
+                break
+            if self.all_images[candidate][3] == capture_id:
+                index = candidate
+                break
+        self.current_image_index = self.visible_index(min(index, len(self.all_images) - 1))
+        self.display_image(self.images[self.current_image_index])
+        self.display_adjacent_images()
+
+    def raise_high_water(self, images):
+        """읽어 온 이미지 캡처의 최대 Id 갱신"""
+        if images:
+            high_water = max(image[3] for image in images)
+            if self.image_high_water is None or high_water > self.image_high_water:
+                self.image_high_water = high_water
+
+    def follow_new_images(self):
+        """따라가기: 읽어 온 최대 Id보다 큰 이미지 캡처만 조회해 목록 끝에 붙이고 붙인 수를 반환"""
+        if self.db_path is None or self.image_loading:
+            return 0  # 목록을 받는 중이면 끝난 뒤 on_images_found에서 다시 확인
+        cursor = get_connection(self.db_path).cursor()
+        rows = fetch_all(cursor, "follow_new_images", NEW_IMAGES_QUERY,
+                         (-(2 ** 63) if self.image_high_water is None else self.image_high_water,))
+        if not rows:
+            return 0
+        self.raise_high_water(rows)
+        if self.search_bounds is not None:
+            start_timestamp, end_timestamp = self.search_bounds
+            rows = [row for row in rows if start_timestamp <= row[0] <= end_timestamp]
+            if not rows:
+                return 0
+
+        was_empty = not self.images
+        if self.all_images and rows[0][0] < self.all_images[-1][0]:
+            # 동기화 순서가 뒤섞여 앞 시각의 캡처가 늦게 들어온 경우에만 전체를 다시 정렬
+            self.all_images = sorted(self.all_images + rows)
+            self.update_visible_images()
+        elif self.images is self.all_images:
+            self.all_images.extend(rows)  # images도 함께 늘어남
+            self.images_appended.emit(rows)
         else:
-            # 검색 결과가 없는 경우 처리
-            self.image_display.clear()
-            self.image_display.setText("해당 범위 내 이미지가 없습니다.")
-            self.prev_image.clear()
-            self.prev_image.setText("")
-            self.next_image.clear()
-            self.next_image.setText("")
+            self.all_images.extend(rows)
+            self.update_visible_images()  # 접기 모드: 장면을 다시 나눔
 
+        if was_empty:
+            self.current_image_index = 0
+            self.display_image(self.images[0])
+        self.display_adjacent_images()  # 마지막 이미지를 보고 있었다면 다음 이미지가 생김
+        return len(rows)
+
+    def set_cache_path(self, db_path, cache_path):
+        """케이스 캐시 생성이 끝나면 호출, 이후 조회는 캐시에서 실행"""
+        if self.db_path is not None and os.path.abspath(db_path) == os.path.abspath(self.db_path):
+            self.cache_path = cache_path
+            if self.image_bounds is not None:
+                self.minimap.set_source(self.db_path, self.cache_path, *self.image_bounds)  # 캐시의 시간 구간별 개수로 전환
+
+    def set_image_hashes(self, image_dir, hashes):
+        """해시 색인 생성이 끝나면 호출, 접기 모드이면 장면을 다시 나눔"""
+        if self.db_path is None or os.path.abspath(image_dir) != os.path.abspath(image_dir_for_db(self.db_path)):
+            return  # 다른 DB의 색인
+        self.image_hashes = hashes
+        if self.collapse_check.isChecked():
+            self.on_collapse_toggled(True)
+
+    def update_visible_images(self):
+        """접기 모드이면 all_images를 장면(해밍 거리가 가까운 연속 구간)별 첫 이미지로 줄여 images에 둠"""
+        if self.collapse_check.isChecked() and self.image_hashes:
+            scenes = cluster_hashes([self.image_hashes.get(image[2]) for image in self.all_images])
+            self.scene_start_indices = scene_starts(scenes)
+            self.images = [self.all_images[index] for index in self.scene_start_indices]
+        else:
+            self.scene_start_indices = []
+            self.images = self.all_images
+        self.images_loaded.emit()
+
+    def visible_index(self, full_index):
+        """all_images 인덱스를 images 인덱스로 변환 (접기 모드에서는 그 이미지가 속한 장면)"""
+        if not self.scene_start_indices:
+            return full_index
+        return max(bisect_right(self.scene_start_indices, full_index) - 1, 0)
+
+    def on_collapse_toggled(self, checked):
+        """접기 모드 전환, 보고 있던 이미지 위치는 유지"""
+        if not self.all_images:
+            return
+        full_index = self.current_image_index
+        if self.scene_start_indices and self.current_image_index < len(self.scene_start_indices):
+            full_index = self.scene_start_indices[self.current_image_index]
+        self.update_visible_images()
+        if not self.images:
+            return
+        self.current_image_index = self.visible_index(min(full_index, len(self.all_images) - 1))
+        self.display_image(self.images[self.current_image_index])
+        self.display_adjacent_images()
+
+    def update_scene_label(self):
+        """접기 모드에서 현재 장면에 묶인 이미지 수 표시"""
+        if not self.scene_start_indices:
+            self.scene_label.setText("")
+            return
+        index = self.current_image_index
+        start = self.scene_start_indices[index]
+        end = self.scene_start_indices[index + 1] if index + 1 < len(self.scene_start_indices) else len(self.all_images)
+        self.scene_label.setText(
+            f"장면 {index + 1}/{len(self.images)}: 유사 이미지 {end - start}장 (전체 {len(self.all_images)}장)")
+
+    def set_timezone(self, tz):
+        """TimeStamp 라벨, 검색 범위 입력, 미니맵의 표시 시간대 변경 (검색 범위의 시각은 그대로)"""
+        self.tz = tz
+        self.apply_time_edit_zone()
+        self.minimap.set_timezone(tz)
+        if self.images:
+            self.display_image(self.images[self.current_image_index])
+
+    def apply_time_edit_zone(self):
+        zone = QTimeZone(int(self.tz.utcoffset(None).total_seconds()))
+        for edit in (self.start_time, self.end_time):
+            milliseconds = edit.dateTime().toMSecsSinceEpoch()
+            edit.setTimeZone(zone)
+            edit.setDateTime(QDateTime.fromMSecsSinceEpoch(milliseconds, zone))  # 같은 시각을 새 시간대로 다시 표시
+
+    def shutdown(self):
+        """미리 읽기, 이미지 목록 조회와 밀도 조회 스레드 정리"""
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+        self.image_thread.stop()
+        self.minimap.shutdown()
+
+    def load_ocr_text(self, capture_id):
+        """캡처 한 건의 OCR 텍스트 조회"""
+        try:
+            cursor = get_connection(self.db_path).cursor()
+            row = fetch_one(cursor, "load_ocr_text",
+                            "SELECT c2 FROM WindowCaptureTextIndex_content WHERE rowid = ?;", (capture_id,))
+        except sqlite3.Error:
+            row = None
+        return row[0] if row else None
 
     def display_image(self, image_data):
-        timestamp, window_title, image_token, ocr_text = image_data
+        timestamp, window_title, image_token, capture_id = image_data
+        ocr_text = self.load_ocr_text(capture_id)
         
-        # Unix 타임스탬프를 사람이 읽을 수 있는 형식으로 변환
-        readable_timestamp = datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
+        # Unix 타임스탬프를 표시 시간대의 읽을 수 있는 형식으로 변환
+        readable_timestamp = convert_unix_timestamp(timestamp, self.tz)
         
         # 현재 이미지의 메타데이터를 갱신
         self.timestamp_label.setText(f"TimeStamp: {readable_timestamp}")
         self.window_title_label.setText(f"WindowTitle: {window_title}")
         self.image_token_label.setText(f"ImageToken: {image_token}")
         self.ocr_text_label.setText(f"OCRText: {ocr_text}")
+        self.update_scene_label()
         
-        # 이미지 로딩 (ImageStore에서 불러오기)
-        image_path = f"ImageStore/{image_token}"
-        pixmap = QPixmap(image_path)
-        if not pixmap.isNull():
-            self.image_display.setPixmap(pixmap.scaled(500, 500, Qt.KeepAspectRatio))  # 현재 이미지는 더 크게 표시
-        else:
-            self.image_display.setText("이미지를 로드할 수 없습니다.")  # 이미지가 없을 경우 메시지 표시
+        # 이미지 로딩 (메모리 캐시에 없으면 미리 읽기 스레드에서 디코딩 후 표시)
+        self.show_cached_image(self.image_display, image_token, 500, "이미지를 로드할 수 없습니다.")  # 현재 이미지는 더 크게 표시
 
     def display_adjacent_images(self):
         """이전 이미지 및 다음 이미지 표시"""
@@ -190,12 +519,7 @@ class ImageTableWidget(QWidget):
         if prev_index >= 0:
             prev_image_data = self.images[prev_index]
             prev_image_token = prev_image_data[2]  # ImageToken
-            prev_image_path = f"ImageStore/{prev_image_token}"
-            prev_pixmap = QPixmap(prev_image_path)
-            if not prev_pixmap.isNull():
-                self.prev_image.setPixmap(prev_pixmap.scaled(300, 300, Qt.KeepAspectRatio))  # 이전 이미지 크기 확장
-            else:
-                self.prev_image.setText("이전 이미지를 로드할 수 없습니다.")
+            self.show_cached_image(self.prev_image, prev_image_token, 300, "이전 이미지를 로드할 수 없습니다.")
         else:
             self.prev_image.clear()  # 이전 이미지가 없는 경우 이미지 초기화
             self.prev_image.setText("첫번째 이미지 입니다.")  # 첫 번째 이미지일 때 텍스트 출력
@@ -204,16 +528,44 @@ class ImageTableWidget(QWidget):
         if next_index < len(self.images):
             next_image_data = self.images[next_index]
             next_image_token = next_image_data[2]  # ImageToken
-            next_image_path = f"ImageStore/{next_image_token}"
-            next_pixmap = QPixmap(next_image_path)
-            if not next_pixmap.isNull():
-                self.next_image.setPixmap(next_pixmap.scaled(300, 300, Qt.KeepAspectRatio))  # 다음 이미지 크기 확장
-            else:
-                self.next_image.setText("다음 이미지를 로드할 수 없습니다.")
+            self.show_cached_image(self.next_image, next_image_token, 300, "다음 이미지를 로드할 수 없습니다.")
         else:
             self.next_image.clear()  # 다음 이미지가 없는 경우 이미지 초기화
             self.next_image.setText("마지막 이미지입니다.")  # 마지막 이미지일 때 텍스트 출력
 
+        # 현재 위치 주변 이미지를 미리 디코딩
+        self.prefetcher.schedule(self.images, self.current_image_index)
+
+    def show_cached_image(self, label, image_token, size, failure_text):
+        """캐시에 있는 축소본을 바로 표시, 없으면 미리 읽기 완료 후 on_image_prefetched에서 표시"""
+        image = self.thumbnail_cache.peek(image_token, size, size)
+        if image is not None:
+            label.setPixmap(QPixmap.fromImage(image))
+        elif self.thumbnail_cache.has_source(image_token):
+            label.clear()
+            label.setText("불러오는 중...")
+        else:
+            label.setText(failure_text)
+
+    def on_image_prefetched(self, generation, index, ok):
+        """미리 읽기가 끝난 이미지가 지금 보이는 위치라면 표시"""
+        if generation != self.prefetcher.generation or not self.images:
+            return
+        offset = index - self.current_image_index
+        if offset == 0:
+            label, size, failure_text = self.image_display, 500, "이미지를 로드할 수 없습니다."
+        elif offset == -1:
+            label, size, failure_text = self.prev_image, 300, "이전 이미지를 로드할 수 없습니다."
+        elif offset == 1:
+            label, size, failure_text = self.next_image, 300, "다음 이미지를 로드할 수 없습니다."
+        else:
+            return
+        image = self.thumbnail_cache.peek(self.images[index][2], size, size) if ok else None
+        if image is not None:
+            label.setPixmap(QPixmap.fromImage(image))
+        else:
+            label.setText(failure_text)
+
 
     def show_previous_image(self):
         """이전 이미지로 이동"""
@@ -232,26 +584,12 @@ class ImageTableWidget(QWidget):
 
 
     def set_default_time_range(self):
-        """ImageToken이 NULL이 아닌 TimeStamp 중 가장 처음과 가장 끝 값을 기본값으로 설정"""
-        if self.db_path is None:
+        """불러온 전체 이미지의 가장 처음과 가장 끝 TimeStamp를 기본 검색 범위로 설정"""
+        min_timestamp = next((image[0] for image in self.all_images if image[0] is not None), None)
+        if min_timestamp is None:
             return
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 가장 빠른 Timestamp와 가장 늦은 Timestamp 검색
-        query = """
-        SELECT MIN(wc.Timestamp), MAX(wc.Timestamp)
-        FROM WindowCapture wc
-        WHERE wc.ImageToken IS NOT NULL;
-        """
-        cursor.execute(query)
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            min_timestamp, max_timestamp = result
-            min_time = QDateTime.fromSecsSinceEpoch(min_timestamp // 1000)
-            max_time = QDateTime.fromSecsSinceEpoch(max_timestamp // 1000)
-            self.start_time.setDateTime(min_time)
-            self.end_time.setDateTime(max_time)
+        max_timestamp = self.all_images[-1][0]  # NULL은 오름차순 맨 앞
+        self.image_bounds = (min_timestamp, max_timestamp)
+        self.start_time.setDateTime(QDateTime.fromMSecsSinceEpoch(min_timestamp))
+        self.end_time.setDateTime(QDateTime.fromMSecsSinceEpoch(max_timestamp))
+        self.minimap.set_source(self.db_path, self.cache_path, min_timestamp, max_timestamp)
@@ -0,0 +1,275 @@
+#instrumentation.py
+
+# 핫 패스 계측과 구조화 로그
+#
+# 현장에서 "프로그램이 멈춘다"는 보고를 받았을 때 볼 수 있도록 다음을 모아 둔다.
+# - SQL 조회별 시간과 행 수 (QueryThread, ImageTableWidget의 직접 조회)
+# - 표 모델 data() 호출 수와 초당 호출 수
+# - 이미지 디코딩/축소 시간 히스토그램
+# - GUI 스레드 정지: GUI 스레드의 주기 타이머가 늦게 온 시간을 기록하고, 오래 멈춰 있으면
+#   감시 스레드가 그 순간의 GUI 스레드 호출 스택을 남긴다
+# 꺼져 있을 때(기본값) 호출 지점의 비용은 STATS.enabled 속성 확인 한 번뿐이다.
+# ARBITER_INSTRUMENT=1 환경 변수나 성능 패널의 체크박스로 켠다.
+# 내보내기 CLI와 작업 프로세스도 쓰므로 Qt를 가져오지 않는다 (GUI 정지 감지는 performance_panel.StallMonitor).
+
+from collections import deque
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import platform
+import threading
+import time
+
+# 히스토그램 구간 상한 (밀리초), 마지막 구간은 그 이상 전부
+HISTOGRAM_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+# 최근 이벤트(느린 조회, GUI 정지, 경고 로그)를 보관하는 개수
+RECENT_EVENTS = 200
+# 이보다 오래 걸린 조회는 최근 이벤트에 남김 (밀리초)
+SLOW_QUERY_THRESHOLD = 100
+
+LOGGER_NAME = "arbiter"
+
+class Histogram:
+    """밀리초 지연 분포 (구간별 개수, 합, 최대)"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, milliseconds):
+        index = 0
+        while index < len(HISTOGRAM_BOUNDS) and milliseconds > HISTOGRAM_BOUNDS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += milliseconds
+        if milliseconds > self.max:
+            self.max = milliseconds
+
+    def percentile(self, fraction):
+        """fraction 분위가 들어 있는 구간의 상한 (마지막 구간이면 최댓값)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(HISTOGRAM_BOUNDS[index], self.max) if index < len(HISTOGRAM_BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {f"<={bound}" if index < len(HISTOGRAM_BOUNDS) else f">{HISTOGRAM_BOUNDS[-1]}": count
+                        for index, (bound, count) in enumerate(zip(HISTOGRAM_BOUNDS + (None,), self.buckets))
+                        if count},
+        }
+
+class RateCounter:
+    """누적 호출 수와 1초 단위 호출률"""
+
+    def __init__(self):
+        self.total = 0
+        self.rate = 0.0  # 직전 1초 구간의 초당 호출 수
+        self.peak_rate = 0.0
+        self._window_start = time.perf_counter()
+        self._window_count = 0
+
+    def add(self, count=1):
+        self.total += count
+        self._window_count += count
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.rate = self._window_count / elapsed
+            self.peak_rate = max(self.peak_rate, self.rate)
+            self._window_start = now
+            self._window_count = 0
+
+    def snapshot(self):
+        # 호출이 끊긴 뒤에는 직전 구간 값 대신 0으로
+        idle = time.perf_counter() - self._window_start >= 2.0
+        return {"total": self.total, "rate_per_second": 0.0 if idle else round(self.rate, 1),
+                "peak_rate_per_second": round(self.peak_rate, 1)}
+
+class QueryStats:
+    """SQL 조회 이름별 횟수, 행 수, 시간 분포"""
+
+    def __init__(self):
+        self.rows = 0
+        self.latency = Histogram()
+
+    def snapshot(self):
+        return dict(self.latency.snapshot(), rows=self.rows)
+
+class PerformanceStats:
+    """프로세스 전체의 계측 값, 여러 스레드에서 기록"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.queries = {}  # 이름 → QueryStats
+            self.latencies = {}  # 이름 → Histogram
+            self.counters = {}  # 이름 → RateCounter
+            self.events = deque(maxlen=RECENT_EVENTS)
+
+    def record_query(self, name, seconds, rows=None):
+        milliseconds = seconds * 1000
+        with self._lock:
+            stats = self.queries.get(name)
+            if stats is None:
+                stats = self.queries[name] = QueryStats()
+            stats.latency.add(milliseconds)
+            if rows is not None:
+                stats.rows += rows
+        if milliseconds >= SLOW_QUERY_THRESHOLD:
+            self.add_event("slow_query", name=name, ms=round(milliseconds, 3), rows=rows)
+
+    def record_latency(self, name, seconds):
+        with self._lock:
+            histogram = self.latencies.get(name)
+            if histogram is None:
+                histogram = self.latencies[name] = Histogram()
+            histogram.add(seconds * 1000)
+
+    def count(self, name, count=1):
+        with self._lock:
+            counter = self.counters.get(name)
+            if counter is None:
+                counter = self.counters[name] = RateCounter()
+            counter.add(count)
+
+    def add_event(self, kind, **fields):
+        event = dict(fields, time=format_time(time.time()), kind=kind)
+        with self._lock:  # snapshot()이 목록을 복사하는 중에 다른 스레드가 추가하지 않도록
+            self.events.append(event)
+
+    def snapshot(self):
+        """현재 값을 JSON으로 바꿀 수 있는 dict로"""
+        with self._lock:
+            return {
+                "started": format_time(self.started),
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "queries": {name: stats.snapshot() for name, stats in sorted(self.queries.items())},
+                "latencies": {name: histogram.snapshot() for name, histogram in sorted(self.latencies.items())},
+                "counters": {name: counter.snapshot() for name, counter in sorted(self.counters.items())},
+                "events": list(self.events),
+            }
+
+    def export_json(self, path):
+        """환경 정보, 계측 값, 최근 로그를 JSON 파일로 저장"""
+        report = {
+            "created": format_time(time.time()),
+            "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpu_count": os.cpu_count()},
+            "enabled": self.enabled,
+            "stats": self.snapshot(),
+            "log": RECENT_LOG.records(),
+        }
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+# 프로세스 전체에서 공유하는 계측 값
+STATS = PerformanceStats()
+
+def format_time(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat(timespec="milliseconds")
+
+def fetch_all(cursor, name, query, params=()):
+    """cursor.execute(query, params).fetchall(), 계측 중이면 시간과 행 수를 name으로 기록"""
+    if not STATS.enabled:
+        return cursor.execute(query, params).fetchall()
+    started = time.perf_counter()
+    rows = cursor.execute(query, params).fetchall()
+    STATS.record_query(name, time.perf_counter() - started, len(rows))
+    return rows
+
+def fetch_one(cursor, name, query, params=()):
+    """cursor.execute(query, params).fetchone(), 계측 중이면 시간을 name으로 기록"""
+    if not STATS.enabled:
+        return cursor.execute(query, params).fetchone()
+    started = time.perf_counter()
+    row = cursor.execute(query, params).fetchone()
+    STATS.record_query(name, time.perf_counter() - started, 0 if row is None else 1)
+    return row
+
+def result_rows(result):
+    """조회 함수 결과의 행 수 추정: 목록이면 길이, (페이지, 다음 키) 같은 튜플이면 첫 목록의 길이"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    return None
+
+# 구조화 로그
+def get_logger(name):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+def log_fields(**fields):
+    """logger.info(메시지, extra=log_fields(키=값, ...))"""
+    return {"fields": fields}
+
+class StructuredFormatter(logging.Formatter):
+    """'시각 수준 이름: 메시지 키=값 ...' 한 줄"""
+
+    def format(self, record):
+        line = f"{self.formatTime(record)} {record.levelname} {record.name}: {record.getMessage()}"
+        for key, value in getattr(record, "fields", {}).items():
+            if key != "stack":
+                line += f" {key}={value!r}"
+        if "stack" in getattr(record, "fields", {}):
+            line += "\n" + record.fields["stack"].rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+class RecentLogHandler(logging.Handler):
+    """최근 로그를 dict로 보관 (성능 패널 JSON 내보내기용)"""
+
+    def __init__(self, capacity=RECENT_EVENTS):
+        super().__init__()
+        self._records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self._records.append(dict(
+            getattr(record, "fields", {}),
+            time=format_time(record.created), level=record.levelname, logger=record.name,
+            message=record.getMessage()))
+
+    def records(self):
+        with self.lock:  # emit()은 handle()에서 같은 잠금을 잡고 호출됨
+            return list(self._records)
+
+RECENT_LOG = RecentLogHandler()
+
+def configure_logging(level=None):
+    """arbiter 로거에 표준 오류 출력과 최근 로그 보관 핸들러 연결
+
+    수준은 level, 없으면 ARBITER_LOG_LEVEL 환경 변수(기본 INFO)를 따른다.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level or os.environ.get("ARBITER_LOG_LEVEL", "INFO").upper())
+    if RECENT_LOG not in logger.handlers:
+        stream = logging.StreamHandler()
+        stream.setFormatter(StructuredFormatter())
+        logger.addHandler(stream)
+        logger.addHandler(RECENT_LOG)
+    STATS.set_enabled(os.environ.get("ARBITER_INSTRUMENT", "") not in ("", "0"))
+    return logger
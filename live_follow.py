@@ -0,0 +1,78 @@
+#live_follow.py
+
+# 실시간 따라가기: 주기적으로 다시 동기화되는 ukg.db 사본의 변경 감시
+#
+# DB 파일과 -wal 파일, 그리고 둘이 있는 폴더를 QFileSystemWatcher로 감시한다.
+# - 동기화 중에는 변경 알림이 연달아 오므로 FOLLOW_DELAY 동안 잠잠해진 뒤 한 번만 changed를 보낸다
+# - -wal 파일이 새로 생기거나 동기화 도구가 파일을 지우고 다시 만들면 감시 대상을 다시 등록한다
+# - 파일이 바꿔치기되었으면(장치/inode가 바뀜) 열려 있는 연결이 이전 파일을 가리키므로 replaced로 알린다
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+import os
+
+# 마지막 변경 알림 뒤 새 캡처를 조회할 때까지 기다리는 시간 (밀리초)
+FOLLOW_DELAY = 1000
+
+def file_identity(path):
+    """파일 바꿔치기를 알아보기 위한 (장치, inode), 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+class DatabaseWatcher(QObject):
+    changed = Signal(bool)  # 파일이 바꿔치기되었는지 여부
+
+    def __init__(self, parent=None, delay=FOLLOW_DELAY):
+        super().__init__(parent)
+        self.db_path = None
+        self._identity = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_path_changed)
+        self.watcher.directoryChanged.connect(self.on_path_changed)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.emit_changed)
+
+    def start(self, db_path):
+        self.stop()
+        self.db_path = db_path
+        self._identity = file_identity(db_path)
+        self.watcher.addPath(os.path.dirname(os.path.abspath(db_path)))
+        self.watch_files()
+
+    def stop(self):
+        self.timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.db_path = None
+
+    def is_active(self):
+        return self.db_path is not None
+
+    def watch_files(self):
+        """DB와 -wal 중 존재하지만 감시하지 않는 파일을 등록 (지웠다 다시 만든 파일은 감시에서 빠짐)"""
+        watched = set(self.watcher.files())
+        for path in (self.db_path, self.db_path + "-wal"):
+            if path not in watched and os.path.exists(path):
+                self.watcher.addPath(path)
+
+    def on_path_changed(self, path):
+        if self.db_path is None:
+            return
+        self.watch_files()
+        self.timer.start()  # 동기화가 끝날 때까지 미룸
+
+    def emit_changed(self):
+        if self.db_path is None:
+            return
+        identity = file_identity(self.db_path)
+        if identity is None:
+            self.timer.start()  # 동기화 도구가 아직 파일을 다시 만드는 중
+            return
+        replaced = identity != self._identity
+        self._identity = identity
+        self.changed.emit(replaced)
@@ -4,12 +4,39 @@ import sys
 import os
 import math
 from PySide6.QtWidgets import QApplication, QMainWindow, QTableView, QVBoxLayout, QWidget, QFileDialog, QLabel, \
-    QSplitter, QStatusBar, QStyledItemDelegate
-from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt, QSortFilterProxyModel
-from database import SQLiteTableModel, load_data_from_db
-from image_loader import ImageLoaderThread
-import sqlite3
+    QSplitter, QStatusBar, QStyledItemDelegate, QHBoxLayout, QLineEdit, QComboBox, QCheckBox, QDateTimeEdit, \
+    QPushButton, QDockWidget
+from PySide6.QtGui import QAction, QActionGroup, QPixmap
+from PySide6.QtCore import Qt, Signal
+from database import SQLiteTableModel, CaptureQuery, DEFAULT_TIMEZONE
+from case_model import CaseTableModel, CaseLoadThread
+from workspace import make_sources, find_case_databases
+from datetime import datetime, timezone
+from image_loader import ImageLoader
+from image_table import ImageTableWidget
+from text_search import TextSearchWidget
+from deletion_panel import DeletionGapWidget
+from deletion_analysis import missing_count
+from recovery_panel import RecoveredRecordWidget
+from thumbnail_grid import ThumbnailGridView
+from thumbnail_cache import ThumbnailGeneratorThread, get_thumbnail_cache, image_dir_for_db
+from image_hash import HashIndexThread
+from case_cache import CaseCacheThread
+from image_manifest import ImageManifest, ManifestThread
+from live_follow import DatabaseWatcher
+from connection import close_connections, follow_database
+from performance_panel import PerformancePanel
+from instrumentation import configure_logging, get_logger, log_fields
+
+logger = get_logger("main")
+
+
+# 보기 메뉴에서 고를 수 있는 표시 시간대
+TIMEZONE_CHOICES = [
+    ("UTC", timezone.utc),
+    ("KST (UTC+9)", DEFAULT_TIMEZONE),
+    ("로컬 시간", datetime.now().astimezone().tzinfo),
+]
 
 
 # 특정 열의 텍스트를 가운데 정렬하는 delegate 클래스
@@ -19,6 +46,90 @@ class CenteredDelegate(QStyledItemDelegate):
         option.displayAlignment = Qt.AlignCenter  # 가운데 정렬 설정
 
 
+# 텍스트, 앱, 시간 범위 필터 입력줄 (조건은 CaptureQuery로 SQLite에 전달)
+class CaptureFilterBar(QWidget):
+    filter_changed = Signal()
+
+    def __init__(self):
+        super().__init__()
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.text_edit = QLineEdit()
+        self.text_edit.setPlaceholderText("WindowTitle / Name 검색")
+        self.text_edit.returnPressed.connect(self.filter_changed)
+
+        self.app_combo = QComboBox()
+        self.app_combo.setMinimumContentsLength(20)
+        self.app_combo.addItem("전체 앱", None)
+
+        self.time_check = QCheckBox("기간")
+        self.start_time = QDateTimeEdit()
+        self.end_time = QDateTimeEdit()
+        for time_edit in (self.start_time, self.end_time):
+            time_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+            time_edit.setEnabled(False)
+            self.time_check.toggled.connect(time_edit.setEnabled)
+
+        apply_button = QPushButton("적용")
+        apply_button.clicked.connect(self.filter_changed)
+        reset_button = QPushButton("초기화")
+        reset_button.clicked.connect(self.reset)
+
+        layout.addWidget(self.text_edit, 1)
+        layout.addWidget(self.app_combo)
+        layout.addWidget(self.time_check)
+        layout.addWidget(self.start_time)
+        layout.addWidget(QLabel("~"))
+        layout.addWidget(self.end_time)
+        layout.addWidget(apply_button)
+        layout.addWidget(reset_button)
+
+    def clear(self):
+        self.text_edit.clear()
+        self.app_combo.setCurrentIndex(0)
+        self.time_check.setChecked(False)
+
+    def reset(self):
+        self.clear()
+        self.filter_changed.emit()
+
+    def set_facets(self, facets):
+        """App.Name별 캡처 수로 앱 목록 갱신 (현재 선택 유지)"""
+        current = self.app_combo.currentData()
+        self.app_combo.blockSignals(True)
+        self.app_combo.clear()
+        self.app_combo.addItem("전체 앱", None)
+        for name, count in facets:
+            if name is None:
+                self.app_combo.addItem(f"(앱 없음) ({count})", CaptureQuery.NO_APP)
+            else:
+                self.app_combo.addItem(f"{name} ({count})", name)
+        index = self.app_combo.findData(current)
+        self.app_combo.setCurrentIndex(max(index, 0))
+        self.app_combo.blockSignals(False)
+
+    def set_time_bounds(self, min_timestamp, max_timestamp, tz):
+        """시간 범위 입력의 기본값을 DB의 최소/최대 TimeStamp로 설정"""
+        if min_timestamp is None or max_timestamp is None:
+            return
+        self.start_time.setDateTime(datetime.fromtimestamp(min_timestamp // 1000, tz).replace(tzinfo=None))
+        self.end_time.setDateTime(datetime.fromtimestamp(max_timestamp // 1000 + 1, tz).replace(tzinfo=None))
+
+    def apply_to(self, query, tz):
+        """입력값을 반영한 CaptureQuery 반환 (시간은 표시 시간대 기준으로 해석)"""
+        start_time = end_time = None
+        if self.time_check.isChecked():
+            start_time = int(self.start_time.dateTime().toPython().replace(tzinfo=tz).timestamp() * 1000)
+            end_time = int(self.end_time.dateTime().toPython().replace(tzinfo=tz).timestamp() * 1000)
+        return query.replace(
+            text=self.text_edit.text().strip(),
+            app_name=self.app_combo.currentData(),
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -29,6 +140,10 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.central_widget)
         layout = QVBoxLayout(self.central_widget)
 
+        self.filter_bar = CaptureFilterBar()
+        self.filter_bar.filter_changed.connect(self.apply_filter)
+        layout.addWidget(self.filter_bar)
+
         self.splitter = QSplitter(Qt.Horizontal)
         layout.addWidget(self.splitter)
 
@@ -38,8 +153,58 @@ class MainWindow(QMainWindow):
         self.image_label = QLabel("이미지 표시 창")  # 라벨 텍스트 변경
         self.image_label.setAlignment(Qt.AlignCenter)
         self.image_label.setFixedSize(400, 600)
+
+        # 선택한 행의 이미지를 불러오는 공용 로더
+        self.image_loader = ImageLoader()
+        self.image_loader.image_loaded.connect(self.display_image)
         self.splitter.addWidget(self.image_label)
 
+        # 이미지 타임라인 및 OCR 텍스트 검색 패널
+        self.image_table = ImageTableWidget()
+        self.timeline_dock = QDockWidget("타임라인", self)
+        self.timeline_dock.setWidget(self.image_table)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.timeline_dock)
+
+        self.text_search = TextSearchWidget()
+        self.text_search.capture_selected.connect(self.image_table.jump_to_capture)
+        self.text_search_dock = QDockWidget("텍스트 검색", self)
+        self.text_search_dock.setWidget(self.text_search)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.text_search_dock)
+
+        # 삭제된 Id 구간 목록, 선택하면 표와 타임라인에서 해당 위치로 이동
+        self.deletion_panel = DeletionGapWidget()
+        self.deletion_panel.gap_selected.connect(self.jump_to_gap)
+        self.deletion_dock = QDockWidget("삭제 구간", self)
+        self.deletion_dock.setWidget(self.deletion_panel)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.deletion_dock)
+
+        # 프리리스트/빈 공간/WAL에서 복구한 삭제 레코드
+        self.recovery_panel = RecoveredRecordWidget()
+        self.recovery_panel.record_selected.connect(self.show_recovered_capture)
+        self.recovery_dock = QDockWidget("복구된 레코드", self)
+        self.recovery_dock.setWidget(self.recovery_panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.recovery_dock)
+        self.tabifyDockWidget(self.timeline_dock, self.recovery_dock)
+
+        # 타임라인 이미지 목록의 썸네일 격자, 선택하면 타임라인과 표에서 해당 캡처로 이동
+        self.thumbnail_grid = ThumbnailGridView()
+        self.thumbnail_grid.capture_selected.connect(self.jump_to_capture_at)
+        self.image_table.images_loaded.connect(self.update_thumbnail_grid)
+        self.image_table.images_appended.connect(self.thumbnail_grid.append_images)
+        self.thumbnail_dock = QDockWidget("썸네일", self)
+        self.thumbnail_dock.setWidget(self.thumbnail_grid)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.thumbnail_dock)
+        self.tabifyDockWidget(self.timeline_dock, self.thumbnail_dock)
+        self.timeline_dock.raise_()
+
+        # SQL 조회/디코딩 시간, data() 호출 수, GUI 정지 계측 패널
+        self.performance_panel = PerformancePanel()
+        self.performance_dock = QDockWidget("성능", self)
+        self.performance_dock.setWidget(self.performance_panel)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.performance_dock)
+        self.tabifyDockWidget(self.deletion_dock, self.performance_dock)
+        self.deletion_dock.raise_()
+
         # 상태바 설정
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
@@ -49,36 +214,173 @@ class MainWindow(QMainWindow):
         open_file_action = QAction("파일 열기", self)
         open_file_action.triggered.connect(self.open_file_dialog)
         file_menu.addAction(open_file_action)
-
-        self.proxy_model = QSortFilterProxyModel(self)  # QSortFilterProxyModel 설정
-        self.table_view.setModel(self.proxy_model)
-        self.table_view.setSortingEnabled(True)
+        open_case_action = QAction("케이스 열기 (여러 DB)", self)
+        open_case_action.triggered.connect(self.open_case_dialog)
+        file_menu.addAction(open_case_action)
+        open_case_folder_action = QAction("케이스 폴더 열기", self)
+        open_case_folder_action.triggered.connect(self.open_case_folder_dialog)
+        file_menu.addAction(open_case_folder_action)
+        generate_thumbnails_action = QAction("썸네일 미리 생성", self)
+        generate_thumbnails_action.triggered.connect(self.generate_thumbnails)
+        file_menu.addAction(generate_thumbnails_action)
+        hash_index_action = QAction("유사 이미지 색인 생성", self)
+        hash_index_action.triggered.connect(self.build_hash_index)
+        file_menu.addAction(hash_index_action)
+        case_cache_action = QAction("케이스 색인 생성", self)
+        case_cache_action.triggered.connect(self.build_case_cache)
+        file_menu.addAction(case_cache_action)
+        carve_action = QAction("삭제 레코드 복구", self)
+        carve_action.triggered.connect(self.start_carving)
+        file_menu.addAction(carve_action)
+        manifest_action = QAction("이미지 무결성 매니페스트 생성", self)
+        manifest_action.triggered.connect(lambda: self.build_manifest(full=False))
+        file_menu.addAction(manifest_action)
+        full_manifest_action = QAction("이미지 무결성 전체 재검증", self)
+        full_manifest_action.triggered.connect(lambda: self.build_manifest(full=True))
+        file_menu.addAction(full_manifest_action)
+        file_menu.addSeparator()
+        # 계속 다시 동기화되는 ukg.db 사본을 따라가며 새 캡처만 추가
+        self.follow_action = QAction("실시간 따라가기", self, checkable=True)
+        self.follow_action.toggled.connect(self.set_follow)
+        file_menu.addAction(self.follow_action)
+        self.db_watcher = DatabaseWatcher(self)
+        self.db_watcher.changed.connect(self.follow_changes)
+        self.thumbnail_thread = None
+        self.hash_thread = None
+        self.cache_thread = None
+        self.manifest_thread = None
+
+        # 표시 시간대 선택
+        self.display_timezone = DEFAULT_TIMEZONE
+        view_menu = self.menu_bar.addMenu("보기")
+        timezone_menu = view_menu.addMenu("시간대")
+        timezone_group = QActionGroup(self)
+        for label, tz in TIMEZONE_CHOICES:
+            timezone_action = QAction(label, self, checkable=True)
+            timezone_action.setChecked(tz == self.display_timezone)
+            timezone_action.triggered.connect(lambda checked, tz=tz: self.set_display_timezone(tz))
+            timezone_group.addAction(timezone_action)
+            timezone_menu.addAction(timezone_action)
+        view_menu.addAction(self.timeline_dock.toggleViewAction())
+        view_menu.addAction(self.text_search_dock.toggleViewAction())
+        view_menu.addAction(self.deletion_dock.toggleViewAction())
+        view_menu.addAction(self.recovery_dock.toggleViewAction())
+        view_menu.addAction(self.thumbnail_dock.toggleViewAction())
+        view_menu.addAction(self.performance_dock.toggleViewAction())
+
+        # 정렬은 SQLiteTableModel.sort에서 ORDER BY로 처리
+        self.table_model = None
+        self.table_view.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.case_thread = None
 
         self.db_path = ""
+        self.case_paths = []  # 케이스로 연 DB 경로 (단일 DB면 비어 있음)
 
+    def load_data(self, db_path):
+        self.close_case()
+        # 다른 케이스를 열면 이전 DB의 공유 연결을 닫음
+        if self.db_path and os.path.abspath(self.db_path) != os.path.abspath(db_path):
+            close_connections(self.db_path)
+
+        # 첫 페이지만 읽고 나머지는 스크롤할 때 fetchMore로 읽어옴
+        # 관련 App/File/Web은 캡처당 한 행으로 묶어서 표시
+        header = self.table_view.horizontalHeader()
+        if isinstance(self.table_model, CaseTableModel):
+            header.setSortIndicator(0, Qt.AscendingOrder)  # 케이스 전용 Source 열 정렬은 쓰지 않음
+        query = CaptureQuery(
+            sort_column=SQLiteTableModel.HEADERS[header.sortIndicatorSection()],
+            descending=header.sortIndicatorOrder() == Qt.DescendingOrder,
+        )
+        self.filter_bar.clear()  # 이전 DB의 필터는 초기화
+        # 따라가기 중이면 immutable 없이 열고 DB/-wal 변경 감시
+        self.db_watcher.stop()
+        follow_database(db_path, self.follow_action.isChecked())
+        self.set_table_model(SQLiteTableModel(db_path, aggregate=True, tz=self.display_timezone, query=query))
+        self.set_active_db(db_path)
+        if self.follow_action.isChecked():
+            self.db_watcher.start(db_path)
+
+    def load_case(self, db_paths):
+        """여러 DB를 한 케이스로 열기: 프로세스 풀에서 동시에 읽고 TimeStamp 순으로 병합"""
+        sources = make_sources(db_paths)
+        if not sources:
+            self.status_bar.showMessage("ukg.db 파일을 찾지 못했습니다.")
+            return
+        self.close_case()
+        if self.db_path:
+            close_connections(self.db_path)
+        self.stop_following()  # 케이스는 따라가지 않음
+
+        self.filter_bar.clear()
+        model = CaseTableModel(sources, tz=self.display_timezone)
+        self.set_table_model(model)
+        self.table_view.horizontalHeader().setSortIndicator(model.headers.index("TimeStamp"), Qt.AscendingOrder)
+        self.case_paths = [source.db_path for source in sources]
+        model.set_gap_source(0)
+        self.set_active_db(sources[0].db_path)
+
+        self.status_bar.showMessage(f"케이스 로드 중... 0/{len(sources)}")
+        self.case_thread = CaseLoadThread(sources)
+        self.case_thread.progress.connect(
+            lambda done, total: self.status_bar.showMessage(f"케이스 로드 중... {done}/{total}"))
+        self.case_thread.case_loaded.connect(
+            lambda rows, row_sources, results: self.on_case_loaded(model, rows, row_sources, results))
+        self.case_thread.start()
+
+    def on_case_loaded(self, model, rows, row_sources, results):
+        if model is not self.table_model:
+            return  # 로드 중에 다른 DB를 연 경우
+        self.case_thread.wait()  # 결과를 보낸 뒤 run()이 끝날 때까지
+        self.case_thread = None
+        model.load_case(rows, row_sources, results)
+        for index, message in model.errors.items():
+            logger.error("DB 로드 오류", extra=log_fields(db_path=model.sources[index].db_path, error=message))
+        model.request_facets()
+
+    def close_case(self):
+        """케이스 로드 스레드와 케이스 DB들의 공유 연결 정리"""
+        if self.case_thread is not None:
+            self.case_thread.wait()
+            self.case_thread = None
+        for db_path in self.case_paths:
+            close_connections(db_path)
+        self.case_paths = []
+
+    def set_table_model(self, model):
+        """표 모델을 바꾸고 신호 연결 (이전 모델의 조회 스레드는 정리)"""
+        if self.table_model is not None:
+            self.table_model.close()
+        self.table_model = model
+        model.page_loaded.connect(self.on_first_page_loaded, Qt.SingleShotConnection)
+        model.load_failed.connect(
+            lambda message: self.status_bar.showMessage("데이터를 불러오지 못했습니다."))
+        model.facets_loaded.connect(self.filter_bar.set_facets)
+        model.time_bounds_loaded.connect(
+            lambda min_timestamp, max_timestamp: self.filter_bar.set_time_bounds(
+                min_timestamp, max_timestamp, self.display_timezone))
+        model.deletion_analyzed.connect(self.on_deletion_analyzed)
+        model.deletion_failed.connect(
+            lambda message: self.status_bar.showMessage(f"삭제 여부 확인 실패: {message}"))
+        model.capture_located.connect(self.select_table_row)
+        model.new_captures.connect(self.on_new_captures)
+        model.request_facets()
+
+        self.table_view.setModel(model)
+        self.table_view.setSortingEnabled(True)
         self.table_view.selectionModel().selectionChanged.connect(self.update_image_display)
 
-    def load_data(self, db_path):
+    def set_active_db(self, db_path):
+        """타임라인, 텍스트 검색, 삭제 구간, 복구 패널이 다룰 DB 지정"""
         self.db_path = db_path
-        data, headers = load_data_from_db(db_path)
-
-        if data:
-            # 새 열 추가: '이미지' 열 추가
-            updated_data = []
-            for row in data:
-                row = list(row)  # 튜플을 리스트로 변환
-                image_token = row[2]  # 3번째 열이 ImageToken 값이라고 가정
-                if image_token:  # ImageToken 값이 있으면 'O'
-                    row.append("O")
-                else:  # ImageToken 값이 없으면 'X'
-                    row.append("X")
-                updated_data.append(row)  # 변환된 리스트를 새로운 데이터에 추가
-
-            # 헤더에 새 열 이름 추가
-            headers.append("이미지")
-
-            model = SQLiteTableModel(updated_data, headers)
-            self.proxy_model.setSourceModel(model)
+        self.image_table.set_db_path(db_path)
+        self.text_search.set_db_path(db_path)
+        self.deletion_panel.clear()
+        self.recovery_panel.set_db_path(db_path)
+
+    def on_first_page_loaded(self, row_count):
+        """첫 페이지가 도착하면 열 표시 설정 및 삭제 여부 확인"""
+        if row_count:
+            headers = self.table_model.headers
 
             # 숨기려는 열의 인덱스를 지정하여 숨김 (ImageToken 열이 3번째 열이라고 가정)
             self.table_view.hideColumn(2)  # ImageToken 열 숨기기
@@ -100,60 +402,262 @@ class MainWindow(QMainWindow):
         else:
             self.status_bar.showMessage("데이터를 불러오지 못했습니다.")
 
-    def check_deletion_and_calculate_next_id(self):
-        """ 첫 번째 ID 값과 Next ID 값을 비교하고 삭제 여부를 O 또는 X로 표시 """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # WindowCapture 테이블에서 가장 작은 (첫 번째) ID 값을 찾음
-            cursor.execute("SELECT MIN(Id) FROM WindowCapture;")
-            first_id_row = cursor.fetchone()
-            first_id = first_id_row[0] if first_id_row and first_id_row[0] is not None else 0
-
-            # IdTable에서 Next ID 값을 확인
-            cursor.execute("SELECT * FROM IdTable;")
-            next_id_row = cursor.fetchone()
-            next_id = next_id_row[0] if next_id_row else 0
-
-            # 삭제 여부 확인 (비교 논리를 구현)
-            if first_id == 0 or next_id != first_id + 1:
-                deletion_status = "O"  # 삭제된 항목이 있음
-            else:
-                deletion_status = "X"  # 삭제된 항목이 없음
-
-            # 상태바에 삭제 여부 표시
-            self.status_bar.showMessage(f"삭제 여부: {deletion_status}, 첫 ID: {first_id}, Next ID: {next_id}")
-
-            conn.close()
+    def apply_filter(self):
+        """필터 입력을 WHERE 조건으로 반영하고 앱별 개수를 다시 계산"""
+        if self.table_model is None:
+            return
+        self.table_model.set_query(self.filter_bar.apply_to(self.table_model.query, self.display_timezone))
+        self.table_model.request_facets()
+
+    def set_display_timezone(self, tz):
+        """표 TimeStamp 열과 타임라인, 썸네일, 검색/삭제/복구 패널의 표시 시간대 변경"""
+        self.display_timezone = tz
+        self.text_search.tz = tz
+        self.deletion_panel.set_timezone(tz)
+        self.recovery_panel.tz = tz
+        self.image_table.set_timezone(tz)
+        self.thumbnail_grid.set_timezone(tz)
+        if self.table_model is not None:
+            self.table_model.set_timezone(tz)
+
+    def generate_thumbnails(self):
+        """현재 케이스의 ImageStore 전체 썸네일을 백그라운드에서 디스크 캐시에 생성"""
+        if not self.db_path or (self.thumbnail_thread is not None and self.thumbnail_thread.isRunning()):
+            return
+        cache = get_thumbnail_cache(image_dir_for_db(self.db_path))
+        self.thumbnail_thread = ThumbnailGeneratorThread(cache)
+        self.thumbnail_thread.progress.connect(
+            lambda done, total: self.status_bar.showMessage(f"썸네일 생성 중: {done}/{total}"))
+        self.thumbnail_thread.finished_generation.connect(
+            lambda created: self.status_bar.showMessage(f"썸네일 생성 완료: {created}개 새로 생성"))
+        self.thumbnail_thread.start()
+
+    def build_hash_index(self):
+        """현재 DB의 ImageToken이 가리키는 이미지 전체의 dHash 색인을 백그라운드에서 생성 (바뀐 파일만 계산)"""
+        if not self.db_path or (self.hash_thread is not None and self.hash_thread.isRunning()):
+            return
+        self.hash_thread = HashIndexThread(self.db_path, image_dir_for_db(self.db_path))
+        self.hash_thread.progress.connect(
+            lambda done, total: self.status_bar.showMessage(f"유사 이미지 색인 생성 중: {done}/{total}"))
+        self.hash_thread.index_ready.connect(self.on_hash_index_ready)
+        self.hash_thread.index_failed.connect(
+            lambda message: self.status_bar.showMessage(f"유사 이미지 색인 생성 실패: {message}"))
+        self.hash_thread.start()
+
+    def build_case_cache(self):
+        """현재 DB의 보조 캐시(조인을 미리 합친 캡처 표, 시간 색인, 시간 구간별 개수)를 백그라운드에서 생성"""
+        if not self.db_path or (self.cache_thread is not None and self.cache_thread.isRunning()):
+            return
+        self.cache_thread = CaseCacheThread(self.db_path)
+        self.cache_thread.progress.connect(
+            lambda stage, done, total: self.status_bar.showMessage(
+                f"케이스 색인 생성 중: {stage} {done}/{total}" if total else f"케이스 색인 생성 중: {stage}"))
+        self.cache_thread.cache_ready.connect(self.on_case_cache_ready)
+        self.cache_thread.cache_failed.connect(
+            lambda message: self.status_bar.showMessage(f"케이스 색인 생성 실패: {message}"))
+        self.cache_thread.start()
+
+    def on_case_cache_ready(self, db_path, cache_path):
+        self.status_bar.showMessage("케이스 색인 완료")
+        self.image_table.set_cache_path(db_path, cache_path)
+        if isinstance(self.table_model, SQLiteTableModel) and self.table_model.db_path == db_path:
+            self.table_model.set_cache_path(cache_path)
+
+    def on_hash_index_ready(self, image_dir, hashes):
+        self.status_bar.showMessage(f"유사 이미지 색인 완료: {len(hashes)}장")
+        self.image_table.set_image_hashes(image_dir, hashes)
+
+    def build_manifest(self, full=False):
+        """현재 DB의 ImageStore 무결성 매니페스트를 백그라운드에서 갱신 (full이 아니면 바뀐 파일만 해시)"""
+        if not self.db_path or (self.manifest_thread is not None and self.manifest_thread.isRunning()):
+            return
+        self.manifest_thread = ManifestThread(self.db_path, image_dir_for_db(self.db_path), full=full)
+        self.manifest_thread.progress.connect(
+            lambda done, total: self.status_bar.showMessage(f"이미지 해시 중: {done}/{total}"))
+        self.manifest_thread.manifest_ready.connect(self.on_manifest_ready)
+        self.manifest_thread.manifest_failed.connect(
+            lambda message: self.status_bar.showMessage(f"매니페스트 생성 실패: {message}"))
+        self.manifest_thread.start()
+
+    def on_manifest_ready(self, report):
+        """요약을 상태바에 표시하고 매니페스트 CSV 저장 위치를 물음"""
+        summary = (
+            f"매니페스트: 파일 {report.file_count}개 (해시 {report.hashed}, 재사용 {report.reused}), "
+            f"해시 변경 {len(report.changed)}, 사라진 파일 {len(report.removed)}, "
+            f"캡처 없는 파일 {len(report.orphan_files)}, 파일 없는 토큰 {len(report.missing_files)}"
+        )
+        self.status_bar.showMessage(summary)
+        for token in report.changed:
+            logger.warning("해시 변경", extra=log_fields(image_path=os.path.join(report.image_dir, token)))
+        for token in report.unreadable:
+            logger.warning("읽을 수 없는 파일", extra=log_fields(image_path=os.path.join(report.image_dir, token)))
+
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "매니페스트 저장", "image_manifest.csv", "CSV Files (*.csv)")
+        if output_path:
+            try:
+                count = ImageManifest(report.image_dir).export_csv(output_path, report)
+            except OSError as e:
+                self.status_bar.showMessage(f"매니페스트 저장 실패: {e}")
+                return
+            self.status_bar.showMessage(f"{summary} - {count}행 저장")
+
+    def set_follow(self, enabled):
+        """따라가기 모드 전환, 연결 모드가 바뀌므로 현재 DB를 한 번 다시 연다"""
+        if enabled and self.case_paths:
+            self.status_bar.showMessage("케이스(여러 DB)에서는 실시간 따라가기를 지원하지 않습니다.")
+            self.stop_following()
+            return
+        if self.db_path:
+            self.load_data(self.db_path)
+            if enabled:
+                self.status_bar.showMessage(f"실시간 따라가기: {self.db_path}")
+
+    def stop_following(self):
+        self.db_watcher.stop()
+        if self.db_path:
+            follow_database(self.db_path, False)
+        self.follow_action.blockSignals(True)
+        self.follow_action.setChecked(False)
+        self.follow_action.blockSignals(False)
+
+    def follow_changes(self, replaced):
+        """DB나 -wal이 바뀌면 새 캡처만 표와 타임라인 끝에 추가"""
+        if self.table_model is None or self.case_paths:
+            return
+        if replaced:
+            close_connections(self.db_path)  # 동기화 도구가 파일을 바꿔치기함
+        self.table_model.follow_new_captures(reopen=replaced)
+        self.image_table.follow_new_images()
+
+    def on_new_captures(self, count, appended):
+        if appended:
+            self.status_bar.showMessage(f"새 캡처 {count}건 추가")
+        else:
+            self.status_bar.showMessage(
+                f"새 캡처 {count}건 (Id/TimeStamp 오름차순 정렬일 때 표 끝에 추가됩니다)")
+
+    def closeEvent(self, event):
+        """실행 중인 작업 스레드 정리"""
+        self.db_watcher.stop()
+        if self.thumbnail_thread is not None:
+            self.thumbnail_thread.cancel()
+            self.thumbnail_thread.wait()
+        if self.hash_thread is not None:
+            self.hash_thread.cancel()
+            self.hash_thread.wait()
+        if self.cache_thread is not None:
+            self.cache_thread.cancel()
+            self.cache_thread.wait()
+        if self.manifest_thread is not None:
+            self.manifest_thread.cancel()
+            self.manifest_thread.wait()
+        if self.table_model is not None:
+            self.table_model.close()
+        if self.case_thread is not None:
+            self.case_thread.wait()
+        self.text_search.cancel_search()
+        self.recovery_panel.cancel_carving()
+        self.image_table.shutdown()
+        self.thumbnail_grid.shutdown()
+        self.image_loader.shutdown()
+        self.performance_panel.shutdown()
+        super().closeEvent(event)
 
-        except Exception as e:
-            self.status_bar.showMessage(f"삭제 여부 확인 실패: {str(e)}")
+    def check_deletion_and_calculate_next_id(self):
+        """ Id 공백 분석을 백그라운드에서 실행 (결과는 on_deletion_analyzed) """
+        self.status_bar.showMessage("삭제 여부 확인 중...")
+        self.table_model.request_deletion_analysis()
+
+    def on_deletion_analyzed(self, report):
+        """ 상태바에 삭제 여부 요약을 표시하고 공백 목록과 표 표시를 갱신 """
+        deletion_status = "O" if report.gaps else "X"
+        self.status_bar.showMessage(
+            f"삭제 여부: {deletion_status}, 누락 구간: {len(report.gaps)}개 ({missing_count(report)}개 Id), "
+            f"첫 ID: {report.first_id}, Next ID: {report.next_id}"
+        )
+        self.deletion_panel.set_report(report)
+        self.table_model.set_gap_markers(report)
+
+    def jump_to_gap(self, capture_id, timestamp):
+        """ 공백과 맞닿은 캡처를 타임라인과 표에서 선택 """
+        self.jump_to_capture_at(capture_id, timestamp)
+
+    def jump_to_capture_at(self, capture_id, timestamp):
+        """ 캡처를 타임라인과 표에서 선택 """
+        self.image_table.jump_to_capture(capture_id, timestamp)
+        if self.table_model is not None:
+            self.status_bar.showMessage(f"Id {capture_id} 찾는 중...")
+            self.table_model.locate_capture(capture_id)
+
+    def update_thumbnail_grid(self):
+        """ 타임라인에서 넘겨 보는 이미지 목록(검색 범위, 접기 모드 반영)을 썸네일 격자에 표시 """
+        self.thumbnail_grid.set_images(self.image_table.thumbnail_cache, self.image_table.images)
+
+    def select_table_row(self, row):
+        if row < 0:
+            self.status_bar.showMessage("현재 필터 조건에서는 해당 캡처가 표시되지 않습니다.")
+            return
+        self.status_bar.clearMessage()
+        index = self.table_model.index(row, 0)
+        self.table_view.selectRow(row)
+        self.table_view.scrollTo(index, QTableView.PositionAtCenter)
+
+    def start_carving(self):
+        """ 복구 패널을 보이고 현재 DB의 삭제 레코드 카빙 시작 """
+        if not self.db_path:
+            return
+        self.recovery_dock.show()
+        self.recovery_dock.raise_()
+        self.recovery_panel.start_carving()
+
+    def show_recovered_capture(self, capture_id, timestamp, image_token):
+        """ 복구한 캡처 시각으로 타임라인을 옮기고, ImageStore에 이미지가 남아 있으면 표시 """
+        self.image_table.jump_to_capture(capture_id, timestamp)
+        image_path = os.path.join(image_dir_for_db(self.db_path), image_token) if image_token else None
+        if image_path and os.path.exists(image_path):
+            self.load_image_in_thread(image_path)
+        else:
+            self.image_loader.cancel()
+            self.image_label.setText("복구한 캡처의 이미지 파일이 없습니다.")
 
     def open_file_dialog(self):
         db_path, _ = QFileDialog.getOpenFileName(self, "데이터베이스 파일 선택", "", "SQLite Files (*.db)")
         if db_path:
             self.load_data(db_path)
 
+    def open_case_dialog(self):
+        db_paths, _ = QFileDialog.getOpenFileNames(self, "케이스 데이터베이스 파일 선택", "", "SQLite Files (*.db)")
+        if len(db_paths) == 1:
+            self.load_data(db_paths[0])
+        elif db_paths:
+            self.load_case(db_paths)
+
+    def open_case_folder_dialog(self):
+        folder = QFileDialog.getExistingDirectory(self, "케이스 폴더 선택 (하위 폴더의 ukg.db를 모두 열기)")
+        if folder:
+            self.load_case(find_case_databases(folder))
+
     def update_image_display(self, selected, deselected):
         """ 이미지 토큰 열이 있는 행의 아무 열을 클릭하면 이미지를 표시 """
         for index in selected.indexes():
             row = index.row()  # 선택된 행의 인덱스를 가져옴
-            image_token_index = self.proxy_model.index(row, 2)  # 3번째 열이 ImageToken 값인 열이라고 가정
-            image_token = image_token_index.data()  # ImageToken 값을 가져옴
-
-            if image_token:  # ImageToken 값이 존재하는지 확인
-                # 이미지 디렉토리 경로 설정
-                image_dir = os.path.join(os.path.dirname(self.db_path), "ImageStore")
-                image_path = os.path.join(image_dir, image_token)
+            # 케이스에서는 선택한 캡처가 들어 있던 DB로 패널들을 전환
+            db_path = self.table_model.db_path_for_row(row)
+            if db_path != self.db_path:
+                self.set_active_db(db_path)
+                self.table_model.set_gap_source(self.table_model.source_for_row(row).index)
+                self.check_deletion_and_calculate_next_id()
 
-                # 경로 확인을 위해 추가한 디버그 메시지
-                print(f"이미지 파일 경로: {image_path}")
+            image_path = self.table_model.image_path(row)
+            if image_path:  # ImageToken 값이 존재하는지 확인
+                logger.debug("이미지 선택", extra=log_fields(image_path=image_path))
 
                 # 파일이 존재하지 않는 경우
                 if not os.path.exists(image_path):
-                    self.image_label.setText(f"이미지 파일을 찾을 수 없습니다: {image_token}")
-                    print(f"이미지 파일을 찾을 수 없습니다: {image_path}")  # 디버깅 메시지 추가
+                    self.image_loader.cancel()  # 진행 중인 이전 선택의 이미지가 덮어쓰지 않도록
+                    self.image_label.setText(f"이미지 파일을 찾을 수 없습니다: {os.path.basename(image_path)}")
+                    logger.warning("이미지 파일을 찾을 수 없습니다", extra=log_fields(image_path=image_path))
                     return
 
                 # 스레드에서 이미지 로드
@@ -161,18 +665,23 @@ class MainWindow(QMainWindow):
                 break  # 첫 번째 선택 항목에 대해 이미지를 표시한 후, 반복 종료
 
     def load_image_in_thread(self, image_path):
-        # 이미지 로더 스레드를 사용하여 이미지 로드
-        self.image_loader_thread = ImageLoaderThread(image_path)
-        self.image_loader_thread.image_loaded.connect(self.display_image)
-
-        self.image_loader_thread.start()
+        # 공용 이미지 로더를 사용하여 이미지 로드
+        # 라벨 크기로 바로 디코딩, 빠르게 선택을 바꾸면 마지막 선택만 표시됨
+        self.image_loader.request(image_path, self.image_label.width(), self.image_label.height())
 
-    def display_image(self, pixmap):
-        self.image_label.setPixmap(pixmap.scaled(self.image_label.size(), Qt.KeepAspectRatio))
+    def display_image(self, request_id, image):
+        if not self.image_loader.is_latest(request_id):
+            return  # 이전 선택의 이미지
+        if image.isNull():
+            self.image_label.setText("이미지를 로드할 수 없습니다.")
+            return
+        self.image_label.setPixmap(QPixmap.fromImage(image))
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setApplicationName("arbiter")  # 썸네일 등 캐시 디렉토리 이름
+    configure_logging()  # ARBITER_LOG_LEVEL, ARBITER_INSTRUMENT 환경 변수
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,190 @@
+#performance_panel.py
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QPushButton, QTreeWidget, \
+    QTreeWidgetItem, QHeaderView, QFileDialog
+from PySide6.QtCore import QObject, QTimer
+from instrumentation import STATS, get_logger, log_fields
+import sys
+import threading
+import time
+import traceback
+
+# 패널 갱신 간격 (밀리초)
+REFRESH_INTERVAL = 1000
+# GUI 스레드 주기 타이머 간격 (밀리초)
+HEARTBEAT_INTERVAL = 100
+# 주기 타이머가 이만큼 늦으면 GUI 정지로 기록 (밀리초)
+STALL_THRESHOLD = 200
+# GUI 스레드가 이만큼 멈춰 있으면 감시 스레드가 호출 스택을 남김 (밀리초)
+STALL_STACK_THRESHOLD = 1000
+
+# GUI 스레드 정지 감지
+class StallMonitor(QObject):
+    """GUI 스레드의 주기 타이머가 늦게 온 시간을 정지로 기록
+
+    정지는 끝난 뒤에야 타이머로 알 수 있으므로, 감시 스레드가 마지막 타이머 이후 오래 지났는지 확인하고
+    아직 멈춰 있는 GUI 스레드의 호출 스택을 한 번 로그로 남긴다.
+    """
+
+    def __init__(self, stats=STATS, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        self.timer = QTimer(self)
+        self.timer.setInterval(HEARTBEAT_INTERVAL)
+        self.timer.timeout.connect(self.on_heartbeat)
+        self._last_beat = time.perf_counter()
+        self._stack_logged = False
+        self._gui_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    def start(self):
+        if self.timer.isActive():
+            return
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self.timer.start()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self.watch, name="stall-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self.timer.stop()
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def on_heartbeat(self):
+        now = time.perf_counter()
+        late = (now - self._last_beat) * 1000 - HEARTBEAT_INTERVAL
+        self._last_beat = now
+        self._stack_logged = False
+        if late >= STALL_THRESHOLD:
+            self.stats.record_latency("gui.stall", late / 1000)
+            self.stats.add_event("gui_stall", ms=round(late, 1))
+            get_logger("stall").warning("GUI 스레드 정지", extra=log_fields(ms=round(late, 1)))
+
+    def watch(self):
+        while not self._stop.wait(HEARTBEAT_INTERVAL / 1000):
+            stalled = (time.perf_counter() - self._last_beat) * 1000
+            if stalled < STALL_STACK_THRESHOLD or self._stack_logged:
+                continue
+            frame = sys._current_frames().get(self._gui_thread_id)
+            if frame is None:
+                continue
+            self._stack_logged = True
+            stack = "".join(traceback.format_stack(frame))
+            self.stats.add_event("gui_stall_stack", ms=round(stalled, 1), stack=stack)
+            get_logger("stall").warning("GUI 스레드가 멈춰 있음", extra=log_fields(ms=round(stalled, 1), stack=stack))
+
+# 계측 값(SQL 조회, 지연 분포, 호출 수, 최근 이벤트) 패널
+class PerformancePanel(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.stall_monitor = StallMonitor(STATS, self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        control_layout = QHBoxLayout()
+        self.enabled_checkbox = QCheckBox("계측 사용")
+        self.enabled_checkbox.toggled.connect(self.set_enabled)
+        control_layout.addWidget(self.enabled_checkbox)
+        self.status_label = QLabel("")
+        control_layout.addWidget(self.status_label, 1)
+        reset_button = QPushButton("초기화")
+        reset_button.clicked.connect(self.reset)
+        control_layout.addWidget(reset_button)
+        export_button = QPushButton("JSON 내보내기")
+        export_button.clicked.connect(self.export_json)
+        control_layout.addWidget(export_button)
+        layout.addLayout(control_layout)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["항목", "횟수", "평균 ms", "p95 ms", "최대 ms", "비고"])
+        self.tree.header().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(self.tree)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self._filled = False
+
+        self.enabled_checkbox.setChecked(STATS.enabled)  # ARBITER_INSTRUMENT로 켠 경우
+        self.refresh()
+
+    def set_enabled(self, enabled):
+        STATS.set_enabled(enabled)
+        if enabled:
+            self.stall_monitor.start()
+            self.refresh_timer.start()
+        else:
+            self.stall_monitor.stop()
+            self.refresh_timer.stop()
+        self.refresh()
+
+    def reset(self):
+        STATS.reset()
+        self.refresh()
+
+    def refresh(self):
+        """계측 값으로 목록을 다시 채움 (펼침 상태 유지)"""
+        if not self.isVisible() and self._filled:
+            return
+        snapshot = STATS.snapshot()
+        expanded = {self.tree.topLevelItem(index).text(0) for index in range(self.tree.topLevelItemCount())
+                    if self.tree.topLevelItem(index).isExpanded()}
+        self.tree.clear()
+
+        queries = self.add_group("SQL 조회", expanded)
+        for name, stats in snapshot["queries"].items():
+            self.add_latency(queries, name, stats, f"{stats['rows']}행")
+        latencies = self.add_group("지연 시간", expanded)
+        for name, stats in snapshot["latencies"].items():
+            self.add_latency(latencies, name, stats, "")
+        counters = self.add_group("호출 수", expanded)
+        for name, counter in snapshot["counters"].items():
+            QTreeWidgetItem(counters, [name, str(counter["total"]), "", "", "",
+                                       f"{counter['rate_per_second']}/초 (최대 {counter['peak_rate_per_second']}/초)"])
+        events = self.add_group("최근 이벤트", expanded)
+        for event in reversed(snapshot["events"]):
+            detail = ", ".join(f"{key}={value}" for key, value in event.items()
+                               if key not in ("time", "kind", "ms", "stack"))
+            item = QTreeWidgetItem(events, [f"{event['time']} {event['kind']}", "", "", "",
+                                            str(event.get("ms", "")), detail])
+            if "stack" in event:
+                item.setToolTip(0, event["stack"])
+
+        state = "켜짐" if STATS.enabled else "꺼짐"
+        self.status_label.setText(f"{state}, {snapshot['elapsed_seconds']:.0f}초 동안 기록")
+        self._filled = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def add_group(self, title, expanded):
+        group = QTreeWidgetItem(self.tree, [title])
+        group.setExpanded(title in expanded if self._filled else True)
+        return group
+
+    def add_latency(self, parent, name, stats, note):
+        QTreeWidgetItem(parent, [name, str(stats["count"]), f"{stats['mean_ms']:.2f}", f"{stats['p95_ms']:g}",
+                                 f"{stats['max_ms']:.1f}", note])
+
+    def export_json(self):
+        output_path, _ = QFileDialog.getSaveFileName(self, "계측 결과 저장", "arbiter_performance.json",
+                                                     "JSON Files (*.json)")
+        if not output_path:
+            return
+        try:
+            STATS.export_json(output_path)
+        except OSError as e:
+            self.status_label.setText(f"저장 실패: {e}")
+            return
+        self.status_label.setText(f"저장됨: {output_path}")
+
+    def shutdown(self):
+        self.refresh_timer.stop()
+        self.stall_monitor.stop()
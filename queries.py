@@ -0,0 +1,367 @@
+#queries.py
+
+from datetime import datetime, timedelta, timezone
+from connection import open_readonly
+from instrumentation import get_logger, log_fields
+
+logger = get_logger("queries")
+
+# 표시 시간대 (기본값 KST, UTC+9)
+DEFAULT_TIMEZONE = timezone(timedelta(hours=9), "KST")
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 한 번에 읽어오는 WindowCapture 행 수
+PAGE_SIZE = 1000
+
+CAPTURE_HEADERS = ["Id", "Name", "ImageToken", "WindowTitle", "AppName", "TimeStamp", "FilePath", "WebUri"]
+
+# WindowCapture와 관련 테이블을 조인하는 공통 SELECT 절
+CAPTURE_SELECT = """
+SELECT 
+    wc.Id, wc.Name, wc.ImageToken, wc.WindowTitle, 
+    app.Name AS AppName, wc.TimeStamp, file.Path AS FilePath, web.Uri AS WebUri
+FROM WindowCapture wc
+LEFT JOIN WindowCaptureAppRelation war ON wc.Id = war.WindowCaptureId
+LEFT JOIN App app ON war.AppId = app.Id
+LEFT JOIN WindowCaptureFileRelation wfr ON wc.Id = wfr.WindowCaptureId
+LEFT JOIN File file ON wfr.FileId = file.Id
+LEFT JOIN WindowCaptureWebRelation wwr ON wc.Id = wwr.WindowCaptureId
+LEFT JOIN Web web ON wwr.WebId = web.Id
+{where}
+ORDER BY wc.Id;
+"""
+
+# 전체 조회
+CAPTURE_QUERY = CAPTURE_SELECT.format(where="")
+
+# 한 페이지에 해당하는 캡처들의 조인 결과 조회, {ids}에 Id 자리표시자가 들어감
+CAPTURE_IDS_QUERY = CAPTURE_SELECT.format(where="WHERE wc.Id IN ({ids})")
+
+# 정렬/필터가 적용된 WindowCapture 페이지 조회 (캡처당 한 행, 정렬 키 포함)
+# (정렬 키, wc.Id) 쌍으로 keyset 페이지를 나누므로 OFFSET 없이 다음 페이지를 읽는다
+WINDOW_CAPTURE_PAGE_QUERY = """
+SELECT wc.Id, wc.Name, wc.ImageToken, wc.WindowTitle, wc.TimeStamp, {sort_key} AS SortKey
+FROM WindowCapture wc
+{where}
+ORDER BY SortKey {direction}, wc.Id {direction}
+LIMIT ?;
+"""
+
+# 케이스 캐시의 CaptureSortKey로 정렬하는 페이지 (캐시를 {schema}로 ATTACH한 연결에서만 사용)
+# (정렬 키, Id) 색인 순서대로 읽으며 WindowCapture는 행마다 rowid로 찾으므로 페이지마다 limit개만 읽는다.
+SORT_KEY_PAGE_QUERY = """
+SELECT wc.Id, wc.Name, wc.ImageToken, wc.WindowTitle, wc.TimeStamp, sk.{column} AS SortKey
+FROM {schema}.CaptureSortKey sk
+CROSS JOIN WindowCapture wc ON wc.Id = sk.Id
+{where}
+ORDER BY sk.{column} {direction}, sk.Id {direction}
+LIMIT ?;
+"""
+# 케이스 캐시를 ATTACH할 때의 스키마 이름
+SORT_CACHE_SCHEMA = "sortcache"
+# 관련 테이블 값으로 정렬하는 열 (케이스 캐시의 CaptureSortKey에 같은 값을 미리 계산해 둠)
+RELATED_SORT_COLUMNS = ("AppName", "FilePath", "WebUri")
+
+# 열별 정렬 식 (텍스트 NULL은 빈 문자열로 취급해 keyset 비교가 가능하도록 함)
+# AppName/FilePath/WebUri는 상관 서브쿼리라 색인을 쓸 수 없어, 케이스 캐시가 없으면 페이지마다
+# 조건에 맞는 모든 행의 키를 계산하고 정렬한다 (keyset은 정렬 위치만 이어 줌). 케이스 캐시가 있으면
+# SORT_KEY_PAGE_QUERY로 색인을 따라 읽는다.
+SORT_EXPRESSIONS = {
+    "Id": "wc.Id",
+    "Name": "IFNULL(wc.Name, '')",
+    "ImageToken": "IFNULL(wc.ImageToken, '')",
+    "WindowTitle": "IFNULL(wc.WindowTitle, '')",
+    "AppName": """IFNULL((
+        SELECT MIN(app.Name) FROM WindowCaptureAppRelation war
+        JOIN App app ON war.AppId = app.Id
+        WHERE war.WindowCaptureId = wc.Id), '')""",
+    "TimeStamp": "wc.TimeStamp",
+    "FilePath": """IFNULL((
+        SELECT MIN(file.Path) FROM WindowCaptureFileRelation wfr
+        JOIN File file ON wfr.FileId = file.Id
+        WHERE wfr.WindowCaptureId = wc.Id), '')""",
+    "WebUri": """IFNULL((
+        SELECT MIN(web.Uri) FROM WindowCaptureWebRelation wwr
+        JOIN Web web ON wwr.WebId = web.Id
+        WHERE wwr.WindowCaptureId = wc.Id), '')""",
+    "이미지": "(IFNULL(wc.ImageToken, '') != '')",
+}
+
+# 필터 조건
+TEXT_FILTER = "(wc.WindowTitle LIKE ? ESCAPE '\\' OR wc.Name LIKE ? ESCAPE '\\')"
+APP_FILTER = """wc.Id IN (
+    SELECT war.WindowCaptureId FROM WindowCaptureAppRelation war
+    JOIN App app ON war.AppId = app.Id
+    WHERE app.Name = ?)"""
+NO_APP_FILTER = "NOT EXISTS (SELECT 1 FROM WindowCaptureAppRelation war WHERE war.WindowCaptureId = wc.Id)"
+
+# App.Name별 캡처 수 (앱 필터를 제외한 나머지 조건 적용)
+APP_FACET_QUERY = """
+SELECT app.Name, COUNT(DISTINCT wc.Id)
+FROM WindowCapture wc
+LEFT JOIN WindowCaptureAppRelation war ON wc.Id = war.WindowCaptureId
+LEFT JOIN App app ON war.AppId = app.Id
+{where}
+GROUP BY app.Name
+ORDER BY COUNT(DISTINCT wc.Id) DESC;
+"""
+
+# 시간 범위 필터 기본값 계산용
+TIME_BOUNDS_QUERY = "SELECT MIN(TimeStamp), MAX(TimeStamp) FROM WindowCapture;"
+
+# 따라가기: 마지막으로 확인한 Id보다 큰 캡처 수와 최대 Id (Id 기본 키 범위만 읽음)
+NEW_CAPTURES_QUERY = "SELECT COUNT(*), MAX(Id) FROM WindowCapture WHERE Id > ?;"
+
+# 따라가기: 마지막으로 확인한 Id보다 큰 이미지 캡처 (타임라인 이미지 목록과 같은 열)
+NEW_IMAGES_QUERY = """
+SELECT wc.Timestamp, wc.WindowTitle, wc.ImageToken, wc.Id
+FROM WindowCapture wc
+WHERE wc.Id > ? AND wc.ImageToken IS NOT NULL
+ORDER BY wc.Timestamp, wc.Id;
+"""
+
+# 관련 테이블별 (WindowCaptureId, 값) 조회 쿼리, {ids}에 Id 자리표시자가 들어감
+RELATION_QUERIES = {
+    "AppName": """
+        SELECT war.WindowCaptureId, app.Name
+        FROM WindowCaptureAppRelation war
+        JOIN App app ON war.AppId = app.Id
+        WHERE war.WindowCaptureId IN ({ids});
+    """,
+    "FilePath": """
+        SELECT wfr.WindowCaptureId, file.Path
+        FROM WindowCaptureFileRelation wfr
+        JOIN File file ON wfr.FileId = file.Id
+        WHERE wfr.WindowCaptureId IN ({ids});
+    """,
+    "WebUri": """
+        SELECT wwr.WindowCaptureId, web.Uri
+        FROM WindowCaptureWebRelation wwr
+        JOIN Web web ON wwr.WebId = web.Id
+        WHERE wwr.WindowCaptureId IN ({ids});
+    """,
+}
+
+# IN 절 하나에 넣는 Id 수 (SQLite 변수 개수 제한 대비)
+RELATION_CHUNK_SIZE = 500
+
+# 캡처별 OCR 텍스트 조회, {ids}에 Id 자리표시자가 들어감
+OCR_TEXT_QUERY = "SELECT id, c2 FROM WindowCaptureTextIndex_content WHERE id IN ({ids});"
+
+def convert_unix_timestamp(timestamp, tz=DEFAULT_TIMEZONE):
+    return datetime.fromtimestamp(timestamp / 1000, tz=tz).strftime(TIMESTAMP_FORMAT)
+
+class CaptureQuery:
+    """WindowCapture 조회 조건: 정렬 열/방향과 텍스트, 앱, 시간 범위(밀리초) 필터
+
+    app_name이 NO_APP이면 App 관계가 없는 캡처만 조회한다.
+    """
+
+    NO_APP = ""
+
+    def __init__(self, sort_column="Id", descending=False, text="", app_name=None,
+                 start_time=None, end_time=None):
+        self.sort_column = sort_column if sort_column in SORT_EXPRESSIONS else "Id"
+        self.descending = descending
+        self.text = text
+        self.app_name = app_name
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def replace(self, **changes):
+        """일부 조건만 바꾼 새 CaptureQuery 반환"""
+        values = dict(vars(self))
+        values.update(changes)
+        return CaptureQuery(**values)
+
+    def conditions(self, include_app=True):
+        """WHERE 조건 리스트와 매개변수 반환"""
+        clauses = []
+        params = []
+        if self.text:
+            pattern = "%" + self.text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append(TEXT_FILTER)
+            params.extend([pattern, pattern])
+        if include_app and self.app_name is not None:
+            if self.app_name == self.NO_APP:
+                clauses.append(NO_APP_FILTER)
+            else:
+                clauses.append(APP_FILTER)
+                params.append(self.app_name)
+        if self.start_time is not None:
+            clauses.append("wc.TimeStamp >= ?")
+            params.append(self.start_time)
+        if self.end_time is not None:
+            clauses.append("wc.TimeStamp <= ?")
+            params.append(self.end_time)
+        return clauses, params
+
+    def page_sql(self, after_key, limit, sort_cache=None):
+        """after_key((정렬 키, Id)) 다음부터 limit개를 읽는 SQL과 매개변수 반환
+
+        sort_cache는 케이스 캐시를 ATTACH한 스키마 이름이며, 주면 관련 값 열 정렬에 캐시의 정렬 키 색인을 쓴다.
+        """
+        clauses, params = self.conditions()
+        direction = "DESC" if self.descending else "ASC"
+        if sort_cache and self.sort_column in RELATED_SORT_COLUMNS:
+            if after_key is not None:
+                clauses.append(f"(sk.{self.sort_column}, sk.Id) {'<' if self.descending else '>'} (?, ?)")
+                params.extend(after_key)
+            sql = SORT_KEY_PAGE_QUERY.format(schema=sort_cache, column=self.sort_column,
+                                             where=where_sql(clauses), direction=direction)
+            return sql, params + [limit]
+
+        sort_key = SORT_EXPRESSIONS[self.sort_column]
+        if after_key is not None:
+            clauses.append(f"({sort_key}, wc.Id) {'<' if self.descending else '>'} (?, ?)")
+            params.extend(after_key)
+        sql = WINDOW_CAPTURE_PAGE_QUERY.format(
+            sort_key=sort_key,
+            where=where_sql(clauses),
+            direction=direction,
+        )
+        return sql, params + [limit]
+
+def where_sql(clauses):
+    return ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+def fetch_window_capture_page(cursor, query=None, after_key=None, limit=PAGE_SIZE, sort_cache=None):
+    """조건에 맞는 WindowCapture 한 페이지와 다음 페이지용 keyset 반환
+
+    반환 행은 (Id, Name, ImageToken, WindowTitle, TimeStamp)이다.
+    """
+    sql, params = (query or CaptureQuery()).page_sql(after_key, limit, sort_cache)
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    next_key = (rows[-1][5], rows[-1][0]) if rows else after_key
+    return [row[:5] for row in rows], next_key
+
+def fetch_capture_page(cursor, query=None, after_key=None, limit=PAGE_SIZE, sort_cache=None):
+    """조건에 맞는 WindowCapture limit개에 대한 조인 결과와 다음 keyset 반환"""
+    captures, next_key = fetch_window_capture_page(cursor, query, after_key, limit, sort_cache)
+    return join_captures(cursor, captures), next_key
+
+def join_captures(cursor, captures):
+    """캡처 묶음의 관련 테이블 조인 결과를 캡처 순서대로 반환"""
+    joined = {capture[0]: [] for capture in captures}
+    capture_ids = list(joined)
+
+    for start in range(0, len(capture_ids), RELATION_CHUNK_SIZE):
+        chunk = capture_ids[start:start + RELATION_CHUNK_SIZE]
+        cursor.execute(CAPTURE_IDS_QUERY.format(ids=", ".join("?" * len(chunk))), chunk)
+        for row in cursor.fetchall():
+            joined[row[0]].append(row)
+
+    # 페이지 정렬 순서를 유지
+    return [row for capture_id in capture_ids for row in joined[capture_id]]
+
+def fetch_relations(cursor, capture_ids):
+    """capture_ids에 해당하는 관련 App/File/Web 값을 {Id: {열 이름: [값, ...]}} 형태로 반환"""
+    relations = {capture_id: {name: [] for name in RELATION_QUERIES} for capture_id in capture_ids}
+    capture_ids = list(relations)
+
+    for start in range(0, len(capture_ids), RELATION_CHUNK_SIZE):
+        chunk = capture_ids[start:start + RELATION_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        for name, query in RELATION_QUERIES.items():
+            cursor.execute(query.format(ids=placeholders), chunk)
+            for capture_id, value in cursor.fetchall():
+                if value is not None and value not in relations[capture_id][name]:
+                    relations[capture_id][name].append(value)
+
+    return relations
+
+def aggregate_captures(cursor, captures):
+    """(Id, Name, ImageToken, WindowTitle, TimeStamp) 행에 관련 값 묶음을 붙여 CAPTURE_HEADERS 순서로 반환"""
+    relations = fetch_relations(cursor, [capture[0] for capture in captures])
+    rows = []
+    for capture_id, name, image_token, window_title, timestamp in captures:
+        related = relations[capture_id]
+        rows.append((
+            capture_id, name, image_token, window_title,
+            tuple(related["AppName"]), timestamp,
+            tuple(related["FilePath"]), tuple(related["WebUri"]),
+        ))
+    return rows
+
+def fetch_aggregated_page(cursor, query=None, after_key=None, limit=PAGE_SIZE, sort_cache=None):
+    """조건에 맞는 WindowCapture limit개를 캡처당 한 행으로 반환 (다음 keyset 포함)"""
+    captures, next_key = fetch_window_capture_page(cursor, query, after_key, limit, sort_cache)
+    return aggregate_captures(cursor, captures), next_key
+
+def count_captures_by_app(cursor, query=None):
+    """App.Name별 캡처 수 [(이름, 개수), ...] 반환, 앱이 없는 캡처는 이름이 None"""
+    clauses, params = (query or CaptureQuery()).conditions(include_app=False)
+    cursor.execute(APP_FACET_QUERY.format(where=where_sql(clauses)), params)
+    return cursor.fetchall()
+
+def fetch_time_bounds(cursor):
+    """WindowCapture의 (최소, 최대) TimeStamp 반환"""
+    cursor.execute(TIME_BOUNDS_QUERY)
+    return cursor.fetchone()
+
+def fetch_new_captures(cursor, after_id=None):
+    """after_id보다 큰 Id의 (캡처 수, 최대 Id) 반환, after_id가 None이면 전체"""
+    cursor.execute(NEW_CAPTURES_QUERY, (-(2 ** 63) if after_id is None else after_id,))
+    return cursor.fetchone()
+
+def fetch_ocr_texts(cursor, capture_ids):
+    """capture_ids의 OCR 텍스트를 {Id: 텍스트}로 반환"""
+    texts = {}
+    capture_ids = list(capture_ids)
+    for start in range(0, len(capture_ids), RELATION_CHUNK_SIZE):
+        chunk = capture_ids[start:start + RELATION_CHUNK_SIZE]
+        cursor.execute(OCR_TEXT_QUERY.format(ids=", ".join("?" * len(chunk))), chunk)
+        texts.update(cursor.fetchall())
+    return texts
+
+def iter_capture_batches(conn, query=None, batch_size=PAGE_SIZE, aggregate=True):
+    """조건에 맞는 캡처를 batch_size개씩 읽어 CAPTURE_HEADERS 순서의 행 묶음으로 내보내는 제너레이터
+
+    쿼리는 한 번만 실행하고 fetchmany로 나눠 읽으므로 메모리 사용량은 묶음 크기로 제한된다.
+    관련 값은 묶음마다 별도 커서로 일괄 조회한다.
+    """
+    sql, params = (query or CaptureQuery()).page_sql(None, -1)  # LIMIT -1: 제한 없음
+    cursor = conn.cursor()
+    relation_cursor = conn.cursor()
+    cursor.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        captures = [row[:5] for row in rows]
+        if aggregate:
+            yield aggregate_captures(relation_cursor, captures)
+        else:
+            yield join_captures(relation_cursor, captures)
+
+def format_related(values):
+    """관련 값 묶음을 표시용 문자열로 변환"""
+    return ", ".join(str(value) for value in values)
+
+def load_data_from_db(db_path, aggregate=False):
+    try:
+        conn = open_readonly(db_path)
+        cursor = conn.cursor()
+
+        if aggregate:
+            # 캡처당 한 행, 관련 값은 페이지마다 일괄 조회
+            data = []
+            after_key = None
+            while True:
+                page, after_key = fetch_aggregated_page(cursor, after_key=after_key)
+                if not page:
+                    break
+                data.extend(page)
+        else:
+            # 데이터베이스 쿼리
+            cursor.execute(CAPTURE_QUERY)
+            data = cursor.fetchall()
+        headers = list(CAPTURE_HEADERS)
+
+        conn.close()
+        return data, headers
+
+    except Exception as e:
+        logger.error("DB 로드 오류", extra=log_fields(db_path=db_path, error=str(e)))
+        return None, None
@@ -0,0 +1,200 @@
+#recovery_panel.py
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, \
+    QTableWidgetItem, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, QThread, Signal
+from queries import DEFAULT_TIMEZONE, convert_unix_timestamp
+from carver import carve_records, SOURCE_FREELIST, SOURCE_FREE_SPACE, SOURCE_WAL
+
+SOURCE_LABELS = {
+    SOURCE_FREELIST: "프리리스트",
+    SOURCE_FREE_SPACE: "빈 공간",
+    SOURCE_WAL: "WAL",
+}
+
+TABLE_LABELS = {
+    "WindowCapture": "캡처",
+    "WindowCaptureTextIndex_content": "OCR 텍스트",
+}
+
+# 표에 보여 줄 내용 길이
+CONTENT_PREVIEW_LENGTH = 200
+
+# 삭제된 레코드 카빙을 실행하는 스레드 (결과를 묶음 단위로 전송)
+class CarveThread(QThread):
+    records_found = Signal(int, list)  # 작업 번호, CarvedRecord 묶음
+    progress = Signal(int, int, int)  # 작업 번호, 처리한 페이지 수, 전체
+    carve_finished = Signal(int, int)  # 작업 번호, 복구한 레코드 수
+    carve_failed = Signal(int, str)
+
+    def __init__(self, job_id, db_path):
+        super().__init__()
+        self.job_id = job_id
+        self.db_path = db_path
+        self._cancelled = False
+
+    def run(self):
+        count = 0
+        try:
+            for records in carve_records(self.db_path, should_stop=lambda: self._cancelled,
+                                         progress=lambda done, total: self.progress.emit(self.job_id, done, total)):
+                count += len(records)
+                self.records_found.emit(self.job_id, records)
+                if self._cancelled:
+                    return
+        except Exception as e:
+            if not self._cancelled:
+                self.carve_failed.emit(self.job_id, str(e))
+            return
+        if not self._cancelled:
+            self.carve_finished.emit(self.job_id, count)
+
+    def cancel(self):
+        self._cancelled = True
+
+# 복구된 레코드 패널
+# 캡처 표는 SQL keyset 조회로 페이지를 읽으므로 정렬/필터할 수 없는 카빙 결과는 섞지 않고 이 패널에 따로 표시한다.
+class RecoveredRecordWidget(QWidget):
+    record_selected = Signal(object, object, object)  # 복구한 캡처의 (Id, TimeStamp, ImageToken)
+
+    HEADERS = ["상태", "출처", "테이블", "위치", "Id", "TimeStamp", "내용", "ImageToken"]
+
+    def __init__(self):
+        super().__init__()
+        self.db_path = None
+        self.tz = DEFAULT_TIMEZONE
+        self.carve_thread = None
+        self.job_id = 0  # 이전 작업의 늦게 도착한 결과를 걸러내기 위한 번호
+        self.records = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        control_layout = QHBoxLayout()
+        self.start_button = QPushButton("삭제 레코드 복구")
+        self.start_button.clicked.connect(self.start_carving)
+        self.cancel_button = QPushButton("중지")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_carving)
+        self.status_label = QLabel("")
+        control_layout.addWidget(self.start_button)
+        control_layout.addWidget(self.cancel_button)
+        control_layout.addWidget(self.status_label, 1)
+        layout.addLayout(control_layout)
+
+        self.record_table = QTableWidget(0, len(self.HEADERS))
+        self.record_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.record_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.record_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.record_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.record_table.verticalHeader().setVisible(False)
+        self.record_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.Stretch)
+        self.record_table.itemSelectionChanged.connect(self.on_record_selected)
+        layout.addWidget(self.record_table)
+
+    def set_db_path(self, db_path):
+        self.cancel_carving()
+        self.db_path = db_path
+        self.records = []
+        self.record_table.setRowCount(0)
+        self.status_label.setText("")
+
+    def start_carving(self):
+        """이전 작업을 취소하고 현재 DB와 -wal 파일에서 카빙 시작"""
+        if self.db_path is None:
+            return
+        self.cancel_carving()
+        self.records = []
+        self.record_table.setRowCount(0)
+        self.status_label.setText("복구 중...")
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        self.job_id += 1
+        self.carve_thread = CarveThread(self.job_id, self.db_path)
+        self.carve_thread.records_found.connect(self.add_records)
+        self.carve_thread.progress.connect(self.on_progress)
+        self.carve_thread.carve_finished.connect(self.on_carve_finished)
+        self.carve_thread.carve_failed.connect(self.on_carve_failed)
+        self.carve_thread.start()
+
+    def cancel_carving(self):
+        if self.carve_thread is not None:
+            self.carve_thread.cancel()
+            self.carve_thread.wait()
+            self.carve_thread = None
+            self.status_label.setText(f"중지됨: {len(self.records)}건")
+        self.job_id += 1
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def add_records(self, job_id, records):
+        """복구한 레코드 묶음을 표 끝에 추가"""
+        if job_id != self.job_id:
+            return
+        start = self.record_table.rowCount()
+        self.records.extend(records)
+        self.record_table.setRowCount(start + len(records))
+        for offset, record in enumerate(records):
+            values = dict(zip(record.columns, record.values))
+            timestamp = values.get("TimeStamp")
+            if record.table == "WindowCapture":
+                content = values.get("WindowTitle") or values.get("Name")
+            else:
+                content = values.get("c2")
+            if isinstance(content, bytes):
+                content = content.decode("utf-8", "replace")
+            content = (content or "").replace("\n", " ")[:CONTENT_PREVIEW_LENGTH]
+            if record.truncated:
+                content += " (일부)"
+            location = f"{record.page}:{record.offset}"
+
+            row = start + offset
+            status_item = QTableWidgetItem("복구됨")
+            status_item.setForeground(Qt.darkRed)
+            self.record_table.setItem(row, 0, status_item)
+            self.record_table.setItem(row, 1, QTableWidgetItem(SOURCE_LABELS.get(record.source, record.source)))
+            self.record_table.setItem(row, 2, QTableWidgetItem(TABLE_LABELS.get(record.table, record.table)))
+            self.record_table.setItem(row, 3, QTableWidgetItem(location))
+            id_item = QTableWidgetItem()
+            if record.rowid is not None:
+                id_item.setData(Qt.DisplayRole, record.rowid)
+            self.record_table.setItem(row, 4, id_item)
+            self.record_table.setItem(row, 5, QTableWidgetItem(
+                convert_unix_timestamp(timestamp, self.tz) if isinstance(timestamp, int) else ""))
+            self.record_table.setItem(row, 6, QTableWidgetItem(content))
+            self.record_table.setItem(row, 7, QTableWidgetItem(values.get("ImageToken") or ""))
+
+    def on_progress(self, job_id, done, total):
+        if job_id == self.job_id:
+            self.status_label.setText(f"복구 중... {done}/{total} 페이지, {len(self.records)}건")
+
+    def on_carve_finished(self, job_id, count):
+        if job_id != self.job_id:
+            return
+        self.carve_thread.wait()  # 결과를 보낸 뒤 run()이 끝날 때까지
+        self.carve_thread = None
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(f"복구된 레코드: {count}건")
+
+    def on_carve_failed(self, job_id, message):
+        if job_id != self.job_id:
+            return
+        self.carve_thread.wait()  # 결과를 보낸 뒤 run()이 끝날 때까지
+        self.carve_thread = None
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(f"복구 실패: {message}")
+
+    def on_record_selected(self):
+        items = self.record_table.selectedItems()
+        if not items:
+            return
+        record = self.records[items[0].row()]
+        if record.table != "WindowCapture":
+            return
+        values = dict(zip(record.columns, record.values))
+        timestamp = values.get("TimeStamp")
+        if isinstance(timestamp, int):
+            self.record_selected.emit(record.rowid, timestamp, values.get("ImageToken"))
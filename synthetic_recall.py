@@ -0,0 +1,357 @@
+#synthetic_recall.py
+
+# 벤치마크/개발용 합성 Recall 데이터셋 생성기 (실제 증거 없이 ukg.db + ImageStore를 만든다)
+#
+# 사용 예:
+#   python synthetic_recall.py out/case_100k --captures 100000
+#   python synthetic_recall.py out/case_1m --captures 1000000 --images 2000 --gaps 500 --seed 7
+#
+# - WindowCapture, App/File/Web와 관계 테이블, IdTable, WindowCaptureTextIndex(FTS5)를 만든다.
+# - 업무 시간대에 몰린 캡처 간격, 같은 창이 이어지는 세션, 관계 수(fan-out)를 설정할 수 있다.
+# - 캡처를 모두 넣은 뒤 일부 Id 구간을 지워 삭제 공백(과 프리리스트 페이지)을 만든다.
+#   --tail-deleted는 마지막 캡처들을 지워 IdTable의 다음 Id와 최대 Id 사이에 공백을 남긴다.
+# - ImageStore에는 창 제목 표시줄과 본문 블록을 그린 JPEG 스크린샷을 확장자 없이 저장한다.
+#   같은 세션의 캡처는 비슷한 그림이 되도록 (앱, 창, 스크롤 위치)로 그린다.
+#   --images로 파일 수를 제한하면 이미지 캡처 중 고르게 골라 그 수만큼만 만든다.
+# 같은 --seed와 옵션이면 같은 DB가 만들어진다 (벤치마크 결과 비교용).
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# 한 번에 넣는 캡처 수
+INSERT_BATCH_SIZE = 10000
+# 첫 캡처 시각 (밀리초, 2024-10-01 00:00:00 UTC)
+DEFAULT_START_TIME = 1727740800000
+# 하루 중 캡처가 생기는 시간대 (UTC 시, KST 09~19시)
+WORK_HOURS = (0, 10)
+# 같은 창을 계속 보는 캡처 수 평균
+SESSION_LENGTH = 12
+# 캡처 간격 평균 (초)
+CAPTURE_INTERVAL = 8.0
+
+SCHEMA = """
+CREATE TABLE App (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    WindowsAppId TEXT,
+    IconUri TEXT,
+    Name TEXT,
+    Path TEXT,
+    Properties TEXT
+);
+CREATE TABLE File (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Path TEXT,
+    Name TEXT,
+    Extension TEXT,
+    Properties TEXT
+);
+CREATE TABLE Web (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Domain TEXT,
+    Uri TEXT,
+    IconUri TEXT,
+    Properties TEXT
+);
+CREATE TABLE WindowCapture (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name TEXT,
+    ImageToken TEXT,
+    IsForeground INTEGER,
+    WindowId INTEGER,
+    WindowBounds TEXT,
+    WindowTitle TEXT,
+    Properties TEXT,
+    TimeStamp INTEGER
+);
+CREATE TABLE WindowCaptureAppRelation (
+    WindowCaptureId INTEGER NOT NULL,
+    AppId INTEGER NOT NULL,
+    PRIMARY KEY (WindowCaptureId, AppId)
+);
+CREATE TABLE WindowCaptureFileRelation (
+    WindowCaptureId INTEGER NOT NULL,
+    FileId INTEGER NOT NULL,
+    PRIMARY KEY (WindowCaptureId, FileId)
+);
+CREATE TABLE WindowCaptureWebRelation (
+    WindowCaptureId INTEGER NOT NULL,
+    WebId INTEGER NOT NULL,
+    PRIMARY KEY (WindowCaptureId, WebId)
+);
+CREATE TABLE IdTable (
+    Name TEXT PRIMARY KEY,
+    NextId INTEGER
+);
+CREATE VIRTUAL TABLE WindowCaptureTextIndex USING fts5(WindowName, WindowTitle, OcrText);
+"""
+
+APP_NAMES = [
+    "msedge.exe", "chrome.exe", "explorer.exe", "notepad.exe", "WINWORD.EXE", "EXCEL.EXE", "POWERPNT.EXE",
+    "OUTLOOK.EXE", "Teams.exe", "Code.exe", "cmd.exe", "powershell.exe", "KakaoTalk.exe", "Slack.exe",
+    "Acrobat.exe", "mspaint.exe", "Photos.exe", "Spotify.exe", "Discord.exe", "Telegram.exe",
+]
+WORDS = [
+    "보고서", "회의", "일정", "계약", "견적", "송금", "비밀번호", "로그인", "프로젝트", "검토", "승인", "첨부",
+    "invoice", "report", "meeting", "password", "account", "transfer", "draft", "review", "budget", "login",
+    "server", "backup", "release", "customer", "order", "shipping", "payment", "schedule", "agenda", "notes",
+]
+EXTENSIONS = ["docx", "xlsx", "pptx", "pdf", "txt", "png", "zip", "csv"]
+DOMAINS = ["example.com", "mail.example.org", "docs.example.net", "news.example.kr", "shop.example.co.kr",
+           "github.com", "stackoverflow.com", "drive.example.com"]
+
+def make_token(rng):
+    value = rng.getrandbits(128)
+    text = f"{value:032x}"
+    return f"WindowCaptures_{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+def make_text(rng, word_count):
+    return " ".join(rng.choice(WORDS) for _ in range(word_count))
+
+def fan_out(rng, mean):
+    """평균 mean개(0~2*mean)의 관계 수"""
+    if mean <= 0:
+        return 0
+    return rng.randint(0, int(round(mean * 2)))
+
+def capture_times(rng, count, start_time):
+    """업무 시간대에 몰린 오름차순 TimeStamp (밀리초) 생성기"""
+    day_ms = 24 * 3600 * 1000
+    work_start, work_end = (hour * 3600 * 1000 for hour in WORK_HOURS)
+    timestamp = start_time + work_start
+    for _ in range(count):
+        timestamp += int(rng.expovariate(1 / CAPTURE_INTERVAL) * 1000) + 1000
+        offset = (timestamp - start_time) % day_ms
+        if offset >= work_end:
+            timestamp += day_ms - offset + work_start  # 다음 날 업무 시작
+        yield timestamp
+
+def create_entities(conn, rng, app_count, file_count, web_count):
+    apps = [APP_NAMES[index % len(APP_NAMES)] if index < len(APP_NAMES) else f"app{index}.exe"
+            for index in range(app_count)]
+    conn.executemany(
+        "INSERT INTO App (Id, WindowsAppId, IconUri, Name, Path, Properties) VALUES (?, ?, NULL, ?, ?, NULL);",
+        [(index + 1, f"App.{name}", name, f"C:\\Program Files\\{name}") for index, name in enumerate(apps)])
+    files = []
+    for index in range(file_count):
+        extension = rng.choice(EXTENSIONS)
+        name = f"{rng.choice(WORDS)}_{index}.{extension}"
+        files.append((index + 1, f"C:\\Users\\user\\Documents\\{name}", name, extension))
+    conn.executemany("INSERT INTO File (Id, Path, Name, Extension, Properties) VALUES (?, ?, ?, ?, NULL);", files)
+    webs = []
+    for index in range(web_count):
+        domain = rng.choice(DOMAINS)
+        webs.append((index + 1, domain, f"https://{domain}/{rng.choice(WORDS)}/{index}"))
+    conn.executemany("INSERT INTO Web (Id, Domain, Uri, IconUri, Properties) VALUES (?, ?, ?, NULL, NULL);", webs)
+    return apps
+
+def insert_captures(conn, rng, params, apps, progress=None):
+    """캡처와 관계, OCR 텍스트를 묶음 단위로 넣고 [(Id, ImageToken, 앱 번호, 창 번호, 세션 위치)] 반환"""
+    width, height = params["image_width"], params["image_height"]
+    bounds = json.dumps({"left": 0, "top": 0, "right": width, "bottom": height})
+    image_captures = []
+    captures, app_rows, file_rows, web_rows, texts = [], [], [], [], []
+    session_left = 0
+    app_index = window_index = position = 0
+    title = ""
+
+    def flush():
+        conn.executemany("INSERT INTO WindowCapture (Id, Name, ImageToken, IsForeground, WindowId, WindowBounds, "
+                         "WindowTitle, Properties, TimeStamp) VALUES (?, ?, ?, 1, ?, ?, ?, NULL, ?);", captures)
+        conn.executemany("INSERT INTO WindowCaptureAppRelation VALUES (?, ?);", app_rows)
+        conn.executemany("INSERT OR IGNORE INTO WindowCaptureFileRelation VALUES (?, ?);", file_rows)
+        conn.executemany("INSERT OR IGNORE INTO WindowCaptureWebRelation VALUES (?, ?);", web_rows)
+        conn.executemany("INSERT INTO WindowCaptureTextIndex (rowid, WindowName, WindowTitle, OcrText) "
+                         "VALUES (?, ?, ?, ?);", texts)
+        for values in (captures, app_rows, file_rows, web_rows, texts):
+            del values[:]
+
+    timestamps = capture_times(rng, params["captures"], params["start_time"])
+    for capture_id, timestamp in enumerate(timestamps, start=1):
+        if session_left == 0:
+            # 새 창으로 전환
+            session_left = max(1, int(rng.expovariate(1 / SESSION_LENGTH)))
+            app_index = rng.randrange(len(apps))
+            window_index = rng.randrange(1000)
+            position = 0
+            title = f"{make_text(rng, 3)} - {apps[app_index].rsplit('.', 1)[0]}"
+        session_left -= 1
+        position += 1
+
+        image_token = make_token(rng) if rng.random() < params["image_ratio"] else None
+        if image_token is not None:
+            image_captures.append((capture_id, image_token, app_index, window_index, position))
+        captures.append((capture_id, f"capture_{capture_id}", image_token, window_index, bounds, title, timestamp))
+        if rng.random() >= params["no_app_ratio"]:
+            app_rows.append((capture_id, app_index + 1))
+        for _ in range(fan_out(rng, params["files_per_capture"])):
+            file_rows.append((capture_id, rng.randint(1, params["file_count"])))
+        for _ in range(fan_out(rng, params["webs_per_capture"])):
+            web_rows.append((capture_id, rng.randint(1, params["web_count"])))
+        texts.append((capture_id, "", title, f"{make_text(rng, params['ocr_words'])} marker{capture_id % 1000}"))
+
+        if len(captures) >= INSERT_BATCH_SIZE:
+            flush()
+            if progress is not None:
+                progress("captures", capture_id, params["captures"])
+    flush()
+    return image_captures
+
+def delete_gaps(conn, rng, params):
+    """무작위 Id 구간과 끝부분 캡처를 지우고 삭제한 Id 집합 반환"""
+    count = params["captures"]
+    deleted = set()
+    for _ in range(params["gaps"]):
+        size = rng.randint(1, params["gap_max"])
+        first = rng.randint(2, max(2, count - size - params["tail_deleted"] - 1))
+        deleted.update(range(first, first + size))
+    deleted.update(range(count - params["tail_deleted"] + 1, count + 1))
+    ids = [(capture_id,) for capture_id in sorted(deleted)]
+    for table, column in (("WindowCapture", "Id"), ("WindowCaptureAppRelation", "WindowCaptureId"),
+                          ("WindowCaptureFileRelation", "WindowCaptureId"),
+                          ("WindowCaptureWebRelation", "WindowCaptureId"), ("WindowCaptureTextIndex", "rowid")):
+        conn.executemany(f"DELETE FROM {table} WHERE {column} = ?;", ids)
+    return deleted
+
+def draw_screenshot(path, width, height, app_index, window_index, position, quality):
+    """창 제목 표시줄과 본문 블록이 있는 화면을 그려 JPEG로 저장 (확장자 없음)"""
+    from PySide6.QtGui import QImage, QPainter, QColor
+
+    rng = random.Random(app_index * 100003 + window_index)  # 같은 창은 같은 배치
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(235, 235, 235))
+    painter = QPainter(image)
+    hue = (app_index * 37) % 360
+    painter.fillRect(0, 0, width, height // 20, QColor.fromHsv(hue, 160, 200))  # 제목 표시줄
+    painter.fillRect(0, height // 20, width // 6, height, QColor.fromHsv(hue, 40, 245))  # 사이드바
+    line_height = max(height // 40, 4)
+    scroll = (position // 4) * line_height  # 세션 안에서는 천천히 스크롤
+    y = height // 20 + line_height - scroll % (line_height * 8)
+    while y < height:
+        line_width = rng.randint(width // 4, width * 2 // 3)
+        painter.fillRect(width // 5, y, line_width, line_height // 2, QColor(90, 90, 90))
+        y += line_height
+    painter.end()
+    return image.save(path, "JPG", quality)
+
+def write_images(image_dir, image_captures, params, progress=None):
+    """이미지 캡처 중 --images 수만큼 고르게 골라 스크린샷 파일 생성, 만든 수 반환"""
+    os.makedirs(image_dir, exist_ok=True)
+    limit = params["images"]
+    if limit is not None and limit < len(image_captures):
+        step = len(image_captures) / limit
+        image_captures = [image_captures[int(index * step)] for index in range(limit)]
+
+    def draw(capture):
+        capture_id, image_token, app_index, window_index, position = capture
+        return draw_screenshot(os.path.join(image_dir, image_token), params["image_width"], params["image_height"],
+                               app_index, window_index, position, params["image_quality"])
+
+    written = 0
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        for done, ok in enumerate(executor.map(draw, image_captures), start=1):
+            written += bool(ok)
+            if progress is not None and done % 500 == 0:
+                progress("images", done, len(image_captures))
+    return written
+
+def generate_dataset(output_dir, captures=10000, seed=0, start_time=DEFAULT_START_TIME, app_count=len(APP_NAMES),
+                     file_count=2000, web_count=2000, files_per_capture=0.5, webs_per_capture=0.5,
+                     no_app_ratio=0.02, image_ratio=0.95, images=None, image_width=1920, image_height=1080,
+                     image_quality=80, ocr_words=40, gaps=20, gap_max=50, tail_deleted=5, progress=None):
+    """output_dir/ukg.db와 output_dir/ImageStore를 만들고 요약 dict 반환 (dataset.json에도 기록)"""
+    params = dict(captures=captures, seed=seed, start_time=start_time, app_count=app_count, file_count=file_count,
+                  web_count=web_count, files_per_capture=files_per_capture, webs_per_capture=webs_per_capture,
+                  no_app_ratio=no_app_ratio, image_ratio=image_ratio, images=images, image_width=image_width,
+                  image_height=image_height, image_quality=image_quality, ocr_words=ocr_words, gaps=gaps,
+                  gap_max=gap_max, tail_deleted=min(tail_deleted, captures))
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    db_path = os.path.join(output_dir, "ukg.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF;")  # 생성 중에만, 끝나면 기본(DELETE) 모드 파일
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.executescript(SCHEMA)
+        apps = create_entities(conn, rng, app_count, file_count, web_count)
+        image_captures = insert_captures(conn, rng, params, apps, progress)
+        deleted = delete_gaps(conn, rng, params)
+        conn.execute("INSERT INTO IdTable (Name, NextId) VALUES ('WindowCapture', ?);", (captures + 1,))
+        conn.commit()
+    finally:
+        conn.close()
+
+    image_captures = [capture for capture in image_captures if capture[0] not in deleted]
+    written = write_images(os.path.join(output_dir, "ImageStore"), image_captures, params, progress)
+
+    summary = dict(params, db_path=os.path.abspath(db_path), remaining_captures=captures - len(deleted),
+                   deleted_captures=len(deleted), image_captures=len(image_captures), image_files=written,
+                   db_bytes=os.path.getsize(db_path), seconds=round(time.perf_counter() - started, 3),
+                   created=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    with open(os.path.join(output_dir, "dataset.json"), "w", encoding="utf-8") as output:
+        json.dump(summary, output, ensure_ascii=False, indent=2)
+    return summary
+
+def read_dataset_info(output_dir):
+    """이전에 만든 데이터셋의 dataset.json, 없으면 None"""
+    try:
+        with open(os.path.join(output_dir, "dataset.json"), encoding="utf-8") as info:
+            return json.load(info)
+    except (OSError, ValueError):
+        return None
+
+# 명령줄에서 실행할 때 만든 QGuiApplication (프로세스가 끝날 때까지 유지)
+_gui_app = None
+
+def ensure_gui_application():
+    """QPainter로 스크린샷을 그리려면 QGuiApplication이 필요 (화면 없이 실행)"""
+    global _gui_app
+    from PySide6.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _gui_app = QGuiApplication(sys.argv[:1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 Recall 데이터셋(ukg.db + ImageStore) 생성")
+    parser.add_argument("output_dir", help="ukg.db와 ImageStore를 만들 폴더")
+    parser.add_argument("--captures", type=int, default=10000, help="만들 캡처 수 (삭제 전)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--apps", type=int, default=len(APP_NAMES), help="App 행 수")
+    parser.add_argument("--files", type=int, default=2000, help="File 행 수")
+    parser.add_argument("--webs", type=int, default=2000, help="Web 행 수")
+    parser.add_argument("--files-per-capture", type=float, default=0.5, help="캡처당 File 관계 평균")
+    parser.add_argument("--webs-per-capture", type=float, default=0.5, help="캡처당 Web 관계 평균")
+    parser.add_argument("--image-ratio", type=float, default=0.95, help="ImageToken이 있는 캡처 비율")
+    parser.add_argument("--images", type=int, help="만들 이미지 파일 수 (기본: 이미지 캡처 전부)")
+    parser.add_argument("--image-size", default="1920x1080", help="스크린샷 크기 (예: 1920x1080)")
+    parser.add_argument("--gaps", type=int, default=20, help="삭제할 Id 구간 수")
+    parser.add_argument("--gap-max", type=int, default=50, help="삭제 구간 하나의 최대 길이")
+    parser.add_argument("--tail-deleted", type=int, default=5, help="끝에서 삭제할 캡처 수")
+    args = parser.parse_args(argv)
+
+    width, _, height = args.image_size.lower().partition("x")
+    ensure_gui_application()
+    summary = generate_dataset(
+        args.output_dir, captures=args.captures, seed=args.seed, app_count=args.apps, file_count=args.files,
+        web_count=args.webs, files_per_capture=args.files_per_capture, webs_per_capture=args.webs_per_capture,
+        image_ratio=args.image_ratio, images=args.images, image_width=int(width), image_height=int(height),
+        gaps=args.gaps, gap_max=args.gap_max, tail_deleted=args.tail_deleted,
+        progress=lambda stage, done, total: print(f"{stage}: {done}/{total}", file=sys.stderr),
+    )
+    print(f"캡처 {summary['remaining_captures']}개 (삭제 {summary['deleted_captures']}개), "
+          f"이미지 {summary['image_files']}개, {summary['seconds']}초: {summary['db_path']}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
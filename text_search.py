@@ -0,0 +1,249 @@
+#text_search.py
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, QTableWidget, \
+    QTableWidgetItem, QHeaderView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtGui import QTextDocument
+from PySide6.QtCore import Qt, QThread, Signal
+from database import convert_unix_timestamp, DEFAULT_TIMEZONE
+from connection import open_readonly
+from instrumentation import get_logger, log_fields
+import html
+import sqlite3
+
+logger = get_logger("text_search")
+
+# snippet()이 일치 구간 앞뒤에 넣는 표시 문자 (표시할 때 <b> 태그로 바꿈)
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+# 한 번에 화면으로 보내는 검색 결과 수
+RESULT_BATCH_SIZE = 100
+# 검색 결과 최대 개수
+MAX_RESULTS = 5000
+
+# WindowCaptureTextIndex(FTS5) 검색, bm25 점수가 낮을수록 관련도가 높음
+FTS_SEARCH_QUERY = f"""
+SELECT wc.Id, wc.TimeStamp, wc.WindowTitle, wc.ImageToken,
+    snippet(WindowCaptureTextIndex, -1, '{MATCH_START}', '{MATCH_END}', '…', 16) AS Snippet,
+    bm25(WindowCaptureTextIndex) AS Rank
+FROM WindowCaptureTextIndex
+JOIN WindowCapture wc ON wc.Id = WindowCaptureTextIndex.rowid
+WHERE WindowCaptureTextIndex MATCH ?
+ORDER BY Rank
+LIMIT ?;
+"""
+
+# FTS5 토크나이저를 쓸 수 없는 환경용 대체 검색 (content 테이블을 LIKE로 훑음)
+FALLBACK_SEARCH_QUERY = """
+SELECT wc.Id, wc.TimeStamp, wc.WindowTitle, wc.ImageToken, text.c2 AS OCRText
+FROM WindowCaptureTextIndex_content text
+JOIN WindowCapture wc ON wc.Id = text.id
+WHERE text.c2 LIKE ? ESCAPE '\\'
+ORDER BY wc.TimeStamp
+LIMIT ?;
+"""
+
+def to_match_query(text):
+    """입력 문자열을 FTS5 MATCH 식으로 변환 (단어마다 따옴표로 감싸 AND 검색)"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    return " ".join(terms)
+
+def make_snippet(text, term, width=60):
+    """대체 검색용: text에서 term 주변을 잘라 표시 문자로 감싼 조각 반환"""
+    position = text.lower().find(term.lower())
+    if position < 0:
+        return text[:width]
+    start = max(position - width // 2, 0)
+    end = min(position + len(term) + width // 2, len(text))
+    return (
+        ("…" if start > 0 else "")
+        + text[start:position] + MATCH_START + text[position:position + len(term)] + MATCH_END
+        + text[position + len(term):end]
+        + ("…" if end < len(text) else "")
+    )
+
+def search_text(cursor, text, limit=MAX_RESULTS):
+    """OCR 텍스트 검색 결과를 RESULT_BATCH_SIZE개씩 묶어 순서대로 내보내는 제너레이터
+
+    각 결과는 (Id, TimeStamp, WindowTitle, ImageToken, Snippet)이다.
+    """
+    match_query = to_match_query(text)
+    if not match_query:
+        return
+
+    try:
+        cursor.execute(FTS_SEARCH_QUERY, (match_query, limit))
+        fallback = False
+    except sqlite3.OperationalError as e:
+        # 원본 DB의 토크나이저를 이 환경의 SQLite가 모르는 경우
+        logger.info("FTS 검색 실패, LIKE 검색으로 대체", extra=log_fields(error=str(e)))
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        cursor.execute(FALLBACK_SEARCH_QUERY, (pattern, limit))
+        fallback = True
+
+    while True:
+        rows = cursor.fetchmany(RESULT_BATCH_SIZE)
+        if not rows:
+            break
+        if fallback:
+            yield [row[:4] + (make_snippet(row[4] or "", text),) for row in rows]
+        else:
+            yield [row[:5] for row in rows]
+
+# OCR 텍스트 검색을 실행하는 스레드 (결과를 묶음 단위로 전송)
+class TextSearchThread(QThread):
+    results_found = Signal(int, list)  # 검색 번호, 결과 묶음
+    search_finished = Signal(int, int)  # 검색 번호, 전체 결과 수
+    search_failed = Signal(int, str)
+
+    def __init__(self, search_id, db_path, text):
+        super().__init__()
+        self.search_id = search_id
+        self.db_path = db_path
+        self.text = text
+        self._cancelled = False
+        self._conn = None
+
+    def run(self):
+        count = 0
+        try:
+            self._conn = open_readonly(self.db_path)
+            for rows in search_text(self._conn.cursor(), self.text):
+                if self._cancelled:
+                    break
+                count += len(rows)
+                self.results_found.emit(self.search_id, rows)
+        except Exception as e:
+            if not self._cancelled:
+                self.search_failed.emit(self.search_id, str(e))
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+        if not self._cancelled:
+            self.search_finished.emit(self.search_id, count)
+
+    def cancel(self):
+        """진행 중인 검색 중단 (실행 중인 쿼리도 interrupt)"""
+        self._cancelled = True
+        if self._conn is not None:
+            try:
+                self._conn.interrupt()
+            except sqlite3.ProgrammingError:
+                pass
+
+# 일치 구간을 굵게 표시하는 delegate 클래스
+class SnippetDelegate(QStyledItemDelegate):
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        text = option.text
+        option.text = ""
+        style = option.widget.style() if option.widget else None
+        if style:
+            style.drawControl(QStyle.CE_ItemViewItem, option, painter, option.widget)
+
+        document = QTextDocument()
+        document.setDefaultFont(option.font)
+        document.setHtml(
+            html.escape(text).replace(MATCH_START, "<b>").replace(MATCH_END, "</b>")
+        )
+        painter.save()
+        painter.translate(option.rect.topLeft())
+        painter.setClipRect(0, 0, option.rect.width(), option.rect.height())
+        document.drawContents(painter)
+        painter.restore()
+
+# OCR 텍스트 검색 패널
+class TextSearchWidget(QWidget):
+    capture_selected = Signal(object, object)  # 선택한 결과의 (Id, TimeStamp)
+
+    def __init__(self):
+        super().__init__()
+        self.db_path = None
+        self.tz = DEFAULT_TIMEZONE
+        self.search_thread = None
+        self.search_id = 0  # 이전 검색의 늦게 도착한 결과를 걸러내기 위한 번호
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("OCR 텍스트 검색")
+        self.search_edit.returnPressed.connect(self.start_search)
+        search_button = QPushButton("검색")
+        search_button.clicked.connect(self.start_search)
+        search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(search_button)
+        layout.addLayout(search_layout)
+
+        self.result_table = QTableWidget(0, 3)
+        self.result_table.setHorizontalHeaderLabels(["TimeStamp", "WindowTitle", "OCRText"])
+        self.result_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.result_table.verticalHeader().setVisible(False)
+        self.result_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.result_table.setItemDelegateForColumn(2, SnippetDelegate(self.result_table))
+        self.result_table.itemSelectionChanged.connect(self.on_result_selected)
+        layout.addWidget(self.result_table)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    def set_db_path(self, db_path):
+        self.cancel_search()
+        self.db_path = db_path
+        self.result_table.setRowCount(0)
+        self.status_label.setText("")
+
+    def start_search(self):
+        """이전 검색을 취소하고 새 검색 시작"""
+        text = self.search_edit.text().strip()
+        if self.db_path is None or not text:
+            return
+
+        self.cancel_search()
+        self.result_table.setRowCount(0)
+        self.status_label.setText("검색 중...")
+
+        self.search_id += 1
+        self.search_thread = TextSearchThread(self.search_id, self.db_path, text)
+        self.search_thread.results_found.connect(self.add_results)
+        self.search_thread.search_finished.connect(self.on_search_finished)
+        self.search_thread.search_failed.connect(self.on_search_failed)
+        self.search_thread.start()
+
+    def cancel_search(self):
+        if self.search_thread is not None:
+            self.search_thread.cancel()
+            self.search_thread.wait()
+            self.search_thread = None
+        self.search_id += 1
+
+    def add_results(self, search_id, rows):
+        """검색 결과 묶음을 표 끝에 추가"""
+        if search_id != self.search_id:
+            return
+        start = self.result_table.rowCount()
+        self.result_table.setRowCount(start + len(rows))
+        for offset, (capture_id, timestamp, window_title, image_token, snippet) in enumerate(rows):
+            time_item = QTableWidgetItem(convert_unix_timestamp(timestamp, self.tz) if timestamp else "")
+            time_item.setData(Qt.UserRole, (capture_id, timestamp))
+            self.result_table.setItem(start + offset, 0, time_item)
+            self.result_table.setItem(start + offset, 1, QTableWidgetItem(window_title or ""))
+            self.result_table.setItem(start + offset, 2, QTableWidgetItem((snippet or "").replace("\n", " ")))
+        self.status_label.setText(f"검색 중... {self.result_table.rowCount()}건")
+
+    def on_search_finished(self, search_id, count):
+        if search_id == self.search_id:
+            self.status_label.setText(f"검색 결과: {count}건")
+
+    def on_search_failed(self, search_id, message):
+        if search_id == self.search_id:
+            self.status_label.setText(f"검색 실패: {message}")
+
+    def on_result_selected(self):
+        items = self.result_table.selectedItems()
+        if not items:
+            return
+        capture_id, timestamp = self.result_table.item(items[0].row(), 0).data(Qt.UserRole)
+        self.capture_selected.emit(capture_id, timestamp or 0)
@@ -0,0 +1,246 @@
+#thumbnail_cache.py
+
+from PySide6.QtGui import QImage, QImageReader
+from PySide6.QtCore import QThread, Signal, QStandardPaths, QSize, Qt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import STATS
+from instrumentation import get_logger, log_fields
+import hashlib
+import os
+import threading
+import time
+
+logger = get_logger("thumbnail_cache")
+
+# 메모리 캐시 기본 용량 (바이트)
+MEMORY_BUDGET = 256 * 1024 * 1024
+# 디스크 캐시 이미지 형식과 품질
+DISK_FORMAT = "JPG"
+DISK_QUALITY = 90
+# 백그라운드 생성 시 미리 만드는 크기 (ImageTableWidget의 현재/이전·다음 이미지 크기)
+PREGENERATE_SIZES = [(500, 500), (300, 300)]
+
+def default_cache_dir():
+    """증거 파일 옆이 아닌 사용자 캐시 디렉토리 아래에 썸네일을 둔다"""
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not location:
+        location = os.path.join(os.path.expanduser("~"), ".cache", "arbiter")
+    return os.path.join(location, "thumbnails")
+
+def read_scaled_image(image_path, width, height):
+    """이미지를 width x height 안에 들어가는 크기로 바로 디코딩 (작은 이미지는 원본 크기)"""
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and (size.width() > width or size.height() > height):
+        reader.setScaledSize(size.scaled(QSize(width, height), Qt.KeepAspectRatio))
+    started = time.perf_counter() if STATS.enabled else None
+    image = reader.read()
+    if started is not None:
+        STATS.record_latency("image.decode", time.perf_counter() - started)
+    if image.isNull():
+        return QImage()
+    # 형식이 scaledSize를 지원하지 않는 경우
+    if image.width() > width or image.height() > height:
+        image = scale_image(image, width, height)
+    return image
+
+def scale_image(image, width, height):
+    """width x height 안에 들어가도록 부드럽게 축소"""
+    if not STATS.enabled:
+        return image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    started = time.perf_counter()
+    image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    STATS.record_latency("image.scale", time.perf_counter() - started)
+    return image
+
+class ThumbnailCache:
+    """ImageStore 이미지의 축소본 캐시
+
+    메모리(LRU, 바이트 용량 제한) → 디스크(ImageToken + 파일 크기 + 수정 시각 키) → 원본 디코딩 순으로 찾는다.
+    GUI 스레드와 작업 스레드에서 함께 사용할 수 있다.
+    """
+
+    def __init__(self, image_dir, cache_dir=None, memory_budget=MEMORY_BUDGET):
+        self.image_dir = image_dir
+        # ImageStore 경로별로 디렉토리를 나눠 케이스끼리 섞이지 않도록 함
+        case_key = hashlib.sha1(os.path.abspath(image_dir).encode("utf-8")).hexdigest()[:16]
+        self.cache_dir = os.path.join(cache_dir or default_cache_dir(), case_key)
+        self.memory_budget = memory_budget
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def image_path(self, image_token):
+        return os.path.join(self.image_dir, image_token)
+
+    def _key(self, image_token, width, height):
+        """원본 파일이 바뀌면 키도 바뀌도록 크기와 수정 시각을 포함"""
+        try:
+            stat = os.stat(self.image_path(image_token))
+        except OSError:
+            return None
+        return f"{image_token}_{width}x{height}_{stat.st_size}_{stat.st_mtime_ns}"
+
+    def _disk_path(self, key, width, height):
+        return os.path.join(self.cache_dir, f"{width}x{height}", key + "." + DISK_FORMAT.lower())
+
+    def has_source(self, image_token):
+        return os.path.isfile(self.image_path(image_token))
+
+    def peek(self, image_token, width, height):
+        """메모리에 있는 경우에만 반환 (디스크/디코딩 없음)"""
+        key = self._key(image_token, width, height)
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+            return image
+
+    def get(self, image_token, width, height, source=None):
+        """width x height 축소본 반환, 원본이 없거나 읽을 수 없으면 null QImage
+
+        source로 이미 디코딩한 더 큰 축소본을 주면 원본 대신 그것을 줄여서 만든다.
+        """
+        key = self._key(image_token, width, height)
+        if key is None:
+            return QImage()
+
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                if STATS.enabled:
+                    STATS.count("thumbnail_cache.memory_hit")
+                return image
+
+        disk_path = self._disk_path(key, width, height)
+        image = QImage(disk_path) if os.path.exists(disk_path) else QImage()
+        if STATS.enabled:
+            STATS.count("thumbnail_cache.miss" if image.isNull() else "thumbnail_cache.disk_hit")
+        if image.isNull():
+            if source is not None and not source.isNull():
+                image = scale_image(source, width, height)
+            else:
+                image = read_scaled_image(self.image_path(image_token), width, height)
+            if image.isNull():
+                return image
+            self._store_disk(image, disk_path)
+
+        self._store_memory(key, image)
+        return image
+
+    def get_sizes(self, image_token, sizes):
+        """여러 크기의 축소본을 원본 디코딩 한 번으로 준비, {(width, height): QImage} 반환"""
+        images = {}
+        source = None
+        for width, height in sorted(sizes, key=lambda size: size[0] * size[1], reverse=True):
+            image = self.get(image_token, width, height, source)
+            images[(width, height)] = image
+            if source is None and not image.isNull():
+                source = image
+        return images
+
+    def generate(self, image_token, width, height):
+        """디스크 캐시에 없으면 축소본을 만들어 저장 (메모리에는 올리지 않음), 새로 만들었으면 True"""
+        key = self._key(image_token, width, height)
+        if key is None:
+            return False
+        disk_path = self._disk_path(key, width, height)
+        if os.path.exists(disk_path):
+            return False
+        image = read_scaled_image(self.image_path(image_token), width, height)
+        if image.isNull():
+            return False
+        self._store_disk(image, disk_path)
+        return True
+
+    def _store_disk(self, image, disk_path):
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            # 다른 스레드가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+            temp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+            if image.save(temp_path, DISK_FORMAT, DISK_QUALITY):
+                os.replace(temp_path, disk_path)
+        except OSError as e:
+            logger.warning("썸네일 저장 실패", extra=log_fields(path=disk_path, error=str(e)))
+
+    def _store_memory(self, key, image):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = image
+            self._memory_bytes += image.sizeInBytes()
+            # 용량을 넘으면 가장 오래 쓰지 않은 항목부터 제거
+            while self._memory_bytes > self.memory_budget and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.sizeInBytes()
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+# ImageStore 경로별로 하나의 캐시를 공유 (메모리 계층을 화면끼리 함께 사용)
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_thumbnail_cache(image_dir):
+    key = os.path.abspath(image_dir)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ThumbnailCache(image_dir)
+        return cache
+
+def image_dir_for_db(db_path):
+    """ukg.db 옆의 ImageStore 디렉토리 경로"""
+    return os.path.join(os.path.dirname(db_path), "ImageStore")
+
+# ImageStore 전체의 디스크 썸네일을 미리 만드는 스레드
+class ThumbnailGeneratorThread(QThread):
+    progress = Signal(int, int)  # 처리한 파일 수, 전체 파일 수
+    finished_generation = Signal(int)  # 새로 만든 썸네일 수
+
+    def __init__(self, cache, sizes=PREGENERATE_SIZES, workers=None):
+        super().__init__()
+        self.cache = cache
+        self.sizes = sizes
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._cancelled = False
+
+    def _generate(self, image_token):
+        """한 파일에 대해 없는 크기의 썸네일만 생성, 만든 개수 반환"""
+        created = 0
+        for width, height in self.sizes:
+            if self._cancelled:
+                break
+            if self.cache.generate(image_token, width, height):
+                created += 1
+        return created
+
+    def run(self):
+        try:
+            tokens = [entry.name for entry in os.scandir(self.cache.image_dir) if entry.is_file()]
+        except OSError as e:
+            logger.warning("ImageStore 목록 읽기 실패", extra=log_fields(image_dir=self.cache.image_dir, error=str(e)))
+            self.finished_generation.emit(0)
+            return
+
+        created = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for done, count in enumerate(executor.map(self._generate, tokens), 1):
+                created += count
+                if done % 50 == 0 or done == len(tokens):
+                    self.progress.emit(done, len(tokens))
+                if self._cancelled:
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.finished_generation.emit(created)
+
+    def cancel(self):
+        self._cancelled = True
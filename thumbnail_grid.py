@@ -0,0 +1,236 @@
+#thumbnail_grid.py
+
+# 타임라인 이미지 목록의 썸네일 격자 (QListView 아이콘 모드)
+#
+# 모델은 행마다 (Timestamp, WindowTitle, ImageToken, Id) 튜플만 들고 있고, data()는 이미 디코딩한
+# 썸네일이나 자리표시 이미지를 돌려줄 뿐 디코딩하지 않는다.
+# - 스크롤/크기 변경이 멈추면(짧은 지연) 화면에 보이는 행과 앞뒤 한 화면분만 작업 스레드에 디코딩 요청
+# - 화면 중앙에서 가까운 행부터 디코딩하고, 범위를 벗어난 대기 작업은 버림
+# - 보이는 범위에서 KEEP_PAGES 화면 넘게 떨어진 행의 썸네일은 모델에서 제거 (메모리 상한 유지)
+# 디코딩은 썸네일 캐시(메모리 LRU → 디스크)를 거치므로 다시 스크롤해 오면 대부분 캐시에서 읽는다.
+
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtGui import QPixmap, QColor, QImage
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, \
+    QSize, QPoint, Signal
+from datetime import datetime
+from queries import DEFAULT_TIMEZONE
+
+# 격자 썸네일 크기
+THUMBNAIL_SIZE = QSize(192, 120)
+# 보이는 범위 앞뒤로 미리 디코딩하는 화면 수
+PREFETCH_PAGES = 1
+# 보이는 범위에서 이만큼(화면 수) 넘게 떨어진 썸네일은 제거
+KEEP_PAGES = 3
+# 썸네일 디코딩 스레드 수
+THUMBNAIL_THREADS = 4
+# 스크롤이 멈춘 뒤 디코딩 요청까지 기다리는 시간 (밀리초)
+VIEWPORT_DELAY = 30
+
+# 작업 스레드에서 GUI 스레드로 결과를 보내기 위한 신호 객체
+class ThumbnailSignals(QObject):
+    thumbnail_ready = Signal(int, int, QImage)  # 세대, 행, 썸네일
+
+# 한 행의 썸네일을 캐시에서 읽거나 디코딩하는 작업
+class ThumbnailTask(QRunnable):
+    def __init__(self, loader, generation, row, image_token):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.row = row
+        self.image_token = image_token
+
+    def run(self):
+        # 대기하는 동안 보이는 범위를 벗어났으면 건너뜀
+        if self.generation != self.loader.generation or self.row not in self.loader.wanted:
+            return
+        image = self.loader.cache.get(self.image_token, THUMBNAIL_SIZE.width(), THUMBNAIL_SIZE.height())
+        self.loader.signals.thumbnail_ready.emit(self.generation, self.row, image)
+
+class ThumbnailLoader:
+    """보이는 범위의 썸네일만 제한된 스레드 풀에서 디코딩"""
+
+    def __init__(self, threads=THUMBNAIL_THREADS):
+        self.cache = None
+        self.generation = 0  # 이미지 목록이 바뀔 때마다 증가
+        self.wanted = frozenset()  # 지금 필요한 행
+        self.signals = ThumbnailSignals()
+        self.thumbnail_ready = self.signals.thumbnail_ready
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(threads)
+
+    def reset(self, cache):
+        self.cache = cache
+        self.generation += 1
+        self.wanted = frozenset()
+        self.pool.clear()
+
+    def request(self, rows, images):
+        """rows 순서(가까운 행 먼저)대로 요청, 아직 시작하지 않은 이전 요청은 버림"""
+        self.wanted = frozenset(rows)
+        self.pool.clear()
+        for priority, row in enumerate(reversed(rows)):
+            self.pool.start(ThumbnailTask(self, self.generation, row, images[row][2]), priority)
+
+    def shutdown(self):
+        self.reset(None)
+        self.pool.waitForDone()
+
+class ThumbnailGridModel(QAbstractListModel):
+    """이미지 목록 모델, DecorationRole은 디코딩된 썸네일(없으면 자리표시 이미지)"""
+
+    def __init__(self):
+        super().__init__()
+        self.images = []
+        self.thumbnails = {}  # 행 → QPixmap (보이는 범위 근처만)
+        self.tz = DEFAULT_TIMEZONE  # 표시 시간대
+        self.placeholder = QPixmap(THUMBNAIL_SIZE)
+        self.placeholder.fill(QColor(230, 230, 230))
+
+    def set_images(self, images):
+        self.beginResetModel()
+        self.images = list(images)  # 원본 목록이 늘어나도 행 삽입 알림 없이 바뀌지 않도록 복사
+        self.thumbnails = {}
+        self.endResetModel()
+
+    def append_images(self, images):
+        if not images:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.images), len(self.images) + len(images) - 1)
+        self.images.extend(images)
+        self.endInsertRows()
+
+    def rowCount(self, index=QModelIndex()):
+        return 0 if index.isValid() else len(self.images)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = index.row()
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.thumbnails.get(row, self.placeholder)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return datetime.fromtimestamp(self.images[row][0] / 1000, tz=self.tz).strftime("%m-%d %H:%M:%S")
+        if role == Qt.ItemDataRole.ToolTipRole:
+            timestamp, window_title, image_token, capture_id = self.images[row]
+            return f"Id {capture_id}\n{window_title or ''}\n{image_token}"
+        return None
+
+    def set_timezone(self, tz):
+        self.tz = tz
+        if self.images:
+            self.dataChanged.emit(self.index(0), self.index(len(self.images) - 1), [Qt.ItemDataRole.DisplayRole])
+
+    def set_thumbnail(self, row, pixmap):
+        self.thumbnails[row] = pixmap
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def evict_outside(self, first, last):
+        """first~last 밖의 썸네일 제거"""
+        for row in [row for row in self.thumbnails if row < first or row > last]:
+            del self.thumbnails[row]
+
+# 썸네일 격자 보기
+class ThumbnailGridView(QListView):
+    capture_selected = Signal(object, object)  # 선택한 캡처의 (Id, TimeStamp)
+
+    def __init__(self):
+        super().__init__()
+        self.grid_model = ThumbnailGridModel()
+        self.loader = ThumbnailLoader()
+        self.loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+        self.setModel(self.grid_model)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)  # 모든 항목 크기를 계산하지 않음
+        self.setLayoutMode(QListView.Batched)  # 많은 항목도 나눠서 배치
+        self.setBatchSize(2000)
+        self.setIconSize(THUMBNAIL_SIZE)
+        self.setGridSize(QSize(THUMBNAIL_SIZE.width() + 12, THUMBNAIL_SIZE.height() + 28))
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.selectionModel().currentChanged.connect(self.on_current_changed)
+
+        # 스크롤 중에는 요청을 미루고 멈췄을 때 한 번만 계산
+        self.viewport_timer = QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(VIEWPORT_DELAY)
+        self.viewport_timer.timeout.connect(self.update_visible_thumbnails)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+
+    def set_images(self, cache, images):
+        """썸네일 캐시와 이미지 목록 지정 (ImageTableWidget의 현재 목록)"""
+        self.loader.reset(cache)
+        self.grid_model.set_images(images)
+        self.viewport_timer.start()
+
+    def set_timezone(self, tz):
+        self.grid_model.set_timezone(tz)
+
+    def on_scrolled(self, value):
+        self.viewport_timer.start()  # valueChanged 값을 start(msec)에 넘기지 않도록 인자 없이 호출
+
+    def append_images(self, images):
+        """따라가기로 새로 들어온 이미지를 격자 끝에 추가 (기존 썸네일은 유지)"""
+        self.grid_model.append_images(images)
+        self.viewport_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.viewport_timer.start()
+
+    def visible_rows(self):
+        """보이는 첫 행과 마지막 행, 항목이 없으면 None"""
+        rect = self.viewport().rect()
+        grid = self.gridSize()
+        first = self.indexAt(QPoint(grid.width() // 2, grid.height() // 2))
+        if not first.isValid():
+            return None
+        # 오른쪽 아래 칸부터 거꾸로 찾음 (마지막 줄이 덜 찼거나 목록이 화면보다 짧은 경우)
+        y = rect.bottom() - grid.height() // 2
+        while y > 0:
+            x = rect.right() - grid.width() // 2
+            while x > 0:
+                last = self.indexAt(QPoint(x, y))
+                if last.isValid():
+                    return first.row(), last.row()
+                x -= grid.width()
+            y -= grid.height()
+        return first.row(), first.row()
+
+    def update_visible_thumbnails(self):
+        """보이는 범위와 앞뒤 한 화면분을 요청하고, 멀리 벗어난 썸네일은 제거"""
+        if self.loader.cache is None or not self.isVisible():
+            return
+        visible = self.visible_rows()
+        if visible is None:
+            return
+        first, last = visible
+        page = last - first + 1
+        row_count = self.grid_model.rowCount()
+        start = max(first - PREFETCH_PAGES * page, 0)
+        end = min(last + PREFETCH_PAGES * page, row_count - 1)
+        center = (first + last) / 2
+        rows = sorted((row for row in range(start, end + 1) if row not in self.grid_model.thumbnails),
+                      key=lambda row: (not first <= row <= last, abs(row - center)))
+        self.grid_model.evict_outside(first - KEEP_PAGES * page, last + KEEP_PAGES * page)
+        self.loader.request(rows, self.grid_model.images)
+
+    def on_thumbnail_ready(self, generation, row, image):
+        if generation != self.loader.generation or row not in self.loader.wanted:
+            return
+        self.grid_model.set_thumbnail(row, QPixmap.fromImage(image) if not image.isNull() else self.grid_model.placeholder)
+
+    def on_current_changed(self, current, previous):
+        if current.isValid():
+            timestamp, window_title, image_token, capture_id = self.grid_model.images[current.row()]
+            self.capture_selected.emit(capture_id, timestamp)
+
+    def shutdown(self):
+        self.loader.shutdown()
@@ -0,0 +1,329 @@
+#timeline_minimap.py
+
+# 캡처 밀도 미니맵 (타임라인 범위 선택)
+#
+# 보이는 시간 폭에 맞는 해상도(1분/10분/1시간/1일)의 구간별 캡처 수를 막대로 그린다.
+# - 케이스 캐시가 있으면 미리 계산한 TimeBucket / AppTimeBucket을 기본 키 범위로 읽는다.
+# - 없으면 원본의 TimeStamp를 한 번 정렬해 읽어 두고 구간 경계를 이분 탐색해 센다.
+# 조회는 DensityThread에서 하고 가장 최근 요청만 실행한다. 새 결과가 오기 전까지는 이전 막대를
+# 새 시간 축에 맞춰 그대로 그리므로 확대/이동 중에도 바로 반응한다.
+#
+# 조작: 휠 = 커서 위치 기준 확대/축소, 왼쪽 끌기 = 범위 선택, 오른쪽 끌기 = 이동, 더블클릭 = 전체 보기
+
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QComboBox, QLabel
+from PySide6.QtGui import QPainter, QColor
+from PySide6.QtCore import Qt, QThread, Signal, QRectF
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from connection import open_readonly
+from instrumentation import get_logger, log_fields
+from case_cache import BUCKET_RESOLUTIONS, bucket_counts
+from queries import DEFAULT_TIMEZONE
+import queue
+
+logger = get_logger("timeline_minimap")
+
+# 가장 짧게 확대할 수 있는 시간 폭 (밀리초)
+MIN_SPAN = 60 * 1000
+# 휠 한 칸당 확대 비율
+ZOOM_STEP = 1.25
+
+BAR_COLOR = QColor(70, 130, 180)
+SELECTION_COLOR = QColor(255, 165, 0, 80)
+BACKGROUND_COLOR = QColor(250, 250, 250)
+
+APP_LIST_QUERY = f"""
+SELECT AppName, SUM(Count) FROM AppTimeBucket
+WHERE Resolution = {BUCKET_RESOLUTIONS[-1]}
+GROUP BY AppName
+ORDER BY SUM(Count) DESC;
+"""
+
+def choose_resolution(span, width):
+    """보이는 폭(span 밀리초)에서 막대 수가 픽셀 수를 넘지 않는 가장 작은 해상도"""
+    for resolution in BUCKET_RESOLUTIONS:
+        if span / resolution <= max(width, 1):
+            return resolution
+    return BUCKET_RESOLUTIONS[-1]
+
+def count_sorted_timestamps(timestamps, resolution, start_time, end_time):
+    """정렬된 TimeStamp 배열에서 구간별 개수를 이분 탐색으로 계산 (0인 구간은 생략)"""
+    counts = []
+    bucket = start_time // resolution
+    last_bucket = end_time // resolution
+    position = bisect_left(timestamps, bucket * resolution)
+    while bucket <= last_bucket and position < len(timestamps):
+        next_position = bisect_left(timestamps, (bucket + 1) * resolution, position)
+        if next_position > position:
+            counts.append((bucket * resolution, next_position - position))
+            bucket += 1
+        else:
+            # 빈 구간은 다음 TimeStamp가 있는 구간으로 건너뜀
+            bucket = max(bucket + 1, timestamps[position] // resolution)
+        position = next_position
+    return counts
+
+# 구간별 캡처 수를 조회하는 스레드 (가장 최근 요청만 실행)
+class DensityThread(QThread):
+    density_loaded = Signal(int, int, list)  # 요청 번호, 해상도, [(구간 시작 밀리초, 개수), ...]
+    apps_loaded = Signal(list)  # [(App.Name, 캡처 수), ...] (케이스 캐시가 있을 때만)
+
+    def __init__(self, db_path, cache_path=None):
+        super().__init__()
+        self.db_path = db_path
+        self.cache_path = cache_path
+        self._requests = queue.Queue()
+        self._latest = 0
+
+    def request(self, request_id, resolution, start_time, end_time, app_name=None):
+        self._latest = request_id
+        self._requests.put((request_id, resolution, start_time, end_time, app_name))
+
+    def run(self):
+        try:
+            conn = open_readonly(self.cache_path or self.db_path)
+        except Exception as e:
+            logger.warning("밀도 조회 연결 실패", extra=log_fields(db_path=self.cache_path or self.db_path, error=str(e)))
+            return
+        timestamps = None
+        try:
+            if self.cache_path:
+                self.apps_loaded.emit(conn.execute(APP_LIST_QUERY).fetchall())
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    break
+                request_id, resolution, start_time, end_time, app_name = request
+                if request_id != self._latest:
+                    continue  # 더 새로운 요청이 대기 중
+                if self.cache_path:
+                    counts = bucket_counts(conn.cursor(), resolution, start_time, end_time, app_name)
+                else:
+                    if timestamps is None:
+                        timestamps = array("q", (row[0] for row in conn.execute(
+                            "SELECT TimeStamp FROM WindowCapture WHERE TimeStamp IS NOT NULL ORDER BY TimeStamp;")))
+                    counts = count_sorted_timestamps(timestamps, resolution, start_time, end_time)
+                self.density_loaded.emit(request_id, resolution, counts)
+        except Exception as e:
+            logger.warning("밀도 조회 오류", extra=log_fields(error=str(e)))
+        finally:
+            conn.close()
+
+    def stop(self):
+        self._requests.put(None)
+        self.wait()
+
+# 구간별 캡처 수 막대 그림 (확대/이동/범위 선택)
+class DensityView(QWidget):
+    view_changed = Signal()
+    range_selected = Signal(object, object)  # 선택한 (시작, 끝) 밀리초
+
+    def __init__(self):
+        super().__init__()
+        self.setMinimumHeight(60)
+        self.setMouseTracking(True)
+        self.bounds = None  # 전체 (시작, 끝) 밀리초
+        self.view_start = self.view_end = 0
+        self.resolution = BUCKET_RESOLUTIONS[-1]
+        self.counts = []
+        self.selection = None  # (시작, 끝) 밀리초
+        self.tz = DEFAULT_TIMEZONE  # 표시 시간대
+        self._drag = None  # (버튼, 시작 x, 시작 시 view_start, view_end)
+
+    def set_bounds(self, start_time, end_time):
+        self.bounds = (start_time, max(end_time, start_time + MIN_SPAN))
+        self.counts = []
+        self.selection = None
+        self.set_view(*self.bounds)
+
+    def set_view(self, start_time, end_time):
+        """보이는 시간 범위 변경 (전체 범위 밖으로 나가지 않게 맞춤)"""
+        if self.bounds is None:
+            return
+        span = min(max(end_time - start_time, MIN_SPAN), self.bounds[1] - self.bounds[0])
+        start_time = min(max(start_time, self.bounds[0]), self.bounds[1] - span)
+        self.view_start, self.view_end = int(start_time), int(start_time + span)
+        self.update()
+        self.view_changed.emit()
+
+    def set_counts(self, resolution, counts):
+        self.resolution = resolution
+        self.counts = counts
+        self.update()
+
+    def time_at(self, x):
+        return self.view_start + (self.view_end - self.view_start) * x / max(self.width(), 1)
+
+    def x_at(self, timestamp):
+        return (timestamp - self.view_start) * self.width() / max(self.view_end - self.view_start, 1)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND_COLOR)
+        if self.bounds is None:
+            return
+        height = self.height()
+        bar_width = max(self.resolution * self.width() / max(self.view_end - self.view_start, 1), 1.0)
+        first = bisect_left(self.counts, (self.view_start - self.resolution,))
+        visible = []
+        for bucket_start, count in self.counts[first:]:
+            if bucket_start > self.view_end:
+                break
+            visible.append((bucket_start, count))
+        peak = max((count for _, count in visible), default=0)
+        if peak:
+            for bucket_start, count in visible:
+                bar_height = max(count * (height - 2) / peak, 1.0)
+                painter.fillRect(QRectF(self.x_at(bucket_start), height - bar_height, bar_width, bar_height),
+                                 BAR_COLOR)
+        if self.selection is not None:
+            left, right = sorted((self.x_at(self.selection[0]), self.x_at(self.selection[1])))
+            painter.fillRect(QRectF(left, 0, max(right - left, 1.0), height), SELECTION_COLOR)
+
+    def wheelEvent(self, event):
+        if self.bounds is None:
+            return
+        anchor = self.time_at(event.position().x())
+        factor = 1 / ZOOM_STEP if event.angleDelta().y() > 0 else ZOOM_STEP
+        self.set_view(anchor - (anchor - self.view_start) * factor, anchor + (self.view_end - anchor) * factor)
+
+    def mousePressEvent(self, event):
+        if self.bounds is None:
+            return
+        x = event.position().x()
+        self._drag = (event.button(), x, self.view_start, self.view_end)
+        if event.button() == Qt.LeftButton:
+            self.selection = (int(self.time_at(x)), int(self.time_at(x)))
+            self.update()
+
+    def mouseMoveEvent(self, event):
+        x = event.position().x()
+        if self._drag is None:
+            if self.bounds is not None:
+                self.setToolTip(self.bucket_tooltip(self.time_at(x)))
+            return
+        button, start_x, view_start, view_end = self._drag
+        if button == Qt.LeftButton:
+            self.selection = (self.selection[0], int(self.time_at(min(max(x, 0), self.width()))))
+            self.update()
+        elif button == Qt.RightButton:
+            shift = (start_x - x) * (view_end - view_start) / max(self.width(), 1)
+            self.set_view(view_start + shift, view_end + shift)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag is None:
+            return
+        button = self._drag[0]
+        self._drag = None
+        if button == Qt.LeftButton and self.selection is not None:
+            start_time, end_time = sorted(self.selection)
+            if end_time > start_time:
+                self.range_selected.emit(start_time, end_time)
+            else:
+                self.selection = None
+                self.update()
+
+    def mouseDoubleClickEvent(self, event):
+        if self.bounds is not None:
+            self.set_view(*self.bounds)
+
+    def bucket_tooltip(self, timestamp):
+        """마우스 위치 구간의 시각과 캡처 수"""
+        bucket_start = int(timestamp) // self.resolution * self.resolution
+        index = bisect_left(self.counts, (bucket_start,))
+        count = self.counts[index][1] if index < len(self.counts) and self.counts[index][0] == bucket_start else 0
+        return f"{format_minute(bucket_start, self.tz)}: {count}개"
+
+def format_minute(timestamp, tz):
+    return datetime.fromtimestamp(timestamp / 1000, tz=tz).strftime('%Y-%m-%d %H:%M')
+
+# 앱 선택 + 밀도 막대 + 보이는 범위 표시
+class TimelineMinimap(QWidget):
+    range_selected = Signal(object, object)  # 선택한 (시작, 끝) 밀리초
+
+    def __init__(self):
+        super().__init__()
+        self.density_thread = None
+        self.request_id = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        header_layout = QHBoxLayout()
+        self.app_combo = QComboBox()
+        self.app_combo.addItem("전체 앱", None)
+        self.app_combo.setEnabled(False)
+        self.app_combo.setToolTip("앱별 밀도는 케이스 색인이 있을 때만 표시")
+        self.app_combo.currentIndexChanged.connect(self.request_counts)
+        self.range_label = QLabel("")
+        header_layout.addWidget(QLabel("캡처 밀도"))
+        header_layout.addWidget(self.app_combo)
+        header_layout.addWidget(self.range_label, 1)
+        layout.addLayout(header_layout)
+
+        self.view = DensityView()
+        self.view.view_changed.connect(self.request_counts)
+        self.view.range_selected.connect(self.range_selected)
+        layout.addWidget(self.view)
+
+    def set_source(self, db_path, cache_path, start_time, end_time):
+        """밀도를 읽을 DB(케이스 캐시가 있으면 캐시)와 전체 시간 범위 지정"""
+        self.shutdown()
+        self.app_combo.blockSignals(True)
+        self.app_combo.clear()
+        self.app_combo.addItem("전체 앱", None)
+        self.app_combo.setEnabled(False)
+        self.app_combo.blockSignals(False)
+
+        self.density_thread = DensityThread(db_path, cache_path)
+        self.density_thread.density_loaded.connect(self.on_density_loaded)
+        self.density_thread.apps_loaded.connect(self.set_apps)
+        self.density_thread.start()
+        self.view.set_bounds(start_time, end_time)
+
+    def set_apps(self, apps):
+        self.app_combo.blockSignals(True)
+        for name, count in apps:
+            self.app_combo.addItem(f"{name} ({count})", name)
+        self.app_combo.setEnabled(True)
+        self.app_combo.blockSignals(False)
+
+    def set_selection(self, start_time, end_time):
+        """입력한 검색 범위를 선택 표시에 반영"""
+        self.view.selection = (start_time, end_time)
+        self.view.update()
+
+    def request_counts(self):
+        if self.density_thread is None or self.view.bounds is None:
+            return
+        view = self.view
+        resolution = choose_resolution(view.view_end - view.view_start, view.width())
+        self.request_id += 1
+        # 양옆으로 한 화면씩 더 읽어 이동할 때도 막대가 비지 않게 함
+        span = view.view_end - view.view_start
+        self.density_thread.request(self.request_id, resolution, view.view_start - span, view.view_end + span,
+                                    self.app_combo.currentData())
+        self.update_range_label()
+
+    def update_range_label(self):
+        view = self.view
+        if view.bounds is not None:
+            self.range_label.setText(f"{format_minute(view.view_start, view.tz)} ~ {format_minute(view.view_end, view.tz)}")
+
+    def set_timezone(self, tz):
+        """보이는 범위와 막대 툴팁의 표시 시간대 변경"""
+        self.view.tz = tz
+        self.update_range_label()
+
+    def on_density_loaded(self, request_id, resolution, counts):
+        if request_id == self.request_id:
+            self.view.set_counts(resolution, counts)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.request_counts()
+
+    def shutdown(self):
+        if self.density_thread is not None:
+            self.density_thread.stop()
+            self.density_thread = None
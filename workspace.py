@@ -0,0 +1,138 @@
+#workspace.py
+
+# 여러 ukg.db를 한 케이스로 여는 작업 공간
+#
+# 실제 케이스에는 사용자 프로필이 여러 개 있고, 같은 프로필을 여러 시점에 수집한 스냅샷도 있다.
+# - 각 DB는 별도 프로세스에서 읽는다 (spawn 방식, 이 모듈과 import하는 모듈은 Qt를 쓰지 않음).
+#   전체 로드 시간은 DB 수의 합이 아니라 가장 큰 DB 하나를 읽는 시간에 가까워진다.
+# - 같은 프로필(ukg.db가 있는 폴더 이름, 보통 UKP 아래의 GUID)의 여러 스냅샷에 있는 같은 캡처는
+#   (Id, TimeStamp, ImageToken)이 같으면 한 행으로 합치고 출처를 모두 기록한다.
+# - DB마다 TimeStamp 순으로 읽은 행을 heapq.merge로 k-way 병합해 하나의 타임라인을 만든다.
+
+import heapq
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from connection import open_readonly
+from queries import CAPTURE_HEADERS, CaptureQuery, iter_capture_batches
+from deletion_analysis import find_id_gaps
+
+# 케이스에 포함된 DB 하나
+# index: 케이스 안의 순번 (병합 시 같은 시각의 행 순서를 정함)
+# profile: 스냅샷을 묶는 프로필 키, label: 표에 표시할 출처 이름
+CaseSource = namedtuple("CaseSource", ["index", "db_path", "image_dir", "profile", "label"])
+
+# DB 하나를 읽은 결과 (rows는 TimeStamp, Id 순으로 정렬된 CAPTURE_HEADERS 순서의 행)
+IngestResult = namedtuple("IngestResult", ["rows", "report", "error"])
+
+DB_FILE_NAME = "ukg.db"
+
+_TIMESTAMP = CAPTURE_HEADERS.index("TimeStamp")
+_ID = CAPTURE_HEADERS.index("Id")
+_IMAGE_TOKEN = CAPTURE_HEADERS.index("ImageToken")
+
+def profile_key(db_path):
+    """ukg.db가 있는 폴더 이름 (Recall은 프로필마다 UKP\\{GUID}\\ukg.db에 저장)"""
+    return os.path.basename(os.path.dirname(os.path.abspath(db_path))).lower()
+
+def make_sources(db_paths):
+    """DB 경로 목록을 CaseSource 목록으로 변환 (출처 이름은 공통 상위 폴더 기준 상대 경로)"""
+    db_paths = [os.path.abspath(db_path) for db_path in dict.fromkeys(db_paths)]
+    folders = [os.path.dirname(db_path) for db_path in db_paths]
+    if len(folders) > 1:
+        root = os.path.commonpath(folders)
+    else:
+        root = os.path.dirname(folders[0]) if folders else ""
+    sources = []
+    for index, db_path in enumerate(db_paths):
+        label = os.path.relpath(os.path.dirname(db_path), root) if root else os.path.dirname(db_path)
+        sources.append(CaseSource(
+            index, db_path, os.path.join(os.path.dirname(db_path), "ImageStore"),
+            profile_key(db_path), label.replace(os.sep, "/"),
+        ))
+    return sources
+
+def find_case_databases(folder):
+    """폴더 아래의 모든 ukg.db 경로를 정렬해서 반환"""
+    db_paths = []
+    for directory, _, file_names in os.walk(folder):
+        if DB_FILE_NAME in file_names:
+            db_paths.append(os.path.join(directory, DB_FILE_NAME))
+    return sorted(db_paths)
+
+def ingest_source(db_path):
+    """작업 프로세스에서 실행: DB 하나의 캡처 전체(캡처당 한 행)와 Id 공백 분석 결과 반환"""
+    try:
+        conn = open_readonly(db_path)
+    except Exception as e:
+        return IngestResult([], None, str(e))
+    try:
+        rows = []
+        for batch in iter_capture_batches(conn, CaptureQuery(sort_column="TimeStamp")):
+            rows.extend(batch)
+        report = find_id_gaps(conn.cursor())
+        return IngestResult(rows, report, None)
+    except Exception as e:
+        return IngestResult([], None, str(e))
+    finally:
+        conn.close()
+
+def ingest_case(sources, workers=None, progress=None):
+    """모든 DB를 프로세스 풀에서 동시에 읽어 {source.index: IngestResult} 반환
+
+    progress(완료한 DB 수, 전체)는 DB 하나가 끝날 때마다 호출된다.
+    """
+    results = {}
+    if not sources:
+        return results
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    if workers == 1:
+        # DB가 하나면 프로세스를 띄우는 비용이 더 큼
+        for done, source in enumerate(sources, 1):
+            results[source.index] = ingest_source(source.db_path)
+            if progress is not None:
+                progress(done, len(sources))
+        return results
+
+    # fork 대신 spawn: GUI 프로세스의 Qt 상태를 작업 프로세스로 복사하지 않음
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(ingest_source, source.db_path): source for source in sources}
+        for done, future in enumerate(as_completed(futures), 1):
+            source = futures[future]
+            try:
+                results[source.index] = future.result()
+            except Exception as e:
+                results[source.index] = IngestResult([], None, str(e))
+            if progress is not None:
+                progress(done, len(sources))
+    return results
+
+def _keyed_rows(source, rows):
+    for row in rows:
+        timestamp = row[_TIMESTAMP]
+        yield (timestamp if timestamp is not None else -1, source.index, row[_ID]), source, row
+
+def merge_case(sources, results):
+    """DB별 결과를 TimeStamp 순으로 k-way 병합하고 프로필 안의 중복 캡처를 합친다
+
+    (행 목록, 행마다 출처 index 튜플 목록)을 반환한다. 같은 캡처가 여러 스냅샷에 있으면
+    가장 먼저 병합된 행을 남기고 출처만 추가한다.
+    """
+    streams = [_keyed_rows(source, results[source.index].rows)
+               for source in sources if source.index in results]
+    merged_rows = []
+    merged_sources = []
+    seen = {}  # (프로필, Id, TimeStamp, ImageToken) → 병합 결과의 행 번호
+    for _, source, row in heapq.merge(*streams, key=lambda item: item[0]):
+        key = (source.profile, row[_ID], row[_TIMESTAMP], row[_IMAGE_TOKEN])
+        position = seen.get(key)
+        if position is not None:
+            if source.index not in merged_sources[position]:
+                merged_sources[position] += (source.index,)
+            continue
+        seen[key] = len(merged_rows)
+        merged_rows.append(row)
+        merged_sources.append((source.index,))
+    return merged_rows, merged_sources